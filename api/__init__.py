@@ -1,6 +1,4 @@
-import sys
-import subprocess
-import importlib
+import os
 import warnings
 from flask import Flask
 from api.common.base import Api
@@ -10,14 +8,19 @@ from api.cors import configure_cors
 from api.authentication import configure_authentication
 from api.authorization import configure_authorization
 from api.resources import configure_routes
+from api.ml.manager import PredictorManager
+from api.ml.warmup import ModelWarmup
+from api.metrics import metrics
+from api.configuration import application_path
+from api.common.dependencies import resolve_dependencies
 
 
 # Filter out unnecessary warning messages
 warnings.filterwarnings("ignore", category=UserWarning)
 
 
-def prepare_app(app_name):
-    """Prepares the application"""
+def prepare_app(app_name, production=False):
+    """Prepares the application (in the production mode, the predictor dependencies are not installed)"""
 
     # Initialize the Flask object
     app = Flask(app_name)
@@ -34,32 +37,40 @@ def prepare_app(app_name):
     configure_authorization(app)
 
     # Prepare the API
-    prepare_api(app)
+    prepare_api(app, production=production)
 
     # Return the app
     return app
 
 
-def prepare_api(app):
+def prepare_api(app, production=False):
     """Prepares the API"""
 
     # Initialize the Flask-RestFul object
     api = Api(app)
 
+    # Start the metrics of the server run (the workers are forked after the API is prepared)
+    metrics.reset()
+
     # Register the routes
     configure_routes(api)
 
     # Install the predictor dependencies
-    install_predictor_dependencies()
+    install_predictor_dependencies(install=not production)
 
+    # Index the available predictor models
+    PredictorManager.index_models()
 
-def install_predictor_dependencies():
-    """Installs the predictor dependencies"""
+    # Warm up the predictor models (in the production mode, always before the workers are forked)
+    ModelWarmup.run(background=ModelWarmup.configuration.get("background", False) and not production)
 
-    # Install the predictor dependencies
-    with open("requirements_predictors.txt", "rt") as file:
-        for dependency in file.readlines():
-            try:
-                importlib.import_module(dependency)
-            except ImportError:
-                subprocess.check_call([sys.executable, "-m", "pip", "install", dependency])
+
+def install_predictor_dependencies(install=True):
+    """Installs the predictor dependencies (only the missing ones; the verified state is cached in a stamp file)"""
+
+    # Resolve the predictor dependencies
+    missing = resolve_dependencies(os.path.join(application_path, "..", "requirements_predictors.txt"), install=install)
+
+    # Warn about the missing predictor dependencies
+    if missing:
+        warnings.warn(f"Missing predictor dependencies: {', '.join(str(r) for r in missing)}", RuntimeWarning)
@@ -15,15 +15,28 @@ def configure_authentication(app):
     # Initialize the encryption object
     Bcrypt(app)
 
+    # Load the configuration
+    configuration = load_configuration("authentication.json")
+
     # Configure the authentication database
-    for key, value in load_configuration("authentication.json").get("database", {}).items():
+    for key, value in configuration.get("database", {}).items():
         app.config[key] = value
 
+    # Configure the authentication database engine (connection pooling)
+    if configuration.get("engine"):
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = configuration["engine"]
+
     # Get the database path
     path = app.config["SQLALCHEMY_DATABASE_URI"].lstrip("sqlite:///").split("/")[:-1]
 
     # Prepare the database path and make sure the database directory exists
     Path(os.path.join(application_path, "..", *path)).mkdir(parents=True, exist_ok=True)
 
+    # Resolve the relative SQLite database path against the application root (not the Flask instance folder)
+    database = app.config["SQLALCHEMY_DATABASE_URI"][len("sqlite:///"):]
+    if app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite:///") and not os.path.isabs(database):
+        database = os.path.realpath(os.path.join(application_path, "..", database))
+        app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{database}"
+
     # Initialize the authentication database
-    initialize_database(app)
+    initialize_database(app, sqlite=configuration.get("sqlite"))
@@ -1,3 +1,6 @@
+import warnings
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
 from flask_sqlalchemy import SQLAlchemy
 
 
@@ -11,12 +14,14 @@ db = SQLAlchemy()
 # Authentication database initialization #
 # -------------------------------------- #
 
-def initialize_database(app):
+def initialize_database(app, sqlite=None):
     """
     Prepares and registers the authentication database supported by the API.
 
     :param app: app instance
     :type app: flask.Flask
+    :param sqlite: SQLite connection settings (wal, synchronous, busy_timeout_in_milliseconds), defaults to None
+    :type sqlite: dict, optional
     :return: None
     :rtype: None type
     """
@@ -26,4 +31,47 @@ def initialize_database(app):
 
     # Create the tables if needed
     with app.app_context():
+
+        # Configure the SQLite connections
+        if db.engine.dialect.name == "sqlite":
+            event.listen(db.engine, "connect", lambda connection, _: configure_sqlite_connection(connection, sqlite))
+
+        # Create the tables and the indices missing in the existing tables
         db.create_all()
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                try:
+                    index.create(db.engine, checkfirst=True)
+                except SQLAlchemyError as e:
+                    warnings.warn(f"Cannot create the index {index.name} (duplicate values?): {e}", RuntimeWarning)
+
+
+def configure_sqlite_connection(connection, sqlite=None):
+    """
+    Configures the SQLite connection.
+
+    The write-ahead log (WAL) lets the readers (log-in) proceed concurrently
+    with a writer (sign-up); with the ``NORMAL`` synchronization, the commits
+    do not wait for the disk sync. The busy timeout makes the concurrent
+    writers wait for the lock instead of failing immediately.
+
+    :param connection: DB-API connection
+    :type connection: sqlite3.Connection
+    :param sqlite: SQLite connection settings (wal, synchronous, busy_timeout_in_milliseconds), defaults to None
+    :type sqlite: dict, optional
+    :return: None
+    :rtype: None type
+    """
+    sqlite = sqlite or {}
+
+    # Configure the connection
+    cursor = connection.cursor()
+    try:
+        if sqlite.get("wal", True):
+            cursor.execute("PRAGMA journal_mode=WAL")
+        if sqlite.get("synchronous"):
+            cursor.execute(f"PRAGMA synchronous={str(sqlite['synchronous']).upper()}")
+        if sqlite.get("busy_timeout_in_milliseconds") is not None:
+            cursor.execute(f"PRAGMA busy_timeout={int(sqlite['busy_timeout_in_milliseconds'])}")
+    finally:
+        cursor.close()
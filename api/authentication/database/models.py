@@ -1,6 +1,6 @@
-from flask_bcrypt import generate_password_hash, check_password_hash
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from api.authentication.database import db
+from api.authentication.hashing import password_hasher
 
 
 # ------------------------------------------ #
@@ -23,14 +23,23 @@ class BaseModel(db.Model):
     updated_on = db.Column(db.DateTime, nullable=False, server_default=db.func.now(), onupdate=db.func.now())
 
     def save(self):
-        """Saves an instance of the model from the database"""
+        """
+        Saves an instance of the model to the database.
+
+        :return: True if saved, False if the instance violates a unique constraint (e.g. the existing username)
+        :rtype: bool
+        :raises sqlalchemy.exc.SQLAlchemyError: other database errors (e.g. locked database, pool timeout)
+        """
         try:
             db.session.add(self)
             db.session.commit()
+            return True
         except IntegrityError:
             db.session.rollback()
+            return False
         except SQLAlchemyError:
             db.session.rollback()
+            raise
 
     def update(self):
         """Updates an instance of the model from the database"""
@@ -50,9 +59,9 @@ class User(BaseModel):
 
     # User fields
     #
-    #  1. username, mandatory
+    #  1. username, mandatory, unique (indexed)
     #  2. password, mandatory
-    username = db.Column(db.String(100))
+    username = db.Column(db.String(100), unique=True, index=True)
     password = db.Column(db.String(100))
 
     @classmethod
@@ -66,12 +75,12 @@ class User(BaseModel):
         return cls.query.filter_by(id=uid).first()
 
     def hash_password(self):
-        """Generates the password hash"""
-        self.password = generate_password_hash(str(self.password)).decode("utf8")
+        """Generates the password hash (in the hashing worker pool)"""
+        self.password = password_hasher.generate_password_hash(str(self.password))
 
     def check_password(self, password):
-        """Checks if the password hashes are equal"""
-        return check_password_hash(str(self.password), password)
+        """Checks if the password hashes are equal (in the hashing worker pool)"""
+        return password_hasher.check_password_hash(str(self.password), password)
 
     @classmethod
     def authenticate(cls, **kwargs):
@@ -84,8 +93,8 @@ class User(BaseModel):
             return None
 
         # Get the user and authenticate the provided passwords
-        user = cls.query.filter_by(username=username).first()
-        if not user or not check_password_hash(user.password, password):
+        user = cls.get_by_username(username)
+        if not user or not user.check_password(password):
             return None
 
         # Return the user instance
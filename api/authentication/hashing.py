@@ -0,0 +1,150 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from flask_bcrypt import Bcrypt
+from api.configuration import load_configuration
+
+
+# ---------------------------------------------- #
+# Default password hashing attributes definition #
+# ---------------------------------------------- #
+DEFAULT_HASHING_ROUNDS = 12
+DEFAULT_HASHING_WORKERS = 2
+DEFAULT_HASHING_QUEUE_SIZE = 16
+DEFAULT_HASHING_TIMEOUT = 10
+
+
+# ----------------------------------------------- #
+# Password hashing-specific exceptions definition #
+# ----------------------------------------------- #
+class PasswordHashingBusyException(Exception): pass
+
+
+# ----------------------------------------- #
+# Password hashing configuration definition #
+# ----------------------------------------- #
+
+def configure_password_hashing():
+    """Configures the password hashing (bcrypt cost factor and the hashing worker pool)"""
+    configuration = load_configuration("authentication.json").get("hashing", {})
+    return {
+        "rounds": configuration.get("rounds", DEFAULT_HASHING_ROUNDS),
+        "workers": configuration.get("workers", DEFAULT_HASHING_WORKERS),
+        "queue_size": configuration.get("queue_size", DEFAULT_HASHING_QUEUE_SIZE),
+        "timeout": configuration.get("timeout_in_seconds", DEFAULT_HASHING_TIMEOUT)
+    }
+
+
+# -------------------------------- #
+# Password hasher class definition #
+# -------------------------------- #
+
+class PasswordHasher(object):
+    """Class implementing the bcrypt password hashing on a bounded pool of worker threads"""
+
+    def __init__(self,
+                 rounds=DEFAULT_HASHING_ROUNDS,
+                 workers=DEFAULT_HASHING_WORKERS,
+                 queue_size=DEFAULT_HASHING_QUEUE_SIZE,
+                 timeout=DEFAULT_HASHING_TIMEOUT):
+        """
+        Initializes the PasswordHasher.
+
+        At most <workers> passwords are hashed (or checked) at once, so the
+        sign-up and log-in bursts use at most <workers> CPU cores (bcrypt
+        releases the GIL) and the remaining cores are left to the predictions.
+        At most <queue_size> further requests wait for a free worker; the
+        requests that exceed the queue are rejected at once and the requests
+        waiting longer than <timeout> seconds are rejected (their hashing is
+        cancelled if it has not started yet), both by
+        ``PasswordHashingBusyException``. A slot is freed only when its hashing
+        task finishes or is cancelled, so the pool backlog never exceeds
+        <workers> + <queue_size> tasks.
+
+        The request thread waits for the result, i.e. the pool limits the
+        hashing concurrency, it does not free the request threads. The
+        admitted requests are therefore bounded below the number of the
+        request threads of the server (see: ``limit_request_threads``), so the
+        other request threads keep serving the predictions.
+
+        :param rounds: bcrypt cost factor (log2 of the number of rounds), defaults to DEFAULT_HASHING_ROUNDS
+        :type rounds: int, optional
+        :param workers: number of the hashing threads, defaults to DEFAULT_HASHING_WORKERS
+        :type workers: int, optional
+        :param queue_size: number of the requests waiting for a free thread, defaults to DEFAULT_HASHING_QUEUE_SIZE
+        :type queue_size: int, optional
+        :param timeout: maximum time to wait for the hashing in seconds, defaults to DEFAULT_HASHING_TIMEOUT
+        :type timeout: float, optional
+        """
+        self.rounds = int(rounds)
+        self.workers = max(int(workers), 1)
+        self.queue_size = max(int(queue_size), 0)
+        self.timeout = timeout
+
+        # Hashing backend and admission of the requests (running and waiting)
+        self.bcrypt = Bcrypt()
+        self.slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+
+        # Hashing threads (created lazily by the process that hashes, so they are not inherited by forking)
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def limit_request_threads(self, threads):
+        """
+        Bounds the admitted requests (hashing and waiting) to half of the <threads> handling the requests.
+
+        The requests beyond the bound are rejected at once (HTTP 503), so the
+        sign-up and log-in bursts never occupy more than half of the request
+        threads of the server. It must be called before the hashing starts
+        (e.g. before the server workers are forked).
+
+        :param threads: number of the request threads of the server (process)
+        :type threads: int
+        :return: None
+        :rtype: None type
+        """
+        admitted = min(self.workers + self.queue_size, max(int(threads) // 2, 1))
+        self.slots = threading.BoundedSemaphore(admitted)
+
+    def generate_password_hash(self, password):
+        """Generates the bcrypt hash of the <password> (with the configured cost factor)"""
+        return self._run(self.bcrypt.generate_password_hash, password, self.rounds).decode("utf8")
+
+    def check_password_hash(self, password_hash, password):
+        """Checks if the <password> matches the bcrypt <password_hash> (the cost factor is stored in the hash)"""
+        return self._run(self.bcrypt.check_password_hash, password_hash, password)
+
+    def _run(self, function, *args):
+        """Runs the hashing <function> in the worker pool (waits for the result)"""
+
+        # Admit the request (reject it at once if the workers and the queue are full)
+        if not self.slots.acquire(blocking=False):
+            raise PasswordHashingBusyException("Too many authentication requests, try again later")
+
+        # Submit the hashing (the slot is freed once the task finishes or is cancelled, not when the request gives up)
+        try:
+            future = self._get_executor().submit(function, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+
+        # Wait for the result (the task that has not started yet is cancelled on timeout)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise PasswordHashingBusyException("Too many authentication requests, try again later")
+
+    def _get_executor(self):
+        """Returns the worker pool of the current process"""
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hashing")
+                self._executor_pid = os.getpid()
+            return self._executor
+
+
+# Password hasher instance (shared by the authentication models)
+password_hasher = PasswordHasher(**configure_password_hashing())
@@ -1,9 +1,19 @@
 import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv, find_dotenv
 from flask_jwt_extended import JWTManager
 from api.configuration import load_configuration, application_path
 
 
+# ------------------------------------------- #
+# Default authorization attributes definition #
+# ------------------------------------------- #
+DEFAULT_CLAIMS_CACHE_ENTRIES = 1024
+
+
 # ----------------------------------------------- #
 # Authorization configuration routines definition #
 # ----------------------------------------------- #
@@ -11,11 +21,18 @@ from api.configuration import load_configuration, application_path
 def configure_authorization(app):
     """Configures the authorization"""
 
-    # Initialize the authorization object
-    JWTManager(app)
-
     # Load the configuration
-    authorization_config = load_configuration("authorization.json").get("env", {}).get("env_file_location")
+    configuration = load_configuration("authorization.json")
+
+    # Initialize the authorization object (optionally caching the verified claims)
+    claims_cache = configuration.get("claims_cache", {})
+    if claims_cache.get("enabled", False):
+        CachingJWTManager(app, max_entries=claims_cache.get("max_entries", DEFAULT_CLAIMS_CACHE_ENTRIES))
+    else:
+        JWTManager(app)
+
+    # Load the location of the hidden authorization configuration
+    authorization_config = configuration.get("env", {}).get("env_file_location")
 
     # load the hidden authorization configuration as environment variables
     try:
@@ -28,3 +45,122 @@ def configure_authorization(app):
 
     # Configure the error message key
     app.config["JWT_ERROR_MESSAGE_KEY"] = "message"
+
+
+# -------------------------------- #
+# Verified claims cache definition #
+# ------------------------------- #
+
+class ClaimsCache(object):
+    """Class implementing the cache of the verified JWT claims (LRU eviction, expiration by the token's exp)"""
+
+    def __init__(self, max_entries=DEFAULT_CLAIMS_CACHE_ENTRIES):
+        """
+        Initializes the ClaimsCache.
+
+        :param max_entries: maximum number of cached tokens, defaults to DEFAULT_CLAIMS_CACHE_ENTRIES
+        :type max_entries: int, optional
+        """
+        self.max_entries = max(int(max_entries), 1)
+
+        # Cached entries (token digest: (claims, expiration timestamp)) ordered from the least recently used
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @staticmethod
+    def make_key(encoded_token):
+        """Makes the cache key of the encoded token (the tokens themselves are not kept in memory)"""
+        return hashlib.blake2b(encoded_token.encode("utf8"), digest_size=20).digest()
+
+    def get(self, key):
+        """Returns the cached claims (or None if they are not cached or the token has expired)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] is not None and time.time() >= entry[1]:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[0])
+
+    def put(self, key, claims):
+        """Caches the verified claims until the token's exp (evicts the least recently used claims if needed)"""
+        with self._lock:
+            self._entries[key] = (dict(claims), claims.get("exp"))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Removes the cached claims with <key> (all claims if <key> is None)"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def statistics(self):
+        """Returns the cache statistics (hits, misses, entries)"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+# ------------------------------------ #
+# Caching JWT manager class definition #
+# ------------------------------------ #
+
+class CachingJWTManager(JWTManager):
+    """Class implementing the JWT manager that caches the verified claims of the decoded tokens"""
+
+    def __init__(self, app=None, max_entries=DEFAULT_CLAIMS_CACHE_ENTRIES, **kwargs):
+        """
+        Initializes the CachingJWTManager.
+
+        The decoding of a token (signature verification and validation of the
+        registered claims) is cached by the digest of the token until the
+        token's ``exp``, so the clients reusing one access token skip the
+        verification on the subsequent requests. Only the decoding is cached:
+        the token type, freshness and revocation (blocklist) checks are still
+        performed by ``flask_jwt_extended`` on every request.
+
+        :param app: Flask application, defaults to None
+        :type app: flask.Flask, optional
+        :param max_entries: maximum number of cached tokens, defaults to DEFAULT_CLAIMS_CACHE_ENTRIES
+        :type max_entries: int, optional
+        """
+        self.claims_cache = ClaimsCache(max_entries=max_entries)
+        super().__init__(app, **kwargs)
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        """Decodes the token (the verified claims are cached; the CSRF and expired-token decoding are not)"""
+
+        # Decode the token directly (the CSRF double submit and expired tokens are never cached)
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        # Get the cached claims
+        key = self.claims_cache.make_key(encoded_token)
+        claims = self.claims_cache.get(key)
+        if claims is not None:
+            return claims
+
+        # Decode and verify the token (raises for the invalid tokens, so they are never cached)
+        claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        # Cache the verified claims
+        self.claims_cache.put(key, claims)
+
+        # Return the claims
+        return claims
@@ -1,3 +1,8 @@
+import time
+import numpy
+import hashlib
+import threading
+from collections import OrderedDict
 from api.configuration import load_configuration
 
 
@@ -5,6 +10,8 @@ from api.configuration import load_configuration
 # Default caching attributes definition #
 # ------------------------------------- #
 DEFAULT_CACHING_TIME = 60
+DEFAULT_CACHE_ENTRIES = 1024
+DEFAULT_CACHE_SIZE_IN_BYTES = 64 * 1024 * 1024
 
 
 # ----------------------------------------- #
@@ -14,3 +21,137 @@ DEFAULT_CACHING_TIME = 60
 def configure_caching():
     """Configures the response caching"""
     return {key: value for key, value in load_configuration("caching.json").get("cache", {}).items()}
+
+
+# --------------------------- #
+# Prediction cache definition #
+# --------------------------- #
+
+class PredictionCache(object):
+    """Class implementing content-addressed prediction cache (LRU eviction by entries and bytes, TTL expiration)"""
+
+    def __init__(self,
+                 max_entries=DEFAULT_CACHE_ENTRIES,
+                 max_size_in_bytes=DEFAULT_CACHE_SIZE_IN_BYTES,
+                 expiration_time=DEFAULT_CACHING_TIME):
+        """
+        Initializes the PredictionCache.
+
+        :param max_entries: maximum number of cached predictions, defaults to DEFAULT_CACHE_ENTRIES
+        :type max_entries: int, optional
+        :param max_size_in_bytes: maximum total size of the cached predictions, defaults to DEFAULT_CACHE_SIZE_IN_BYTES
+        :type max_size_in_bytes: int, optional
+        :param expiration_time: time-to-live of the cached predictions in seconds, defaults to DEFAULT_CACHING_TIME
+        :type expiration_time: float, optional
+        """
+        self.max_entries = max(int(max_entries), 1)
+        self.max_size_in_bytes = max(int(max_size_in_bytes), 1)
+        self.expiration_time = expiration_time
+
+        # Cached entries (key: (predicted values, size in bytes, time of insertion)) ordered from the least recently used
+        self._entries = OrderedDict()
+        self._size_in_bytes = 0
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @staticmethod
+    def make_key(endpoint, predictor, values):
+        """
+        Makes the cache key of the prediction.
+
+        The key comprises the model identifier and its content hash (a deployed
+        model change creates new keys), the endpoint and the hash of the decoded
+        feature values (raw bytes, shape and dtype), so the same numbers sent in
+        a differently formatted request share the same entry.
+
+        :param endpoint: endpoint (predictor method) name
+        :type endpoint: str
+        :param predictor: predictor
+        :type predictor: api.ml.interface.Predictor
+        :param values: feature values
+        :type values: numpy.ndarray
+        :return: cache key (or None if the prediction cannot be cached)
+        :rtype: tuple
+        """
+
+        # Check if the prediction can be cached
+        if not isinstance(values, numpy.ndarray) or values.dtype.hasobject or not predictor.content_hash:
+            return None
+
+        # Hash the feature values (raw buffer of the C-contiguous array)
+        digest = hashlib.blake2b(memoryview(numpy.ascontiguousarray(values)).cast("B"), digest_size=20).hexdigest()
+
+        # Return the key
+        return predictor.identifier, predictor.content_hash, endpoint, digest, values.shape, values.dtype.str
+
+    def get(self, key):
+        """Returns the cached prediction (or None if it is not cached or it has expired)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self.expiration_time is not None and (time.monotonic() - entry[2]) > self.expiration_time:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, predicted):
+        """Caches the prediction (evicts the least recently used predictions if needed)"""
+
+        # Prepare the read-only copy of the prediction
+        predicted = numpy.array(predicted, copy=True)
+        predicted.setflags(write=False)
+        size = predicted.nbytes
+
+        # Skip the predictions that do not fit the cache at all
+        if size > self.max_size_in_bytes:
+            return
+
+        # Cache the prediction
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (predicted, size, time.monotonic())
+            self._size_in_bytes += size
+            while len(self._entries) > self.max_entries or self._size_in_bytes > self.max_size_in_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_model(self, identifier, *_):
+        """Removes all cached predictions of the model with <identifier>"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == identifier]:
+                self._remove(key)
+
+    def invalidate(self):
+        """Removes all cached predictions"""
+        with self._lock:
+            self._entries.clear()
+            self._size_in_bytes = 0
+
+    def statistics(self):
+        """Returns the cache statistics (hits, misses, evictions, size)"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size_in_bytes": self._size_in_bytes
+            }
+
+    def _remove(self, key):
+        """Removes the entry with <key> (must be called holding the lock)"""
+        self._size_in_bytes -= self._entries.pop(key)[1]
@@ -0,0 +1,180 @@
+import os
+import re
+import sys
+import hashlib
+import subprocess
+
+try:
+    from importlib import metadata
+except ImportError:
+    import importlib_metadata as metadata
+
+try:
+    from packaging.requirements import Requirement, InvalidRequirement
+except ImportError:
+    Requirement, InvalidRequirement = None, ValueError
+
+
+# ----------------------------------------- #
+# Dependency-specific exceptions definition #
+# ----------------------------------------- #
+class DependencyInstallationException(Exception): pass
+
+
+# ------------------------------ #
+# Requirement parsing definition #
+# ------------------------------ #
+
+# Simplified requirement specifier pattern (used if packaging is not available)
+requirement_pattern = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(\[[^\]]*\])?\s*([^;]*?)\s*(;.*)?$")
+
+
+class PredictorRequirement(object):
+    """Class implementing the predictor requirement (parsed requirement specifier)"""
+
+    def __init__(self, line):
+        """Initializes the PredictorRequirement (parses the requirement specifier)"""
+        self.line = line.strip()
+
+        # Parse the requirement specifier
+        if Requirement is not None:
+            requirement = Requirement(self.line)
+            self.name = requirement.name
+            self.specifier = requirement.specifier
+            self.marker = requirement.marker
+        else:
+            match = requirement_pattern.match(self.line)
+            if not match:
+                raise InvalidRequirement(f"Invalid requirement: '{self.line}'")
+            self.name = match.group(1)
+            self.specifier = match.group(3) or None
+            self.marker = None
+
+    def __repr__(self):
+        return self.line
+
+    def __str__(self):
+        return repr(self)
+
+    @property
+    def applicable(self):
+        """Checks if the requirement applies to the current environment (environment markers)"""
+        return self.marker is None or self.marker.evaluate()
+
+    @property
+    def satisfied(self):
+        """Checks if the requirement is satisfied by the installed distributions (without importing them)"""
+        try:
+            version = metadata.version(self.name)
+        except metadata.PackageNotFoundError:
+            return False
+        if not self.specifier or isinstance(self.specifier, str):
+            return True
+        return self.specifier.contains(version, prereleases=True)
+
+
+def parse_requirements(path):
+    """
+    Parses the requirements file (comments, options and blank lines are skipped).
+
+    :param path: path to the requirements file
+    :type path: str
+    :return: parsed requirements
+    :rtype: list
+    """
+
+    # Read the requirements
+    with open(path, "rt") as file:
+        lines = file.readlines()
+
+    # Parse the requirements
+    requirements = []
+    for line in lines:
+        line = line.split(" #")[0].strip()
+        if not line or line.startswith(("#", "-")):
+            continue
+        requirement = PredictorRequirement(line)
+        if requirement.applicable:
+            requirements.append(requirement)
+
+    # Return the parsed requirements
+    return requirements
+
+
+# ---------------------------------------- #
+# Dependency resolving routines definition #
+# ---------------------------------------- #
+
+def get_requirements_hash(path):
+    """Computes the hash of the requirements file and the Python environment"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        digest.update(file.read())
+    digest.update(sys.executable.encode("utf8"))
+    digest.update(sys.version.encode("utf8"))
+    return digest.hexdigest()
+
+
+def get_stamp_path(path):
+    """Returns the path to the stamp file of the verified requirements file"""
+    return os.path.join(os.path.dirname(os.path.abspath(path)), f".{os.path.basename(path)}.stamp")
+
+
+def is_verified(path):
+    """Checks if the requirements file was already verified (the stamp matches the requirements hash)"""
+    try:
+        with open(get_stamp_path(path), "rt") as file:
+            return file.read().strip() == get_requirements_hash(path)
+    except OSError:
+        return False
+
+
+def mark_verified(path):
+    """Stores the verified state of the requirements file (the stamp with the requirements hash)"""
+    try:
+        with open(get_stamp_path(path), "wt") as file:
+            file.write(get_requirements_hash(path))
+    except OSError:
+        pass
+
+
+def resolve_dependencies(path, install=True):
+    """
+    Resolves the dependencies specified in the requirements file.
+
+    The requirements are parsed (name, version specifier, environment marker)
+    and checked against the installed distributions via ``importlib.metadata``
+    (nothing is imported). If all requirements are satisfied, the stamp file
+    keyed on the requirements hash is stored, so the next start-up skips the
+    check entirely. The missing requirements are installed via ``pip`` only if
+    <install> is True (never in the production mode).
+
+    :param path: path to the requirements file
+    :type path: str
+    :param install: install the missing requirements, defaults to True
+    :type install: bool, optional
+    :return: missing (not installed) requirements
+    :rtype: list
+    """
+
+    # Skip the verified requirements
+    if not os.path.isfile(path) or is_verified(path):
+        return []
+
+    # Get the missing requirements
+    missing = [requirement for requirement in parse_requirements(path) if not requirement.satisfied]
+
+    # Install the missing requirements
+    if missing and install:
+        try:
+            subprocess.check_call([sys.executable, "-m", "pip", "install", *[str(r) for r in missing]])
+        except subprocess.CalledProcessError as e:
+            raise DependencyInstallationException(e)
+        missing = [requirement for requirement in missing if not requirement.satisfied]
+
+    # Store the verified state
+    if not missing:
+        mark_verified(path)
+
+    # Return the missing requirements
+    return missing
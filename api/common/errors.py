@@ -1,6 +1,7 @@
 from flask import jsonify, make_response
 from werkzeug import exceptions
 from marshmallow import ValidationError
+from sqlalchemy.exc import OperationalError, TimeoutError as DatabaseTimeoutError
 
 
 # ------------------------------------------ #
@@ -10,6 +11,8 @@ from api.ml.manager import NoLoadablePredictorException
 from api.wrappers.request import RequestWrappingException, RequestUnwrappingException
 from api.wrappers.response import ResponseWrappingException, ResponseUnwrappingException
 from api.wrappers.data import DataUnwrappingException, DataWrappingException
+from api.authentication.hashing import PasswordHashingBusyException
+from api.jobs.store import NoSuchJobException, JobNotFinishedException
 
 
 # -------------------------------------------------- #
@@ -27,6 +30,39 @@ errors_client_side = (
 )
 
 
+# ------------------------------------------------ #
+# Specifically handled not found errors definition #
+# ------------------------------------------------ #
+errors_not_found = (
+    NoSuchJobException,
+)
+
+
+# ----------------------------------------------- #
+# Specifically handled conflict errors definition #
+# ----------------------------------------------- #
+errors_conflict = (
+    JobNotFinishedException,
+)
+
+
+# ---------------------------------------------- #
+# Specifically handled unavailability definition #
+# ---------------------------------------------- #
+errors_unavailable = (
+    PasswordHashingBusyException,
+)
+
+
+# ------------------------------------------------------- #
+# Specifically handled database unavailability definition #
+# ------------------------------------------------------- #
+errors_database_unavailable = (
+    OperationalError,
+    DatabaseTimeoutError
+)
+
+
 # ---------------------------------- #
 # Error handling routines definition #
 # ---------------------------------- #
@@ -57,6 +93,21 @@ def handle_404_errors(error):
     return generate_error(error, 404)
 
 
+def handle_409_errors(error):
+    """Handles 409 errors in resources (conflicts with the current state of the resource)"""
+    return generate_error(error, 409)
+
+
+def handle_503_errors(error):
+    """Handles 503 errors in resources (temporarily overloaded services)"""
+    return generate_error(error, 503)
+
+
+def handle_database_errors(error):
+    """Handles 503 errors of the database (e.g. locked database or connection pool timeout; details not exposed)"""
+    return generate_error("", 503, message="Database temporarily unavailable, try again later")
+
+
 def handle_server_errors(error):
     """Handles all internal server errors"""
     return generate_error(error, 500, message="Internal server error: we are working to resolve the issue")
@@ -74,6 +125,18 @@ def register_errors(app):
     for error in errors_client_side:
         app.register_error_handler(error, handle_400_errors)
 
+    # Register the specifically handled not found and conflict errors
+    for error in errors_not_found:
+        app.register_error_handler(error, handle_404_errors)
+    for error in errors_conflict:
+        app.register_error_handler(error, handle_409_errors)
+
+    # Register the specifically handled unavailability errors
+    for error in errors_unavailable:
+        app.register_error_handler(error, handle_503_errors)
+    for error in errors_database_unavailable:
+        app.register_error_handler(error, handle_database_errors)
+
     @app.errorhandler(422)
     def handle_error(err):
         """Registers handling of 422 errors (handles webargs exceptions)"""
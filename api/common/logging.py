@@ -1,15 +1,35 @@
 import os
 import time
-import copy
+import queue
+import atexit
 import flask
+import numpy
+import random
+import hashlib
 import logging
 import importlib
+import multiprocessing
+import multiprocessing.queues
 from pathlib import Path
+from logging.handlers import QueueHandler, QueueListener
 from flask import has_request_context, request
 from flask.logging import default_handler
 from api.configuration import load_configuration, application_path
 
 
+# ------------------------------------- #
+# Default logging attributes definition #
+# ------------------------------------- #
+DEFAULT_PAYLOAD_MODE = "summary"
+DEFAULT_PAYLOAD_MAX_LENGTH = 1024
+DEFAULT_SAMPLING_RATE = 1.0
+
+
+# Background log writers (queue listeners) and their queues (owned by the process with the PID)
+listeners = []
+queues = []
+
+
 # ------------------------- #
 # Logger getting definition #
 # ------------------------- #
@@ -50,16 +70,29 @@ def configure_logging(app):
     set_application_logger(app)
 
 
+def configure_payload_logging():
+    """Configures the logging of the request/response payloads (truncation/summarization and sampling)"""
+    configuration = load_configuration("logging.json").get("payload", {})
+    return {
+        "mode": configuration.get("mode", DEFAULT_PAYLOAD_MODE),
+        "max_length": configuration.get("max_length", DEFAULT_PAYLOAD_MAX_LENGTH),
+        "sampling_rate": configuration.get("sampling_rate", DEFAULT_SAMPLING_RATE)
+    }
+
+
 # --------------------------- #
 # Logging routines definition #
 # --------------------------- #
 
-def set_application_logger(app):
-    """Sets the application logger"""
+def prepare_handler(config):
+    """
+    Prepares the logging handler specified in the logging configuration.
 
-    # Load the configuration
-    config = load_configuration("logging.json")["werkzeug"]
-    logger = logging.getLogger("werkzeug")
+    :param config: logging configuration of the handler (class and kwargs)
+    :type config: dict
+    :return: Handler instance
+    :rtype: logging.Handler
+    """
 
     # Update the filename of the logging directory to reflect the full path
     if config.get("kwargs", {}).get("filename"):
@@ -73,11 +106,105 @@ def set_application_logger(app):
     logger_class = getattr(importlib.import_module(logger_module), logger_class)
 
     # Prepare the handler
-    handler = logger_class(**config["kwargs"])
+    return logger_class(**config["kwargs"])
+
+
+def prepare_queued_handler(handler, formatter):
+    """
+    Prepares the queue-based handler that writes the records via <handler> in a background thread.
+
+    The records are formatted on the emitting (request) thread, so the request
+    context is still available, and the (slow) writing is done by the queue
+    listener. If ``queue.multiprocess`` is enabled in ``logging.json``, the
+    queue is a multiprocessing queue: the worker processes forked after the
+    logging is configured put the records into the queue of the parent
+    process and only the parent's listener writes (and rotates) the log file.
+
+    :param handler: handler that writes the records
+    :type handler: logging.Handler
+    :param formatter: formatter of the records
+    :type formatter: logging.Formatter
+    :return: Handler instance
+    :rtype: logging.Handler
+    """
+
+    # Load the configuration
+    config = load_configuration("logging.json").get("queue", {})
+
+    # Use the handler directly (synchronous writing)
+    if not config.get("enabled", True):
+        handler.setFormatter(formatter)
+        return handler
+
+    # Prepare the queue and the background log writer
+    records = multiprocessing.Queue(-1) if config.get("multiprocess", True) else queue.Queue(-1)
+    listener = QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    listeners.append((os.getpid(), listener))
+    queues.append(records)
+
+    # Write the records already formatted by the queue handler
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    # Prepare the queue handler
+    queue_handler = QueueHandler(records)
+    queue_handler.setLevel(handler.level)
+    queue_handler.setFormatter(formatter)
+
+    # Return the queue handler
+    return queue_handler
+
+
+@atexit.register
+def stop_listeners():
+    """Stops the background log writers of the process (writes the queued records)"""
+    while listeners:
+        pid, listener = listeners.pop()
+        if pid == os.getpid():
+            try:
+                listener.stop()
+            except Exception:
+                pass
+
+
+def reset_queues_after_fork():
+    """
+    Resets the multiprocessing queues in the forked process.
+
+    The queue of the parent process that has already put a record has its
+    feeder thread started; the thread does not exist in the forked process,
+    so the records put by the child would never be sent to the listener.
+    """
+    for records in queues:
+        if isinstance(records, multiprocessing.queues.Queue):
+            records._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_queues_after_fork)
+
+
+def close_queues():
+    """Flushes the records put into the multiprocessing queues (used by the forked processes before exiting)"""
+    for records in queues:
+        if isinstance(records, multiprocessing.queues.Queue):
+            records.close()
+            records.join_thread()
+
+
+def set_application_logger(app):
+    """Sets the application logger"""
+
+    # Load the configuration
+    config = load_configuration("logging.json")["werkzeug"]
+    logger = logging.getLogger("werkzeug")
+
+    # Prepare the handler
+    handler = prepare_handler(config)
 
     # Set the level and the formatter
     handler.setLevel(logging.INFO)
-    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    handler = prepare_queued_handler(handler, logging.Formatter("%(asctime)s %(message)s"))
     logger.addHandler(handler)
 
     # Register the handler
@@ -111,28 +238,14 @@ def get_request_logger():
     logger = logging.getLogger("request_logger")
     logger.setLevel(logging.DEBUG)
 
-    # Update the filename of the logging directory to reflect the full path
-    if config.get("kwargs", {}).get("filename"):
-        config["kwargs"]["filename"] = time.strftime(
-            os.path.join("logs", f"%Y_%m_%d_{config['kwargs']['filename']}"))
-
-    # Prepare the logging module and logger class name
-    logger_path = config["class"].split(".")
-    logger_module, logger_class = ".".join(logger_path[:-1]), logger_path[-1]
-
-    # Prepare the logging class
-    logger_class = getattr(importlib.import_module(logger_module), logger_class)
-
     # Prepare the handler
-    handler = logger_class(**config["kwargs"])
+    handler = prepare_handler(config)
 
     # Configure the formatter
     formatter = RequestFormatter("[%(asctime)s] %(remote_addr)s requested %(url)s in %(module)s: %(message)s")
-    handler.setFormatter(formatter)
 
     # Register the logger
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    logger.addHandler(prepare_queued_handler(handler, formatter))
 
     # Return the logger
     return logger
@@ -146,38 +259,82 @@ def get_response_logger():
     logger = logging.getLogger("response_logger")
     logger.setLevel(logging.DEBUG)
 
-    # Update the filename of the logging directory to reflect the full path
-    if config.get("kwargs", {}).get("filename"):
-        config["kwargs"]["filename"] = time.strftime(
-            os.path.join("logs", f"%Y_%m_%d_{config['kwargs']['filename']}"))
-
-    # Prepare the logging module and logger class name
-    logger_path = config["class"].split(".")
-    logger_module, logger_class = ".".join(logger_path[:-1]), logger_path[-1]
-
-    # Prepare the logging class
-    logger_class = getattr(importlib.import_module(logger_module), logger_class)
-
     # Prepare the handler
-    handler = logger_class(**config["kwargs"])
+    handler = prepare_handler(config)
 
     # Configure the formatter
     formatter = logging.Formatter("%(asctime)s, %(message)s")
-    handler.setFormatter(formatter)
 
     # Register the logger
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    logger.addHandler(prepare_queued_handler(handler, formatter))
 
     # Return the logger
     return logger
 
 
-def get_loggable_object(instance, identifier):
+def is_sampled(sampling_rate):
+    """Decides if the request/response is logged given the <sampling_rate>"""
+    return sampling_rate >= 1.0 or random.random() < sampling_rate
+
+
+def get_loggable_value(value, mode=DEFAULT_PAYLOAD_MODE, max_length=DEFAULT_PAYLOAD_MAX_LENGTH):
+    """
+    Returns the loggable value.
+
+    Modes:
+
+    - ``full``: the value is logged as it is
+    - ``truncate``: the strings longer than <max_length> are truncated
+    - ``summary``: the arrays are summarized by the shape, dtype and hash, the
+      strings longer than <max_length> are summarized by the length and hash
+
+    :param value: value to be logged
+    :type value: Any
+    :param mode: logging mode (full, truncate, summary), defaults to DEFAULT_PAYLOAD_MODE
+    :type mode: str, optional
+    :param max_length: maximum length of the logged strings, defaults to DEFAULT_PAYLOAD_MAX_LENGTH
+    :type max_length: int, optional
+    :return: loggable value
+    :rtype: Any
+    """
+
+    # Log the full value
+    if mode == "full":
+        return value
+
+    # Handle the nested values
+    if isinstance(value, dict):
+        return {k: get_loggable_value(v, mode, max_length) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if len(value) > max_length and mode == "summary":
+            return {"length": len(value)}
+        return [get_loggable_value(v, mode, max_length) for v in value[:max_length]]
+
+    # Handle the arrays
+    if isinstance(value, numpy.ndarray):
+        if mode == "summary":
+            return {
+                "shape": list(value.shape),
+                "dtype": str(value.dtype),
+                "hash": hashlib.sha1(numpy.ascontiguousarray(value).tobytes()).hexdigest()
+            }
+        value = repr(value)
+
+    # Handle the strings
+    if isinstance(value, str) and len(value) > max_length:
+        if mode == "summary":
+            return {"length": len(value), "hash": hashlib.sha1(value.encode("utf8")).hexdigest()}
+        return f"{value[:max_length]}... ({len(value)} characters)"
+
+    # Return the loggable value
+    return value
+
+
+def get_loggable_object(instance, identifier, mode=DEFAULT_PAYLOAD_MODE, max_length=DEFAULT_PAYLOAD_MAX_LENGTH):
     """Returns the loggable request/response objects"""
 
-    # Make a copy of the instance
-    loggable = copy.deepcopy(instance)
+    # Make a (shallow) loggable copy of the instance
+    loggable = dict(get_loggable_value(instance, mode, max_length))
 
     # Add the identifier
     loggable.update({"identifier": identifier})
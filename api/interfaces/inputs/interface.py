@@ -1,4 +1,5 @@
-from api.interfaces.inputs.schema import FeaturesSchema, PredictorModelSchema
+from api.interfaces.inputs.schema import FeaturesSchema, PredictorModelSchema, PredictorOutputsSchema
+from api.interfaces.inputs.utilities import FeaturesValuesDecoder
 from api.ml.manager import PredictorManager
 
 
@@ -12,6 +13,9 @@ class Features(object):
     # Define the schema
     schema = FeaturesSchema()
 
+    # Define the model-aware schemas (reused by the requests; keyed by the decoding of the features)
+    schemas = {FeaturesValuesDecoder.describe(None): schema}
+
     def __init__(self, values, labels):
         """Initializes the Features"""
         self.values = values
@@ -24,16 +28,31 @@ class Features(object):
         return repr(self)
 
     @classmethod
-    def from_request(cls, request):
+    def get_schema(cls, predictor=None):
+        """Returns the schema decoding the features for the <predictor> (model's dtype and number of features)"""
+        key = FeaturesValuesDecoder.describe(predictor)
+        schema = cls.schemas.get(key)
+        if schema is None:
+            schema = cls.schemas.setdefault(key, FeaturesSchema(decoder=FeaturesValuesDecoder(*key)))
+        return schema
+
+    @classmethod
+    def from_request(cls, request, predictor=None):
         """
         Creates the Features instance utilizing the schema.
 
+        If the <predictor> is given, the feature values are decoded straight
+        to the dtype the model expects and their shape is validated against
+        the model (see: ``api.interfaces.inputs.utilities.FeaturesValuesDecoder``).
+
         :param request: dict with the feature values and labels
         :type request: dict
+        :param predictor: predictor the features are prepared for, defaults to None
+        :type predictor: api.ml.interface.Predictor, optional
         :return: class instance
         :rtype: api.interfaces.inputs.Features
         """
-        return cls(**cls.schema.load(request))
+        return cls(**cls.get_schema(predictor).load(request))
 
 
 # ------------------------------------------ #
@@ -47,7 +66,8 @@ class PredictorModel(object):
     schema = PredictorModelSchema()
 
     def __init__(self, model):
-        """Initializes the PredictorModel"""
+        """Initializes the PredictorModel (resolves the ``<name>`` or ``<name>@<version>`` identifier via the registry)"""
+        self.identifier = model
         self.model = PredictorManager().load(model)
 
     def __repr__(self):
@@ -67,3 +87,39 @@ class PredictorModel(object):
         :rtype: api.interfaces.inputs.PredictorModel
         """
         return cls(**cls.schema.load(request))
+
+
+# -------------------------------------------- #
+# Input predictor outputs interface definition #
+# -------------------------------------------- #
+
+class PredictorOutputs(object):
+    """Class implementing the input predictor outputs (selected output sections) interface"""
+
+    # Define the schema
+    schema = PredictorOutputsSchema()
+
+    def __init__(self, outputs):
+        """Initializes the PredictorOutputs"""
+        self.outputs = outputs
+
+    def __repr__(self):
+        return str({"outputs": self.outputs})
+
+    def __str__(self):
+        return repr(self)
+
+    def __contains__(self, output):
+        return output in self.outputs
+
+    @classmethod
+    def from_request(cls, request):
+        """
+        Creates the PredictorOutputs instance utilizing the schema.
+
+        :param request: dict with the selected output sections
+        :type request: dict
+        :return: class instance
+        :rtype: api.interfaces.inputs.PredictorOutputs
+        """
+        return cls(**cls.schema.load(request))
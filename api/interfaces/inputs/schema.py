@@ -1,8 +1,26 @@
+import numpy
 import marshmallow
-from api.interfaces.inputs.utilities import FeaturesValuesValidator, FeaturesLabelsValidator
+from api.interfaces.inputs.utilities import FeaturesValuesDecoder, FeaturesLabelsValidator
 from api.wrappers.data import *
 
 
+# ------------------------------------- #
+# Input feature values field definition #
+# ------------------------------------- #
+
+class FeaturesValuesField(marshmallow.fields.Field):
+    """Class defining the feature values field (JSON-string, ndarray envelope, nested list or numpy.ndarray)"""
+
+    # Define the error messages
+    default_error_messages = {"invalid": "Not a valid string, ndarray envelope, list or numpy.array."}
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        """Deserializes the feature values (the values are decoded in the post-loading step)"""
+        if not isinstance(value, (str, dict, list, numpy.ndarray)):
+            raise self.make_error("invalid")
+        return value
+
+
 # ------------------------------------------ #
 # Input features interface schema definition #
 # ------------------------------------------ #
@@ -15,9 +33,14 @@ class FeaturesSchema(marshmallow.Schema):
         unknown = marshmallow.EXCLUDE
 
     # Define the schema attributes
-    values = marshmallow.fields.Str(required=True)
+    values = FeaturesValuesField(required=True)
     labels = marshmallow.fields.List(marshmallow.fields.String, missing=[])
 
+    def __init__(self, decoder=None, **kwargs):
+        """Initializes the FeaturesSchema (<decoder> decodes the feature values for the model)"""
+        super().__init__(**kwargs)
+        self.decoder = decoder or FeaturesValuesDecoder()
+
     @marshmallow.pre_load
     def _pre_load(self, data, **kwargs):
         """Handles the pre-loading data preparation and validation"""
@@ -36,11 +59,11 @@ class FeaturesSchema(marshmallow.Schema):
         """Handles the post-loading data preparation and validation"""
 
         # Get the attributes
-        values = DataWrapper.unwrap_data(data["values"])
+        values = data["values"]
         labels = data["labels"] or []
 
-        # Handle the feature values/labels
-        values = FeaturesValuesValidator.validate(values)
+        # Handle the feature values/labels (decoded straight to the model's dtype and validated)
+        values = self.decoder.decode(values)
         labels = FeaturesLabelsValidator.validate(labels, values)
 
         # Return the output data
@@ -60,3 +83,24 @@ class PredictorModelSchema(marshmallow.Schema):
 
     # Define the schema attributes
     model = marshmallow.fields.Str(required=True)
+
+
+# --------------------------------------------------- #
+# Input predictor outputs interface schema definition #
+# --------------------------------------------------- #
+
+class PredictorOutputsSchema(marshmallow.Schema):
+    """Class defining the schema for the predictor outputs (selected output sections) input interface"""
+
+    # Define the meta attributes
+    class Meta:
+        unknown = marshmallow.EXCLUDE
+
+    # Define the supported output sections
+    supported_outputs = ("predicted", "probabilities")
+
+    # Define the schema attributes
+    outputs = marshmallow.fields.List(
+        marshmallow.fields.String(validate=marshmallow.validate.OneOf(supported_outputs)),
+        validate=marshmallow.validate.Length(min=1),
+        missing=list(supported_outputs))
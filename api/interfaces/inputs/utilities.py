@@ -1,5 +1,6 @@
 import numpy
 import marshmallow
+from api.wrappers.data import DataWrapper
 
 
 class FeaturesValuesValidator(object):
@@ -28,6 +29,72 @@ class FeaturesValuesValidator(object):
         return values
 
 
+class FeaturesValuesDecoder(object):
+    """Class implementing the typed decoder of the feature values (model-aware dtype, shape and finiteness checks)"""
+
+    def __init__(self, dtype=None, n_features=None, allow_nan=False):
+        """
+        Initializes the FeaturesValuesDecoder.
+
+        :param dtype: dtype the model expects the feature values in, defaults to None (the dtype of the values)
+        :type dtype: numpy.dtype, optional
+        :param n_features: number of the features the model expects, defaults to None (not checked)
+        :type n_features: int, optional
+        :param allow_nan: allow the missing (NaN) feature values, defaults to False
+        :type allow_nan: bool, optional
+        """
+        self.dtype = dtype
+        self.n_features = n_features
+        self.allow_nan = allow_nan
+
+    @staticmethod
+    def describe(predictor):
+        """Describes the decoding of the features of the <predictor> or model signature (dtype, features, NaN)"""
+        if predictor is None:
+            return None, None, False
+        return predictor.features_dtype, predictor.n_features, predictor.allows_nan
+
+    def decode(self, values):
+        """
+        Decodes the feature values straight to the contiguous numpy.ndarray of the model's dtype and validates them.
+
+        The values are rejected before the inference if they are not
+        2-dimensional (subjects x features) or the number of the features does
+        not match the model's ``n_features_in_`` (if known), or if they contain
+        the non-finite values (NaN is allowed for the models allowing it).
+
+        :param values: values to be decoded (JSON-string, ndarray envelope, nested list or numpy.ndarray)
+        :type values: Any
+        :return: decoded values
+        :rtype: numpy.ndarray
+        """
+
+        # Decode and validate the feature values
+        values = FeaturesValuesValidator.validate(
+            DataWrapper.unwrap_typed_data(values, self.dtype) if values is not None else None)
+
+        # Validate the shape of the feature values
+        if self.n_features is not None:
+            if values.ndim != 2:
+                raise marshmallow.ValidationError(
+                    f"Not a valid shape {values.shape}. The model expects 2-dimensional features "
+                    f"(subjects x {self.n_features} features).", "features.values")
+            if values.shape[1] != self.n_features:
+                raise marshmallow.ValidationError(
+                    f"Not a valid number of features ({values.shape[1]}). The model expects "
+                    f"{self.n_features} features.", "features.values")
+
+        # Validate the finiteness of the feature values
+        if values.dtype.kind in "fc":
+            if self.allow_nan and numpy.isinf(values).any():
+                raise marshmallow.ValidationError("Not a valid numpy.array (infinite values).", "features.values")
+            if not self.allow_nan and not numpy.isfinite(values).all():
+                raise marshmallow.ValidationError("Not a valid numpy.array (non-finite values).", "features.values")
+
+        # Return the decoded feature values
+        return values
+
+
 class FeaturesLabelsValidator(object):
     """Class implementing validator for the feature labels"""
 
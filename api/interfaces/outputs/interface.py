@@ -1,4 +1,5 @@
-from api.interfaces.outputs.schema import PredictionsSchema
+from api.interfaces.outputs.schema import PredictionsSchema, CombinedPredictionsSchema
+from api.wrappers.data import DataWrapper
 
 
 # -------------------------------------- #
@@ -8,8 +9,11 @@ from api.interfaces.outputs.schema import PredictionsSchema
 class Predictions(object):
     """Class implementing the output predictions interface"""
 
-    # Define the schema
-    schema = PredictionsSchema()
+    # Define the schemas (keyed by the response format)
+    schemas = {
+        response_format: PredictionsSchema(response_format)
+        for response_format in DataWrapper.data_formats}
+    schema = schemas["json"]
 
     def __init__(self, predicted):
         """Initializes the Predictions"""
@@ -21,6 +25,35 @@ class Predictions(object):
     def __str__(self):
         return repr(self)
 
-    def to_response(self):
-        """Dumps the predictions to the data to be used in the response"""
-        return self.schema.dump(self)
+    def to_response(self, response_format="json"):
+        """Dumps the predictions to the data to be used in the response (in the <response_format>)"""
+        return self.schemas[response_format].dump(self)
+
+
+# ------------------------------------------------ #
+# Output combined predictions interface definition #
+# ------------------------------------------------ #
+
+class CombinedPredictions(object):
+    """Class implementing the output combined predictions (classes and probabilities) interface"""
+
+    # Define the schemas (keyed by the response format)
+    schemas = {
+        response_format: CombinedPredictionsSchema(response_format)
+        for response_format in DataWrapper.data_formats}
+    schema = schemas["json"]
+
+    def __init__(self, predicted=None, probabilities=None):
+        """Initializes the CombinedPredictions"""
+        self.predicted = predicted
+        self.probabilities = probabilities
+
+    def __repr__(self):
+        return str({"predicted": self.predicted, "probabilities": self.probabilities})
+
+    def __str__(self):
+        return repr(self)
+
+    def to_response(self, response_format="json"):
+        """Dumps the predictions to the data to be used in the response (in the <response_format>)"""
+        return self.schemas[response_format].dump(self)
@@ -15,8 +15,13 @@ class PredictionsSchema(marshmallow.Schema):
     class Meta:
         unknown = marshmallow.EXCLUDE
 
-    # Define the schema attributes
-    predicted = marshmallow.fields.Str(required=True)
+    # Define the schema attributes (the predicted values are wrapped in the response format)
+    predicted = marshmallow.fields.Raw(required=True)
+
+    def __init__(self, response_format="json", **kwargs):
+        """Initializes the PredictionsSchema (the predicted values are wrapped in the <response_format>)"""
+        super().__init__(**kwargs)
+        self.response_format = response_format
 
     @marshmallow.pre_dump
     def _pre_dump(self, instance, **kwargs):
@@ -27,7 +32,49 @@ class PredictionsSchema(marshmallow.Schema):
             raise marshmallow.ValidationError("Not a valid numpy.array.", "predicted.values")
 
         # Handle the predictions
-        instance.predicted = DataWrapper.wrap_data(PredictedValuesValidator.validate(instance.predicted))
+        instance.predicted = DataWrapper.wrap_formatted_data(
+            PredictedValuesValidator.validate(instance.predicted), self.response_format)
 
         # Return the output data
         return {"predicted": instance.predicted}
+
+
+# ------------------------------------------------ #
+# Output combined predictions interface definition #
+# ------------------------------------------------ #
+
+class CombinedPredictionsSchema(marshmallow.Schema):
+    """Class defining the schema for the combined predictions (classes and probabilities) output interface"""
+
+    # Define the meta attributes
+    class Meta:
+        unknown = marshmallow.EXCLUDE
+
+    # Define the schema attributes (the predicted values are wrapped in the response format)
+    predicted = marshmallow.fields.Raw()
+    probabilities = marshmallow.fields.Raw()
+
+    def __init__(self, response_format="json", **kwargs):
+        """Initializes the CombinedPredictionsSchema (the predicted values are wrapped in the <response_format>)"""
+        super().__init__(**kwargs)
+        self.response_format = response_format
+
+    @marshmallow.pre_dump
+    def _pre_dump(self, instance, **kwargs):
+        """Handles the pre-dumping data preparation and validation"""
+
+        # Prepare the output data (only the selected output sections)
+        data = {}
+
+        # Handle the predictions
+        for field in ("predicted", "probabilities"):
+            values = getattr(instance, field)
+            if values is None:
+                continue
+            if not isinstance(values, numpy.ndarray):
+                raise marshmallow.ValidationError("Not a valid numpy.array.", f"{field}.values")
+            values = PredictedValuesValidator.validate(values)
+            data[field] = DataWrapper.wrap_formatted_data(values, self.response_format)
+
+        # Return the output data
+        return data
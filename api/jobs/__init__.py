@@ -0,0 +1,39 @@
+import os
+from pathlib import Path
+from api.configuration import load_configuration
+
+
+# ---------------------------------- #
+# Default jobs attributes definition #
+# ---------------------------------- #
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_JOB_CHUNK_SIZE = 10000
+DEFAULT_JOB_EXPIRATION_TIME = 24 * 60 * 60
+DEFAULT_JOB_CLEANUP_INTERVAL = 5 * 60
+
+
+# -------------------------------------- #
+# Jobs configuration routines definition #
+# -------------------------------------- #
+
+def configure_jobs():
+    """Configures the asynchronous batch-scoring jobs"""
+
+    # Get the configuration
+    configuration = load_configuration("jobs.json").get("jobs", {})
+
+    # Get the location of the jobs
+    jobs_location = configuration.get("location")
+    jobs_location = jobs_location or os.path.join(os.path.dirname(os.path.realpath(__file__)), "data")
+
+    # Make sure the location of the jobs exists
+    Path(jobs_location).mkdir(parents=True, exist_ok=True)
+
+    # Return the configuration
+    return {
+        "location": jobs_location,
+        "workers": configuration.get("workers", DEFAULT_JOB_WORKERS),
+        "chunk_size": configuration.get("chunk_size", DEFAULT_JOB_CHUNK_SIZE),
+        "expiration_time": configuration.get("expiration_time_in_seconds", DEFAULT_JOB_EXPIRATION_TIME),
+        "cleanup_interval": configuration.get("cleanup_interval_in_seconds", DEFAULT_JOB_CLEANUP_INTERVAL)
+    }
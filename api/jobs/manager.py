@@ -0,0 +1,205 @@
+import os
+import time
+import numpy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from api.jobs import configure_jobs
+from api.jobs.store import JobStore, QUEUED, RUNNING, FINISHED, FAILED, CANCELLED, FINAL_STATUSES
+from api.interfaces.inputs.interface import Features
+from api.ml.manager import PredictorManager
+
+
+# ---------------------------- #
+# Job manager class definition #
+# ---------------------------- #
+
+class JobManager(object):
+    """Class implementing the manager of the asynchronous batch-scoring jobs"""
+
+    # Configuration for the jobs
+    configuration = configure_jobs()
+
+    # Job store (shared by all worker processes)
+    store = JobStore(configuration["location"])
+
+    # Job worker pool (created lazily by the process that processes the jobs, so it is not inherited by forking)
+    _executor = None
+    _executor_pid = None
+    _last_cleanup = 0.0
+    _lock = threading.Lock()
+
+    def submit(self, model_identifier, method, features):
+        """
+        Submits the job (the prediction of the <features> by the <method> of the model).
+
+        :param model_identifier: model identifier
+        :type model_identifier: str
+        :param method: predictor method (predict, predict_proba)
+        :type method: str
+        :param features: features
+        :type features: api.interfaces.inputs.Features
+        :return: job state
+        :rtype: dict
+        """
+
+        # Remove the expired jobs
+        self.cleanup()
+
+        # Create and enqueue the job
+        state = self.store.create(model_identifier, method, features.values, labels=features.labels)
+        self._get_executor().submit(self.process, state["job"])
+
+        # Return the job state
+        return state
+
+    def status(self, job_identifier):
+        """Returns the state of the job (the jobs of the dead processes are reported as failed)"""
+
+        # Remove the expired jobs
+        self.cleanup()
+
+        # Get the state
+        state = self.store.read_state(job_identifier)
+
+        # Handle the jobs interrupted by the death of the processing worker
+        if state["status"] not in FINAL_STATUSES and not self._is_alive(state["pid"]):
+            state = self._finish(job_identifier, FAILED, message="The job was interrupted")
+
+        # Return the state
+        return state
+
+    def result(self, job_identifier):
+        """Returns the results of the finished job"""
+        self.status(job_identifier)
+        return self.store.read_result(job_identifier)
+
+    def cancel(self, job_identifier):
+        """Cancels the queued/running job (the job in the final status is removed)"""
+        state = self.status(job_identifier)
+        if state["status"] in FINAL_STATUSES:
+            self.store.remove(job_identifier)
+            return {**state, "status": "removed"}
+        self.store.request_cancel(job_identifier)
+        if state["status"] == QUEUED:
+            return self._finish(job_identifier, CANCELLED)
+        return state
+
+    def process(self, job_identifier):
+        """
+        Processes the job (predicts the features chunk by chunk).
+
+        The features are memory-mapped and predicted in chunks of
+        ``chunk_size`` subjects; the predictions are written into the
+        memory-mapped results and the progress is stored after each chunk,
+        so the memory is bounded by the chunk size. The cancellation is
+        checked before each chunk.
+
+        :param job_identifier: job identifier
+        :type job_identifier: str
+        :return: None
+        :rtype: None type
+        """
+        try:
+
+            # Check if the job was cancelled before it started
+            state = self.store.read_state(job_identifier)
+            if state["status"] != QUEUED or self.store.is_cancel_requested(job_identifier):
+                return
+
+            # Start the job
+            state = self.store.update_state(job_identifier, status=RUNNING, started_on=time.time(), pid=os.getpid())
+
+            # Load the predictor and the features
+            predictor = PredictorManager().load(state["model"])
+            values = self.store.read_features(job_identifier)
+            chunk_size = max(int(self.configuration["chunk_size"]), 1)
+
+            # Predict the features chunk by chunk
+            result = None
+            for start in range(0, len(values), chunk_size):
+
+                # Handle the cancellation
+                if self.store.is_cancel_requested(job_identifier):
+                    self._finish(job_identifier, CANCELLED)
+                    return
+
+                # Predict the chunk
+                chunk = numpy.array(values[start:start + chunk_size])
+                predicted = getattr(predictor, state["method"])(Features(chunk, state["labels"]))
+
+                # Write the predictions
+                if result is None:
+                    result = self.store.create_result(
+                        job_identifier,
+                        (len(values), *predicted.shape[1:]),
+                        predicted.dtype,
+                        labels=predictor.signature.classes)
+                result[start:start + len(predicted)] = predicted
+
+                # Store the progress
+                self.store.update_state(job_identifier, progress={"processed": start + len(chunk), "total": len(values)})
+
+            # Finish the job
+            if result is not None:
+                result.flush()
+                del result
+            self._finish(job_identifier, FINISHED)
+
+        # Handle the failed jobs
+        except Exception as e:
+            try:
+                self._finish(job_identifier, FAILED, message=str(e))
+            except Exception:
+                pass
+
+    def cleanup(self, force=False):
+        """Removes the expired jobs (at most once per the cleanup interval)"""
+        now = time.time()
+        with self._lock:
+            if not force and now - JobManager._last_cleanup < self.configuration["cleanup_interval"]:
+                return
+            JobManager._last_cleanup = now
+        for job_identifier in self.store.identifiers():
+            try:
+                state = self.store.read_state(job_identifier)
+            except Exception:
+                continue
+            if state.get("expires_on") is not None and state["expires_on"] <= now:
+                self.store.remove(job_identifier)
+
+    def _finish(self, job_identifier, status, message=None):
+        """Finishes the job with the final <status> (the job expires after the expiration time)"""
+        finished_on = time.time()
+        expiration_time = self.configuration["expiration_time"]
+        self.store.remove_features(job_identifier)
+        return self.store.update_state(
+            job_identifier,
+            status=status,
+            message=message,
+            finished_on=finished_on,
+            expires_on=finished_on + expiration_time if expiration_time is not None else None)
+
+    @classmethod
+    def _get_executor(cls):
+        """Returns the job worker pool of the current process"""
+        with cls._lock:
+            if cls._executor is None or cls._executor_pid != os.getpid():
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=max(int(cls.configuration["workers"]), 1),
+                    thread_name_prefix="job")
+                cls._executor_pid = os.getpid()
+            return cls._executor
+
+    @staticmethod
+    def _is_alive(pid):
+        """Checks if the process with <pid> is alive"""
+        if pid == os.getpid():
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import uuid
+import numpy
+import shutil
+import tempfile
+from numpy.lib.format import open_memmap
+
+
+# ---------------------------------- #
+# Job-specific exceptions definition #
+# ---------------------------------- #
+class NoSuchJobException(Exception): pass
+class JobNotFinishedException(Exception): pass
+
+
+# ----------------------- #
+# Job statuses definition #
+# ----------------------- #
+QUEUED = "queued"
+RUNNING = "running"
+FINISHED = "finished"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Final statuses (the job is not processed anymore)
+FINAL_STATUSES = (FINISHED, FAILED, CANCELLED)
+
+
+# ------------------------------- #
+# Encoded result class definition #
+# ------------------------------- #
+
+class EncodedResult(object):
+    """Class implementing the results of a job with the non-numeric values (stored as the indices of the labels)"""
+
+    def __init__(self, indices, path, labels=None):
+        """
+        Initializes the EncodedResult.
+
+        :param indices: memory-mapped indices of the labels
+        :type indices: numpy.memmap
+        :param path: path to the labels (JSON list written on flush)
+        :type path: str
+        :param labels: known labels, defaults to None
+        :type labels: list, optional
+        """
+        self.indices = indices
+        self.path = path
+        self.labels = {label: index for index, label in enumerate(labels or [])}
+
+    def __setitem__(self, key, values):
+        values = numpy.asarray(values, dtype=object)
+        self.indices[key] = numpy.fromiter(
+            (self.labels.setdefault(value, len(self.labels)) for value in values.ravel()),
+            dtype=numpy.int64, count=values.size).reshape(values.shape)
+
+    def flush(self):
+        """Flushes the indices and writes the labels (atomically)"""
+        self.indices.flush()
+        descriptor, path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wt") as file:
+                json.dump(list(self.labels), file)
+            os.replace(path, self.path)
+        except BaseException:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+
+
+# -------------------------- #
+# Job store class definition #
+# -------------------------- #
+
+class JobStore(object):
+    """Class implementing the on-disk store of the jobs (state, features and results)"""
+
+    # File names of the job data
+    state_filename = "state.json"
+    features_filename = "features.npy"
+    result_filename = "result.npy"
+    labels_filename = "labels.json"
+    cancel_filename = "cancel"
+
+    def __init__(self, location):
+        """
+        Initializes the JobStore.
+
+        Each job is stored in its own directory at <location>: the state (JSON
+        replaced atomically on each update), the feature values and the results
+        (``.npy``, written chunk by chunk via memory-mapping; the non-numeric
+        results are stored as the indices of the labels, see:
+        ``EncodedResult``) and the cancellation marker. The store is shared by all worker processes, so
+        a job submitted to one process can be polled or cancelled via another.
+
+        :param location: location of the jobs
+        :type location: str
+        """
+        self.location = location
+
+    def path(self, job_identifier, filename=None):
+        """Returns the path to the directory (or the file with <filename>) of the job"""
+        if not job_identifier or not all(c in "0123456789abcdef" for c in job_identifier):
+            raise NoSuchJobException(f"Job with identifier '{job_identifier}' does not exist")
+        path = os.path.join(self.location, job_identifier)
+        return os.path.join(path, filename) if filename else path
+
+    def create(self, model_identifier, method, values, labels=None):
+        """
+        Creates the queued job.
+
+        :param model_identifier: model identifier
+        :type model_identifier: str
+        :param method: predictor method (predict, predict_proba)
+        :type method: str
+        :param values: feature values
+        :type values: numpy.ndarray
+        :param labels: feature labels, defaults to None
+        :type labels: list, optional
+        :return: job state
+        :rtype: dict
+        """
+
+        # Prepare the job directory
+        job_identifier = uuid.uuid4().hex
+        os.makedirs(self.path(job_identifier))
+
+        # Store the feature values
+        numpy.save(self.path(job_identifier, self.features_filename), numpy.asarray(values), allow_pickle=False)
+
+        # Store the state
+        state = {
+            "job": job_identifier,
+            "model": model_identifier,
+            "method": method,
+            "labels": labels or [],
+            "status": QUEUED,
+            "progress": {"processed": 0, "total": len(values)},
+            "message": None,
+            "pid": os.getpid(),
+            "created_on": time.time(),
+            "started_on": None,
+            "finished_on": None,
+            "expires_on": None
+        }
+        self.write_state(state)
+
+        # Return the state
+        return state
+
+    def read_state(self, job_identifier):
+        """Reads the state of the job"""
+        try:
+            with open(self.path(job_identifier, self.state_filename), "rt") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            raise NoSuchJobException(f"Job with identifier '{job_identifier}' does not exist")
+
+    def write_state(self, state):
+        """Writes the state of the job (atomically, the readers never see a partially written state)"""
+        descriptor, path = tempfile.mkstemp(dir=self.path(state["job"]), suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wt") as file:
+                json.dump(state, file)
+            os.replace(path, self.path(state["job"], self.state_filename))
+        except BaseException:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+
+    def update_state(self, job_identifier, **kwargs):
+        """Updates the state of the job"""
+        state = self.read_state(job_identifier)
+        state.update(kwargs)
+        self.write_state(state)
+        return state
+
+    def read_features(self, job_identifier):
+        """Reads the feature values of the job (memory-mapped, so only the processed chunk is loaded)"""
+        return numpy.load(self.path(job_identifier, self.features_filename), mmap_mode="r", allow_pickle=False)
+
+    def create_result(self, job_identifier, shape, dtype, labels=None):
+        """
+        Creates the (memory-mapped) results of the job.
+
+        The object arrays (e.g. the string class labels) cannot be
+        memory-mapped (nor stored without pickling), so their values are
+        stored as the memory-mapped indices of the labels (the known <labels>,
+        e.g. the classes of the model, followed by the other values in the
+        order they are written) and the labels are stored as JSON.
+
+        :param job_identifier: job identifier
+        :type job_identifier: str
+        :param shape: shape of the results
+        :type shape: tuple
+        :param dtype: dtype of the results
+        :type dtype: numpy.dtype
+        :param labels: known labels of the non-numeric results, defaults to None
+        :type labels: list, optional
+        :return: memory-mapped results
+        :rtype: numpy.memmap or api.jobs.store.EncodedResult
+        """
+        path = self.path(job_identifier, self.result_filename)
+        if numpy.dtype(dtype).hasobject:
+            indices = open_memmap(path, mode="w+", dtype=numpy.int64, shape=shape)
+            return EncodedResult(indices, self.path(job_identifier, self.labels_filename), labels)
+        return open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+    def read_result(self, job_identifier):
+        """Reads the results of the finished job (the stored indices of the labels are decoded to the labels)"""
+        state = self.read_state(job_identifier)
+        if state["status"] != FINISHED:
+            raise JobNotFinishedException(f"Job with identifier '{job_identifier}' is {state['status']}")
+        result = numpy.load(self.path(job_identifier, self.result_filename), allow_pickle=False)
+        if os.path.exists(self.path(job_identifier, self.labels_filename)):
+            with open(self.path(job_identifier, self.labels_filename), "rt") as file:
+                labels = json.load(file)
+            decoded = numpy.empty(len(labels), dtype=object)
+            decoded[:] = labels
+            return decoded[result]
+        return result
+
+    def request_cancel(self, job_identifier):
+        """Requests the cancellation of the job (the marker is checked by the processing worker per chunk)"""
+        self.read_state(job_identifier)
+        open(self.path(job_identifier, self.cancel_filename), "wb").close()
+
+    def is_cancel_requested(self, job_identifier):
+        """Checks if the cancellation of the job was requested"""
+        return os.path.exists(self.path(job_identifier, self.cancel_filename))
+
+    def remove(self, job_identifier):
+        """Removes the job (state, features and results)"""
+        shutil.rmtree(self.path(job_identifier), ignore_errors=True)
+
+    def remove_features(self, job_identifier):
+        """Removes the feature values of the job (not needed after the job is processed)"""
+        try:
+            os.remove(self.path(job_identifier, self.features_filename))
+        except OSError:
+            pass
+
+    def identifiers(self):
+        """Lists the identifiers of the stored jobs"""
+        try:
+            return [entry.name for entry in os.scandir(self.location) if entry.is_dir()]
+        except OSError:
+            return []
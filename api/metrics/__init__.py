@@ -0,0 +1,402 @@
+import os
+import json
+import time
+import atexit
+import uuid
+import shutil
+import tempfile
+import threading
+import contextlib
+from pathlib import Path
+from api.configuration import load_configuration
+
+
+# ------------------------------------- #
+# Default metrics attributes definition #
+# ------------------------------------- #
+DEFAULT_METRICS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_METRICS_FLUSH_INTERVAL = 1.0
+DEFAULT_METRICS_RUN_EXPIRATION = 86400.0
+
+# Name of the file with the metrics of the dead processes of the server run
+RETIRED_METRICS_FILE = "retired.json"
+
+# Prefix of the exposed metrics
+METRICS_PREFIX = "predictor_api"
+
+# Exposed metrics (name: (type, help))
+METRICS = {
+    "requests_total": ("counter", "Number of the processed requests"),
+    "request_duration_seconds": ("histogram", "Duration of the request workflow"),
+    "stage_duration_seconds": ("histogram", "Duration of the stages of the request workflow")
+}
+
+
+# ----------------------------------------- #
+# Metrics configuration routines definition #
+# ----------------------------------------- #
+
+def configure_metrics():
+    """Configures the metrics"""
+
+    # Get the configuration
+    configuration = load_configuration("metrics.json").get("metrics", {})
+
+    # Get the location of the per-process metrics
+    metrics_location = configuration.get("location")
+    metrics_location = metrics_location or os.path.join(os.path.dirname(os.path.realpath(__file__)), "data")
+
+    # Return the configuration
+    return {
+        "enabled": configuration.get("enabled", True),
+        "location": metrics_location,
+        "flush_interval": configuration.get("flush_interval_in_seconds", DEFAULT_METRICS_FLUSH_INTERVAL),
+        "run_expiration": configuration.get("run_expiration_in_seconds", DEFAULT_METRICS_RUN_EXPIRATION),
+        "buckets": tuple(sorted(configuration.get("buckets") or DEFAULT_METRICS_BUCKETS))
+    }
+
+
+# --------------------------- #
+# Metrics registry definition #
+# --------------------------- #
+
+class MetricsRegistry(object):
+    """Class implementing the registry of the metrics (counters and histograms) aggregated across the processes"""
+
+    def __init__(self, location, buckets=DEFAULT_METRICS_BUCKETS, flush_interval=DEFAULT_METRICS_FLUSH_INTERVAL,
+                 run_expiration=DEFAULT_METRICS_RUN_EXPIRATION):
+        """
+        Initializes the MetricsRegistry.
+
+        The metrics are recorded in-memory by each process and flushed every
+        <flush_interval> seconds to the per-process file (named by the PID)
+        in the directory of the server run at <location> (each server run
+        has its own directory, so the servers sharing the location do not
+        interfere). The exposition reads and sums the files of all processes
+        of the run, which makes the metrics correct for the pre-forked workers
+        regardless of the worker that serves the ``/metrics`` request. The
+        files of the dead processes are merged into the single retired file
+        of the run (so the counters never decrease), and the directories of
+        the runs not updated for <run_expiration> seconds are removed.
+
+        :param location: location of the directories of the server runs
+        :type location: str
+        :param buckets: upper bounds of the histogram buckets in seconds, defaults to DEFAULT_METRICS_BUCKETS
+        :type buckets: tuple, optional
+        :param flush_interval: flushing interval in seconds, defaults to DEFAULT_METRICS_FLUSH_INTERVAL
+        :type flush_interval: float, optional
+        :param run_expiration: expiration of the stale server runs in seconds, defaults to
+            DEFAULT_METRICS_RUN_EXPIRATION
+        :type run_expiration: float, optional
+        """
+        self.location = location
+        self.buckets = tuple(buckets)
+        self.flush_interval = flush_interval
+        self.run_expiration = run_expiration
+
+        # Location of the per-process metrics files of the server run (set by the reset)
+        self.run_location = location
+
+        # Metrics of the process (key: (name, labels); counters: value, histograms: [bucket counts, sum, count])
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+        # Process that records the metrics (the forked process starts with the empty metrics) and its identifier
+        # (unique across the PID reuse)
+        self._pid = None
+        self._process = None
+
+    def reset(self):
+        """
+        Starts the metrics of the server run (called once at the start-up, before the workers are forked).
+
+        The run gets its own directory at the location (the metrics of the
+        other servers sharing the location are kept), and the directories of
+        the expired runs are removed.
+
+        :return: None
+        :rtype: None type
+        """
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._pid = None
+
+        # Remove the directories of the expired runs
+        now = time.time()
+        for entry in os.scandir(self.location) if os.path.isdir(self.location) else []:
+            try:
+                if entry.is_dir() and now - entry.stat().st_mtime > self.run_expiration:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            except OSError:
+                continue
+
+        # Create the directory of the run
+        self.run_location = os.path.join(self.location, f"{os.getpid()}-{uuid.uuid4().hex[:8]}")
+        Path(self.run_location).mkdir(parents=True, exist_ok=True)
+
+    def inc(self, name, labels, value=1):
+        """Increments the counter <name> with <labels>"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._ensure_process()
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        """Observes the <value> in the histogram <name> with <labels>"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._ensure_process()
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][i] += 1
+                    break
+            histogram[1] += value
+            histogram[2] += 1
+
+    def snapshot(self):
+        """Returns the snapshot of the metrics of the process"""
+        with self._lock:
+            return {
+                "process": self._process,
+                "buckets": list(self.buckets),
+                "counters": [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                "histograms": [
+                    [name, list(labels), list(counts), total, count]
+                    for (name, labels), (counts, total, count) in self._histograms.items()]
+            }
+
+    def flush(self):
+        """Writes the metrics of the process to its file (atomically)"""
+        if self._pid != os.getpid() or (not self._counters and not self._histograms):
+            return
+        self._write(f"{os.getpid()}.json", self.snapshot())
+
+    def retire(self, pid):
+        """
+        Merges the metrics file of the dead process with <pid> into the retired file of the run.
+
+        It is called by the supervisor (the single writer of the retired
+        file) once the process has been reaped. The retired file lists the
+        merged processes, so the collection that still finds the file of the
+        process counts it once.
+
+        :param pid: PID of the dead process
+        :type pid: int
+        :return: None
+        :rtype: None type
+        """
+        path = os.path.join(self.run_location, f"{pid}.json")
+        snapshot = self._read(path)
+        if snapshot is None:
+            return
+
+        # Merge the metrics of the process into the retired metrics and remove its file
+        counters, histograms, retired = self._read_retired()
+        if snapshot.get("process") not in retired:
+            self._merge(snapshot, counters, histograms)
+            retired.add(snapshot.get("process"))
+            self._write(RETIRED_METRICS_FILE, {
+                "buckets": list(self.buckets),
+                "processes": sorted(process for process in retired if process),
+                "counters": [[name, list(labels), value] for (name, labels), value in counters.items()],
+                "histograms": [
+                    [name, list(labels), list(counts), total, count]
+                    for (name, labels), (counts, total, count) in histograms.items()]
+            })
+        with contextlib.suppress(OSError):
+            os.remove(path)
+
+    def collect(self):
+        """Collects the metrics of all processes of the run (sums the counters and the histograms)"""
+
+        # Flush the metrics of the process (the other processes flush them periodically)
+        self.flush()
+
+        # Read the metrics of the live processes
+        snapshots = []
+        for entry in os.scandir(self.run_location) if os.path.isdir(self.run_location) else []:
+            if entry.name.endswith(".json") and entry.name != RETIRED_METRICS_FILE:
+                snapshot = self._read(entry.path)
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+
+        # Sum the metrics of the live processes with the retired metrics (read last, so the processes retired in
+        # the meantime are skipped rather than counted twice or missed)
+        counters, histograms, retired = self._read_retired()
+        for snapshot in snapshots:
+            if snapshot.get("process") not in retired:
+                self._merge(snapshot, counters, histograms)
+
+        # Return the aggregated metrics
+        return counters, histograms
+
+    def expose(self):
+        """Exposes the metrics of all processes in the Prometheus text format"""
+        counters, histograms = self.collect()
+        lines = []
+        for name, (kind, description) in METRICS.items():
+            metric = f"{METRICS_PREFIX}_{name}"
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} {kind}")
+            if kind == "counter":
+                for (counter_name, labels), value in sorted(counters.items()):
+                    if counter_name == name:
+                        lines.append(f"{metric}{format_labels(labels)} {format_value(value)}")
+            else:
+                for (histogram_name, labels), (counts, total, count) in sorted(histograms.items()):
+                    if histogram_name != name:
+                        continue
+                    cumulative = 0
+                    for bound, bucket in zip(self.buckets, counts):
+                        cumulative += bucket
+                        lines.append(f"{metric}_bucket{format_labels(labels, le=bound)} {cumulative}")
+                    lines.append(f"{metric}_bucket{format_labels(labels, le='+Inf')} {count}")
+                    lines.append(f"{metric}_sum{format_labels(labels)} {format_value(total)}")
+                    lines.append(f"{metric}_count{format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def _ensure_process(self):
+        """Makes sure the metrics belong to the process and the flushing thread is running (must hold the lock)"""
+        if self._pid != os.getpid():
+            self._counters.clear()
+            self._histograms.clear()
+            self._pid = os.getpid()
+            self._process = f"{self._pid}-{uuid.uuid4().hex[:8]}"
+            if self.flush_interval:
+                threading.Thread(target=self._flush_periodically, name="metrics-flusher", daemon=True).start()
+
+    def _flush_periodically(self):
+        """Flushes the metrics of the process periodically"""
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+    def _read(self, path):
+        """Reads the metrics snapshot at <path> (None if it is missing, unreadable or has different buckets)"""
+        try:
+            with open(path, "rt") as file:
+                snapshot = json.load(file)
+        except (OSError, ValueError):
+            return None
+        return snapshot if tuple(snapshot.get("buckets", ())) == self.buckets else None
+
+    def _read_retired(self):
+        """Reads the retired metrics of the run (counters, histograms and the set of the retired processes)"""
+        counters, histograms = {}, {}
+        snapshot = self._read(os.path.join(self.run_location, RETIRED_METRICS_FILE))
+        if snapshot is None:
+            return counters, histograms, set()
+        self._merge(snapshot, counters, histograms)
+        return counters, histograms, set(snapshot.get("processes", ()))
+
+    def _merge(self, snapshot, counters, histograms):
+        """Adds the metrics of the <snapshot> to the <counters> and the <histograms>"""
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(tuple(label) for label in labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, counts, total, count in snapshot["histograms"]:
+            key = (name, tuple(tuple(label) for label in labels))
+            histogram = histograms.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            histogram[0] = [a + b for a, b in zip(histogram[0], counts)]
+            histogram[1] += total
+            histogram[2] += count
+
+    def _write(self, name, snapshot):
+        """Writes the <snapshot> to the file with <name> in the directory of the run (atomically)"""
+        Path(self.run_location).mkdir(parents=True, exist_ok=True)
+        descriptor, path = tempfile.mkstemp(dir=self.run_location, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wt") as file:
+                json.dump(snapshot, file)
+            os.replace(path, os.path.join(self.run_location, name))
+        except BaseException:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+
+
+# -------------------------------------- #
+# Metrics formatting routines definition #
+# -------------------------------------- #
+
+def format_labels(labels, le=None):
+    """Formats the labels in the Prometheus text format"""
+    labels = list(labels) + ([("le", le if isinstance(le, str) else format_value(le))] if le is not None else [])
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+def format_value(value):
+    """Formats the value in the Prometheus text format"""
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ------------------------------- #
+# Request stages timer definition #
+# ------------------------------- #
+
+class StageTimer(object):
+    """Class implementing the timer of the stages of the request workflow"""
+
+    def __init__(self, endpoint):
+        """Initializes the StageTimer (the model is labeled once it is known)"""
+        self.endpoint = endpoint
+        self.model = ""
+        self.stages = []
+        self.start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Measures the duration of the stage with <name>"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def finish(self, status):
+        """Records the measured stages and the request (the labels: endpoint, model, stage, status)"""
+        if not configuration["enabled"]:
+            return
+        labels = {"endpoint": self.endpoint, "model": self.model}
+        for name, duration in self.stages:
+            metrics.observe("stage_duration_seconds", {**labels, "stage": name}, duration)
+        metrics.observe("request_duration_seconds", labels, time.perf_counter() - self.start)
+        metrics.inc("requests_total", {**labels, "status": status})
+
+
+# Metrics configuration and registry (shared by the process)
+configuration = configure_metrics()
+metrics = MetricsRegistry(
+    location=configuration["location"],
+    buckets=configuration["buckets"],
+    flush_interval=configuration["flush_interval"],
+    run_expiration=configuration["run_expiration"])
+
+
+@atexit.register
+def flush_metrics():
+    """Flushes the metrics of the process (used by the forked processes before exiting as well)"""
+    try:
+        metrics.flush()
+    except Exception:
+        pass
+
+
+def retire_metrics(pid):
+    """Merges the metrics of the dead process with <pid> into the retired metrics (used by the supervisor)"""
+    try:
+        metrics.retire(pid)
+    except Exception:
+        pass
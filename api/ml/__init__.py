@@ -21,4 +21,16 @@ def configure_machine_learning():
     Path(models_location).mkdir(parents=True, exist_ok=True)
 
     # Return the configuration
-    return {"location": models_location}
+    return {
+        "location": models_location,
+        "mmap_mode": configuration.get("mmap_mode"),
+        "cache": configuration.get("cache", {}),
+        "registry": configuration.get("registry", {}),
+        "signatures": configuration.get("signatures", {}),
+        "backends": configuration.get("backends", {}),
+        "batching": configuration.get("batching", {}),
+        "streaming": configuration.get("streaming", {}),
+        "executor": configuration.get("executor", {}),
+        "warmup": configuration.get("warmup", {}),
+        "models": configuration.get("models", {})
+    }
@@ -0,0 +1,288 @@
+import os
+import json
+import numpy
+import joblib
+from api.ml.trees import compile_trees
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+
+# --------------------------------------- #
+# Inference backend exceptions definition #
+# --------------------------------------- #
+class InferenceBackendException(Exception): pass
+
+
+# ------------------------------------------- #
+# Default inference backend values definition #
+# ------------------------------------------- #
+DEFAULT_BACKEND = "joblib"
+
+# ONNX Runtime graph optimization levels and execution modes (configuration value: onnxruntime attribute name)
+ONNX_OPTIMIZATION_LEVELS = {
+    "disable": "ORT_DISABLE_ALL",
+    "basic": "ORT_ENABLE_BASIC",
+    "extended": "ORT_ENABLE_EXTENDED",
+    "all": "ORT_ENABLE_ALL"
+}
+ONNX_EXECUTION_MODES = {
+    "sequential": "ORT_SEQUENTIAL",
+    "parallel": "ORT_PARALLEL"
+}
+
+# ONNX tensor types (ONNX Runtime type: numpy dtype)
+ONNX_TENSOR_TYPES = {
+    "tensor(float)": numpy.float32,
+    "tensor(double)": numpy.float64,
+    "tensor(int64)": numpy.int64,
+    "tensor(int32)": numpy.int32
+}
+
+
+# -------------------------------------- #
+# Inference backend interface definition #
+# -------------------------------------- #
+
+class InferenceBackend(object):
+    """Class implementing the inference backend interface (loading of the serialized models of one format)"""
+
+    # Name of the backend (the configuration section: predictors.backends.<name>)
+    name = None
+
+    # Extensions of the serialized models loaded by the backend
+    extensions = ()
+
+    # The models can be run in the inference executor (worker processes)
+    supports_executor = False
+
+    def load(self, path, options):
+        """
+        Loads the serialized model at <path>.
+
+        The loaded model exposes the scikit-learn estimator interface used by
+        the predictors (``predict``, optionally ``predict_proba``, ``classes_``
+        and ``n_features_in_``), so the batching, the signature extraction and
+        the predictor endpoints do not depend on the backend.
+
+        :param path: path to the serialized model
+        :type path: str
+        :param options: backend options (``predictors.backends.<name>`` merged with the model-specific ones)
+        :type options: dict
+        :return: loaded model
+        :rtype: Any
+        """
+        raise NotImplementedError
+
+    def is_available(self):
+        """Checks if the dependencies of the backend are installed"""
+        return True
+
+
+# ------------------------- #
+# Joblib backend definition #
+# ------------------------- #
+
+class JoblibBackend(InferenceBackend):
+    """Class implementing the joblib (scikit-learn) inference backend"""
+
+    # Set the backend attributes
+    name = "joblib"
+    extensions = ("joblib",)
+    supports_executor = True
+
+    def load(self, path, options):
+        """
+        Loads the joblib-serialized model at <path>.
+
+        Options: ``mmap_mode`` (memory-mapping of the model arrays),
+        ``intra_op_num_threads`` (the ``n_jobs`` of the model and of its
+        nested estimators, e.g. the threads evaluating the trees of a forest;
+        ``null`` keeps the serialized value), ``compile_trees`` (compile the
+        tree ensembles to the flat node arrays evaluated by the vectorized
+        NumPy traversal; see: ``api.ml.trees``; the other models are kept)
+        and ``compiled_max_batch_size`` (the larger batches are predicted by
+        the original model; ``null`` predicts all batches by the compiled one).
+
+        :param path: path to the serialized model
+        :type path: str
+        :param options: backend options
+        :type options: dict
+        :return: loaded model
+        :rtype: sklearn.base.BaseEstimator
+        """
+        model = joblib.load(path, mmap_mode=options.get("mmap_mode"))
+
+        # Set the number of the threads used by the inference
+        threads = options.get("intra_op_num_threads")
+        if threads is not None and hasattr(model, "get_params") and hasattr(model, "set_params"):
+            parameters = [name for name in model.get_params(deep=True) if name.split("__")[-1] == "n_jobs"]
+            if parameters:
+                model.set_params(**{name: int(threads) for name in parameters})
+
+        # Compile the tree ensembles (if enabled and supported)
+        if options.get("compile_trees", False):
+            model = compile_trees(model, max_batch_size=options.get("compiled_max_batch_size")) or model
+
+        # Return the model
+        return model
+
+
+# ----------------------- #
+# ONNX backend definition #
+# ----------------------- #
+
+class OnnxModel(object):
+    """Class implementing the ONNX Runtime model (inference session with the scikit-learn estimator interface)"""
+
+    def __init__(self, session):
+        """
+        Initializes the OnnxModel.
+
+        The first input of the session takes the feature values, the first
+        output holds the predicted values (labels) and the second one (if
+        present) the predicted probabilities, i.e. the layout of the models
+        converted from scikit-learn (``skl2onnx``). The class labels and the
+        feature names are read from the model metadata (``classes`` and
+        ``feature_names``: JSON lists; see: ``api.ml.conversion``) or, for
+        the classifiers, from the probabilities output of the first run.
+
+        :param session: ONNX Runtime inference session
+        :type session: onnxruntime.InferenceSession
+        """
+        self.session = session
+
+        # Prepare the input (the dtype and the number of the features)
+        inputs = session.get_inputs()
+        self.input_name = inputs[0].name
+        self.features_dtype = numpy.dtype(ONNX_TENSOR_TYPES.get(inputs[0].type, numpy.float32))
+        shape = inputs[0].shape
+        if len(shape) == 2 and isinstance(shape[1], int):
+            self.n_features_in_ = shape[1]
+
+        # Prepare the outputs (predicted values and probabilities)
+        outputs = session.get_outputs()
+        self.label_name = outputs[0].name
+        self.probabilities_name = outputs[1].name if len(outputs) > 1 else None
+
+        # Read the metadata (class labels and feature names)
+        metadata = session.get_modelmeta().custom_metadata_map
+        if "classes" in metadata:
+            self.classes_ = numpy.asarray(json.loads(metadata["classes"]))
+        if "feature_names" in metadata:
+            self.feature_names_in_ = numpy.asarray(json.loads(metadata["feature_names"]), dtype=object)
+
+    def predict(self, values):
+        """Predicts the values (labels) of the feature <values>"""
+        predicted = self.session.run([self.label_name], {self.input_name: self._prepare(values)})[0]
+        return predicted.ravel() if predicted.ndim == 2 and predicted.shape[1] == 1 else predicted
+
+    @property
+    def predict_proba(self):
+        """Predicts the probabilities of the feature values (available only if the model outputs them)"""
+        if self.probabilities_name is None:
+            raise AttributeError("The model does not output the probabilities")
+        return self._predict_proba
+
+    def _predict_proba(self, values):
+        """Predicts the probabilities of the feature <values>"""
+        probabilities = self.session.run([self.probabilities_name], {self.input_name: self._prepare(values)})[0]
+
+        # Convert the probabilities mapped to the class labels (ZipMap output) to the array
+        if isinstance(probabilities, list):
+            if not hasattr(self, "classes_") and probabilities:
+                self.classes_ = numpy.asarray(sorted(probabilities[0].keys()))
+            return numpy.array([[row[label] for label in self.classes_] for row in probabilities])
+        return probabilities
+
+    def _prepare(self, values):
+        """Prepares the feature <values> for the session (contiguous array of the input dtype; no copy if possible)"""
+        return numpy.ascontiguousarray(values, dtype=self.features_dtype)
+
+
+class OnnxBackend(InferenceBackend):
+    """Class implementing the ONNX Runtime (CPU) inference backend"""
+
+    # Set the backend attributes
+    name = "onnx"
+    extensions = ("onnx",)
+    supports_executor = False
+
+    def load(self, path, options):
+        """
+        Loads the ONNX model at <path> to the ONNX Runtime inference session (CPU execution provider).
+
+        Options (session options): ``intra_op_num_threads`` (threads of one
+        operator; ``null``: ONNX Runtime default), ``inter_op_num_threads``
+        (threads of the parallel execution mode), ``execution_mode``
+        (``sequential`` or ``parallel``) and ``graph_optimization_level``
+        (``disable``, ``basic``, ``extended`` or ``all``). ONNX Runtime
+        releases the GIL, so the models are always run in the request threads.
+
+        :param path: path to the serialized model
+        :type path: str
+        :param options: backend options
+        :type options: dict
+        :return: loaded model
+        :rtype: api.ml.backends.OnnxModel
+        """
+        if onnxruntime is None:
+            raise InferenceBackendException("The onnx backend requires onnxruntime (pip install onnxruntime)")
+
+        # Prepare the session options
+        session_options = onnxruntime.SessionOptions()
+        if options.get("intra_op_num_threads") is not None:
+            session_options.intra_op_num_threads = int(options["intra_op_num_threads"])
+        if options.get("inter_op_num_threads") is not None:
+            session_options.inter_op_num_threads = int(options["inter_op_num_threads"])
+        session_options.execution_mode = getattr(
+            onnxruntime.ExecutionMode,
+            ONNX_EXECUTION_MODES[options.get("execution_mode", "sequential")])
+        session_options.graph_optimization_level = getattr(
+            onnxruntime.GraphOptimizationLevel,
+            ONNX_OPTIMIZATION_LEVELS[options.get("graph_optimization_level", "all")])
+
+        # Create the inference session (the model file is validated by ONNX Runtime)
+        try:
+            session = onnxruntime.InferenceSession(
+                path, sess_options=session_options, providers=["CPUExecutionProvider"])
+        except Exception as e:
+            raise InferenceBackendException(f"Model at '{path}' is not a valid ONNX model ({e})")
+        return OnnxModel(session)
+
+    def is_available(self):
+        """Checks if the dependencies of the backend are installed"""
+        return onnxruntime is not None
+
+
+# ------------------------------------- #
+# Inference backend routines definition #
+# ------------------------------------- #
+
+# Supported inference backends (name: backend) ordered by the priority (for the same identifier in several formats)
+backends = {backend.name: backend for backend in (OnnxBackend(), JoblibBackend())}
+
+
+def get_backend(name):
+    """Returns the inference backend with <name>"""
+    try:
+        return backends[name]
+    except KeyError:
+        raise InferenceBackendException(f"Unsupported inference backend '{name}' (supported: {', '.join(backends)})")
+
+
+def get_backend_for_path(path):
+    """Returns the inference backend of the serialized model at <path> (chosen by the file extension)"""
+    extension = os.path.splitext(path)[1].lstrip(".")
+    for backend in backends.values():
+        if extension in backend.extensions:
+            return backend
+    return get_backend(DEFAULT_BACKEND)
+
+
+def supported_extensions():
+    """Returns the extensions of the serialized models supported by the available backends (ordered by the priority)"""
+    return tuple(
+        extension for backend in backends.values() if backend.is_available() for extension in backend.extensions)
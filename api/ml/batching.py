@@ -0,0 +1,224 @@
+import os
+import time
+import queue
+import numpy
+import threading
+from api.ml.interface import Predictor
+
+
+# ---------------------------------- #
+# Default batching values definition #
+# ---------------------------------- #
+DEFAULT_BATCHING_WINDOW = 5
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_IDLE_TIMEOUT = 60
+
+
+# ----------------------------- #
+# Batched prediction definition #
+# ----------------------------- #
+
+class BatchedPrediction(object):
+    """Class implementing the prediction waiting to be batched"""
+
+    def __init__(self, method, values):
+        """Initializes the BatchedPrediction"""
+        self.method = method
+        self.values = values
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    @property
+    def key(self):
+        """Returns the batching key (only the predictions with the same key can be stacked)"""
+        return self.method, self.values.shape[1:], self.values.dtype
+
+    def resolve(self, result=None, error=None):
+        """Resolves the prediction (wakes up the waiting request)"""
+        self.result = result
+        self.error = error
+        self.done.set()
+
+
+# ----------------------------- #
+# Prediction batcher definition #
+# ----------------------------- #
+
+class PredictionBatcher(object):
+    """Class implementing the dynamic micro-batching of the concurrent predictions of a model"""
+
+    def __init__(self, predictor, window=DEFAULT_BATCHING_WINDOW, max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+        """
+        Initializes the PredictionBatcher.
+
+        :param predictor: predictor that runs the batched predictions
+        :type predictor: api.ml.interface.Predictor
+        :param window: time window for collecting the predictions in milliseconds, defaults to DEFAULT_BATCHING_WINDOW
+        :type window: float, optional
+        :param max_batch_size: maximum number of subjects in a batch, defaults to DEFAULT_MAX_BATCH_SIZE
+        :type max_batch_size: int, optional
+        """
+        self.predictor = predictor
+        self.window = window / 1000.0
+        self.max_batch_size = max(int(max_batch_size), 1)
+
+        # Queue of the pending predictions (and the prediction carried over to the next batch)
+        self._queue = queue.Queue()
+        self._carried = None
+
+        # Dispatcher thread (threads do not survive forking, so the PID is tracked)
+        self._lock = threading.Lock()
+        self._dispatcher_pid = None
+
+    def submit(self, method, values):
+        """
+        Submits the prediction and waits for the result of the batch it was stacked into.
+
+        :param method: name of the predictor method (predict or predict_proba)
+        :type method: str
+        :param values: feature values (the first dimension is dedicated to subjects)
+        :type values: numpy.ndarray
+        :return: predicted values for the submitted subjects
+        :rtype: numpy.ndarray
+        """
+
+        # Predict large inputs directly (there is nothing to gain by batching)
+        if not isinstance(values, numpy.ndarray) or values.ndim == 0 or len(values) >= self.max_batch_size:
+            return getattr(self.predictor.model, method)(values)
+
+        # Submit the prediction
+        prediction = BatchedPrediction(method, values)
+        with self._lock:
+            self._ensure_dispatching()
+            self._queue.put(prediction)
+
+        # Wait for the result
+        prediction.done.wait()
+        if prediction.error is not None:
+            raise prediction.error
+        return prediction.result
+
+    def _ensure_dispatching(self):
+        """Makes sure the dispatcher thread is running (once per process; must be called holding the lock)"""
+        if self._dispatcher_pid != os.getpid():
+            threading.Thread(target=self._dispatch, name="prediction-batcher", daemon=True).start()
+            self._dispatcher_pid = os.getpid()
+
+    def _collect(self):
+        """Collects the predictions arriving within the time window (up to the maximum batch size)"""
+
+        # Wait for the first prediction (the dispatcher stops when idle, so evicted predictors can be released)
+        if self._carried is not None:
+            batch, self._carried = [self._carried], None
+        else:
+            try:
+                batch = [self._queue.get(timeout=DEFAULT_IDLE_TIMEOUT)]
+            except queue.Empty:
+                return None
+        size = len(batch[0].values)
+
+        # Collect the predictions arriving within the window
+        deadline = time.monotonic() + self.window
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                prediction = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if size + len(prediction.values) > self.max_batch_size:
+                self._carried = prediction
+                break
+            batch.append(prediction)
+            size += len(prediction.values)
+
+        # Return the collected predictions
+        return batch
+
+    def _dispatch(self):
+        """Dispatches the collected predictions (groups the stackable ones and predicts them at once)"""
+        while True:
+
+            # Collect the predictions (stop the dispatcher if idle)
+            batch = self._collect()
+            if batch is None:
+                with self._lock:
+                    if self._queue.empty():
+                        self._dispatcher_pid = None
+                        return
+                continue
+
+            # Group the stackable predictions
+            groups = {}
+            for prediction in batch:
+                groups.setdefault(prediction.key, []).append(prediction)
+
+            # Predict the groups
+            for (method, _, _), predictions in groups.items():
+                self._predict(method, predictions)
+
+    def _predict(self, method, predictions):
+        """Runs one vectorized prediction and scatters the result rows back to the waiting requests"""
+        try:
+
+            # Stack the feature values and predict
+            result = getattr(self.predictor.model, method)(numpy.concatenate([p.values for p in predictions]))
+
+            # Scatter the result rows
+            offset = 0
+            for prediction in predictions:
+                prediction.resolve(result=result[offset:offset + len(prediction.values)])
+                offset += len(prediction.values)
+
+        except Exception:
+
+            # Predict the predictions one by one (the error is reported only to the offending request)
+            for prediction in predictions:
+                if prediction.done.is_set():
+                    continue
+                try:
+                    prediction.resolve(result=getattr(self.predictor.model, method)(prediction.values))
+                except Exception as e:
+                    prediction.resolve(error=e)
+
+
+# --------------------------------------- #
+# Batching predictor interface definition #
+# --------------------------------------- #
+
+class BatchingPredictor(Predictor):
+    """Class implementing the predictor interface with the dynamic micro-batching of concurrent predictions"""
+
+    def __init__(self, predictor, window=DEFAULT_BATCHING_WINDOW, max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+        """Initializes the BatchingPredictor"""
+        super().__init__(
+            predictor.model,
+            identifier=predictor.identifier,
+            content_hash=predictor.content_hash,
+            signature=predictor.signature,
+            backend=predictor.backend)
+        self.batcher = PredictionBatcher(predictor, window=window, max_batch_size=max_batch_size)
+
+    def predict(self, features):
+        """
+        Predicts the class(/es) (batched with the concurrent predictions).
+
+        :param features: features
+        :type features: api.interfaces.inputs.Features
+        :return: predicted value(s)
+        :rtype: numpy.ndarray
+        """
+        return self.batcher.submit("predict", features.values)
+
+    def predict_proba(self, features):
+        """
+        Predicts the probability of the <features> belonging to the class(/es) (batched with the concurrent predictions).
+
+        :param features: features
+        :type features: api.interfaces.inputs.Features
+        :return: predicted probabilit(y/ies)
+        :rtype: numpy.ndarray
+        """
+        return self.batcher.submit("predict_proba", features.values)
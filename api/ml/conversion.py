@@ -0,0 +1,159 @@
+import os
+import json
+import shutil
+import argparse
+import tempfile
+import joblib
+from api.ml.manager import PredictorManager
+from api.ml.signature import ModelSignature
+
+try:
+    import skl2onnx
+    from skl2onnx.common.data_types import FloatTensorType, DoubleTensorType
+except ImportError:
+    skl2onnx = None
+
+
+# ------------------------------------ #
+# Model conversion routines definition #
+# ------------------------------------ #
+
+def convert_model(path):
+    """
+    Converts the serialized model to the uncompressed joblib layout.
+
+    The numpy arrays of the uncompressed joblib files are stored as raw
+    buffers that can be memory-mapped (``mmap_mode`` in ``ml.json``), so the
+    read-only model weights are shared via the OS page cache by all workers
+    instead of being copied into the private memory of each of them. The file
+    is replaced atomically (written to a temporary file and renamed) and its
+    permissions are kept.
+
+    :param path: path to the serialized model
+    :type path: str
+    :return: None
+    :rtype: None type
+    """
+
+    # Load the model (fully, i.e. without memory-mapping)
+    model = joblib.load(path)
+
+    # Dump the model (uncompressed) to a temporary file in the same directory (renamed with the original file mode)
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(descriptor)
+    try:
+        joblib.dump(model, temporary, compress=0)
+        shutil.copymode(path, temporary)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def export_model(path, target=None):
+    """
+    Exports the joblib-serialized (scikit-learn) model to the ONNX model next to it (``<identifier>.onnx``).
+
+    The model is converted via ``skl2onnx`` with the float32 input (float64
+    for the models expecting float64 features, if supported by the
+    converters) and with the probabilities output as the plain tensor (no
+    ZipMap). The class labels and the feature names are stored in the model
+    metadata (``classes`` and ``feature_names``). As the ``.onnx`` extension
+    takes precedence over the ``.joblib`` one, the exported model is served
+    by the ONNX Runtime backend; the joblib file is kept (removing the ONNX
+    model switches back to it). The file is written atomically with the
+    permissions of the joblib file.
+
+    :param path: path to the joblib-serialized model
+    :type path: str
+    :param target: path to the ONNX model, defaults to None (``<identifier>.onnx`` next to the joblib file)
+    :type target: str, optional
+    :return: path to the ONNX model
+    :rtype: str
+    """
+    if skl2onnx is None:
+        raise RuntimeError("The export of the ONNX models requires skl2onnx (pip install skl2onnx)")
+
+    # Load the model and extract its signature
+    model = joblib.load(path)
+    signature = ModelSignature.extract(model)
+    if signature.n_features is None:
+        raise RuntimeError(f"Model at '{path}' cannot be exported (the number of the features is not known)")
+
+    # Convert the model (float32 input unless the model expects float64 features)
+    options = {"zipmap": False} if signature.supports("predict_proba") else None
+    for tensor_type in ((DoubleTensorType, FloatTensorType) if signature.dtype == "float64" else (FloatTensorType,)):
+        try:
+            exported = skl2onnx.to_onnx(
+                model, initial_types=[("X", tensor_type([None, signature.n_features]))], options=options)
+            break
+        except Exception:
+            if tensor_type is FloatTensorType:
+                raise
+
+    # Store the class labels and the feature names in the model metadata
+    for key, value in (("classes", signature.classes), ("feature_names", signature.feature_names)):
+        if value is not None:
+            exported.metadata_props.add(key=key, value=json.dumps(value))
+
+    # Write the model to a temporary file in the same directory (renamed to .onnx once written with the file mode
+    # of the joblib model, as the temporary files are created readable by the owner only)
+    target = target or os.path.splitext(path)[0] + ".onnx"
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(exported.SerializeToString())
+        shutil.copymode(path, temporary)
+        os.replace(temporary, target)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+    # Return the path to the ONNX model
+    return target
+
+
+def convert_models(identifiers=None, onnx=False):
+    """
+    Converts the indexed models to the uncompressed (memory-mappable) joblib layout or exports them to ONNX.
+
+    :param identifiers: identifiers of the models to convert, defaults to None (all models)
+    :type identifiers: list, optional
+    :param onnx: export the models to ONNX (see: ``export_model``), defaults to False
+    :type onnx: bool, optional
+    :return: identifiers of the converted models
+    :rtype: list
+    """
+
+    # Prepare the manager and the identifiers of the models to convert (all versions by default)
+    manager = PredictorManager()
+    identifiers = identifiers or manager.registry.identifiers()
+
+    # Convert the models (the identifier of a model file or the name of a model resolving to its active version)
+    for identifier in identifiers:
+        path = os.path.splitext((manager.registry.get(identifier) or manager.resolve(identifier)).path)[0] + ".joblib"
+        if onnx:
+            export_model(path)
+        else:
+            convert_model(path)
+
+    # Re-index the converted models
+    manager.index_models()
+
+    # Return the converted identifiers
+    return identifiers
+
+
+if __name__ == "__main__":
+
+    # Prepare the command line arguments
+    parser = argparse.ArgumentParser(description="Predictor API model conversion (memory-mappable joblib layout)")
+    parser.add_argument("models", help="identifiers of the models to convert (defaults to all models)", nargs="*")
+    parser.add_argument("--onnx", help="export the models to ONNX (served by the ONNX Runtime)", action="store_true")
+
+    # Parse the command line arguments
+    args = parser.parse_args()
+
+    # Convert the models
+    for converted in convert_models(args.models, onnx=args.onnx):
+        print(f"Model with identifier '{converted}' {'exported to ONNX' if args.onnx else 'converted'}")
@@ -0,0 +1,253 @@
+import os
+import json
+import numpy
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from api.ml.backends import DEFAULT_BACKEND, get_backend
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+# ---------------------------------- #
+# Default executor values definition #
+# ---------------------------------- #
+DEFAULT_EXECUTOR_MODE = "inline"
+DEFAULT_EXECUTOR_PROCESSES = 2
+DEFAULT_EXECUTOR_MAX_MODELS = 8
+
+
+# ------------------------------------ #
+# Inference worker routines definition #
+# ------------------------------------ #
+
+# Models loaded by the inference worker process (key: (path, content hash, backend, options)) ordered from the least
+# recently used
+worker_models = OrderedDict()
+
+
+def load_worker_model(path,
+                      content_hash,
+                      backend=DEFAULT_BACKEND,
+                      options=None,
+                      max_models=DEFAULT_EXECUTOR_MAX_MODELS):
+    """
+    Loads the model in the inference worker process (the loaded models are kept for the subsequent calls).
+
+    The model is loaded by the inference <backend> with its <options>, i.e.
+    the same way as by the API process, so the worker runs the same model
+    (e.g. the compiled tree ensemble or the set number of the threads).
+    """
+    options = options or {}
+    key = (path, content_hash, backend, json.dumps(options, sort_keys=True, default=str))
+    if key in worker_models:
+        worker_models.move_to_end(key)
+        return worker_models[key]
+    worker_models[key] = model = get_backend(backend).load(path, options)
+    while len(worker_models) > max(int(max_models), 1):
+        worker_models.popitem(last=False)
+    return model
+
+
+def attach_shared_memory(name):
+    """
+    Attaches the shared memory block created by the API process (the API process owns and unlinks it).
+
+    The spawned worker processes share the resource tracker of the API
+    process, so attaching the block must not unregister it from the tracker.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def run_inference(path, content_hash, method, backend, options, max_models, shared=None, values=None):
+    """
+    Runs the inference in the inference worker process.
+
+    :param path: path to the serialized model
+    :type path: str
+    :param content_hash: content hash of the serialized model
+    :type content_hash: str
+    :param method: name of the model method (predict or predict_proba)
+    :type method: str
+    :param backend: name of the inference backend loading the model
+    :type backend: str
+    :param options: options of the inference backend
+    :type options: dict
+    :param max_models: maximum number of the models kept by the worker process
+    :type max_models: int
+    :param shared: shared memory block name, shape and dtype of the feature values, defaults to None
+    :type shared: tuple, optional
+    :param values: feature values (if they are not passed via the shared memory), defaults to None
+    :type values: numpy.ndarray, optional
+    :return: predicted values
+    :rtype: numpy.ndarray
+    """
+
+    # Load the model
+    model = load_worker_model(path, content_hash, backend=backend, options=options, max_models=max_models)
+
+    # Predict the pickled feature values
+    if shared is None:
+        return getattr(model, method)(values)
+
+    # Predict the feature values in the shared memory (the result must not reference the shared memory)
+    name, shape, dtype = shared
+    block = attach_shared_memory(name)
+    try:
+        values = numpy.ndarray(shape, dtype=numpy.dtype(dtype), buffer=block.buf)
+        return numpy.array(getattr(model, method)(values), copy=True)
+    finally:
+        values = None
+        try:
+            block.close()
+        except BufferError:
+            pass
+
+
+# ----------------------------------- #
+# Inference executor class definition #
+# ----------------------------------- #
+
+class InferenceExecutor(object):
+    """Class implementing the inference executor (pool of long-lived processes holding their own loaded models)"""
+
+    def __init__(self, processes=DEFAULT_EXECUTOR_PROCESSES, max_models=DEFAULT_EXECUTOR_MAX_MODELS):
+        """
+        Initializes the InferenceExecutor.
+
+        The inference is dispatched to the pool of <processes> worker
+        processes, so the GIL-holding models (e.g. the pipelines with Python
+        transformers) are not serialized by the threads of the API process.
+        Each worker process loads the models on the first use and keeps up to
+        <max_models> of them. The feature values are passed via the shared
+        memory (no pickling); the results are returned by pickling, as they
+        are usually much smaller. The worker processes are spawned (not
+        forked), so they do not inherit the threads of the API process.
+
+        :param processes: number of the worker processes, defaults to DEFAULT_EXECUTOR_PROCESSES
+        :type processes: int, optional
+        :param max_models: maximum number of the models kept by a worker process, defaults to DEFAULT_EXECUTOR_MAX_MODELS
+        :type max_models: int, optional
+        """
+        self.processes = max(int(processes), 1)
+        self.max_models = max(int(max_models), 1)
+
+        # Worker pool (created lazily by the process that predicts, so it is not inherited by forking)
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def run(self, path, content_hash, method, values, backend=DEFAULT_BACKEND, options=None):
+        """
+        Runs the inference in the worker pool (waits for the result).
+
+        :param path: path to the serialized model
+        :type path: str
+        :param content_hash: content hash of the serialized model
+        :type content_hash: str
+        :param method: name of the model method (predict or predict_proba)
+        :type method: str
+        :param values: feature values
+        :type values: numpy.ndarray
+        :param backend: name of the inference backend loading the model, defaults to DEFAULT_BACKEND
+        :type backend: str, optional
+        :param options: options of the inference backend, defaults to None
+        :type options: dict, optional
+        :return: predicted values
+        :rtype: numpy.ndarray
+        """
+        pool = self._get_pool()
+        try:
+
+            # Pass the feature values by pickling (no shared memory support or the object arrays)
+            if shared_memory is None or not isinstance(values, numpy.ndarray) or values.dtype.hasobject:
+                return pool.submit(
+                    run_inference, path, content_hash, method, backend, options, self.max_models,
+                    values=values).result()
+
+            # Pass the feature values via the shared memory
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            try:
+                view = numpy.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)
+                view[...] = values
+                del view
+                shared = (block.name, values.shape, values.dtype.str)
+                return pool.submit(
+                    run_inference, path, content_hash, method, backend, options, self.max_models,
+                    shared=shared).result()
+            finally:
+                block.close()
+                block.unlink()
+
+        # Handle the dead worker processes (the pool is re-created for the next inference)
+        except BrokenProcessPool:
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            raise
+
+    def _get_pool(self):
+        """Returns the worker pool of the current process"""
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"))
+                self._pool_pid = os.getpid()
+            return self._pool
+
+
+# ---------------------------------------- #
+# Remote model (executor proxy) definition #
+# ---------------------------------------- #
+
+class RemoteModel(object):
+    """Class implementing the model proxy that runs the inference methods in the inference executor"""
+
+    # Methods run in the inference executor
+    remote_methods = ("predict", "predict_proba")
+
+    def __init__(self, model, path, content_hash, executor, backend=DEFAULT_BACKEND, options=None):
+        """
+        Initializes the RemoteModel.
+
+        The inference methods are run in the <executor>; the other attributes
+        (e.g. ``classes_``) are read from the local <model>, so the proxy can
+        be used by the ``Predictor`` (and the batching layer) as the model.
+
+        :param model: local model
+        :type model: Any
+        :param path: path to the serialized model
+        :type path: str
+        :param content_hash: content hash of the serialized model
+        :type content_hash: str
+        :param executor: inference executor
+        :type executor: api.ml.executor.InferenceExecutor
+        :param backend: name of the inference backend loading the model, defaults to DEFAULT_BACKEND
+        :type backend: str, optional
+        :param options: options of the inference backend, defaults to None
+        :type options: dict, optional
+        """
+        self.model = model
+        self.path = path
+        self.content_hash = content_hash
+        self.executor = executor
+        self.backend = backend
+        self.options = options or {}
+
+    def __getattr__(self, name):
+        if name == "model":
+            raise AttributeError(name)
+        attribute = getattr(self.model, name)
+        if name in self.remote_methods:
+            return lambda values: self.executor.run(
+                self.path, self.content_hash, name, values, backend=self.backend, options=self.options)
+        return attribute
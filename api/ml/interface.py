@@ -1,3 +1,31 @@
+import numpy
+from api.ml.executor import RemoteModel
+from api.ml.signature import ModelSignature
+from api.ml.trees import CompiledTreeEnsemble, GRADIENT_BOOSTING
+
+
+# ----------------------------------------- #
+# Argmax-probability classifiers definition #
+# ----------------------------------------- #
+
+# Scikit-learn classifiers predicting the argmax of their probabilities (the classes can be derived from them); e.g.
+# SVC (Platt scaling) and the binary gradient boosting (ties of the raw predictions at 0) are not listed
+ARGMAX_PROBA_CLASSIFIERS = (
+    "DecisionTreeClassifier",
+    "ExtraTreeClassifier",
+    "RandomForestClassifier",
+    "ExtraTreesClassifier",
+    "HistGradientBoostingClassifier",
+    "LogisticRegression",
+    "GaussianNB",
+    "MultinomialNB",
+    "BernoulliNB",
+    "ComplementNB",
+    "CategoricalNB",
+    "CalibratedClassifierCV"
+)
+
+
 # ------------------------------ #
 # Predictor interface definition #
 # ------------------------------ #
@@ -5,9 +33,13 @@
 class Predictor(object):
     """Class implementing the predictor interface"""
 
-    def __init__(self, model):
-        """Initializes the Predictor"""
+    def __init__(self, model, identifier=None, content_hash=None, signature=None, backend=None):
+        """Initializes the Predictor (the <signature> is extracted from the model if not given)"""
         self.model = model
+        self.identifier = identifier
+        self.content_hash = content_hash
+        self.backend = backend
+        self.signature = signature or ModelSignature.extract(model, content_hash, backend)
 
     def predict(self, features):
         """
@@ -30,3 +62,67 @@ class Predictor(object):
         :rtype: numpy.ndarray
         """
         return self.model.predict_proba(features.values)
+
+    @property
+    def supports_proba(self):
+        """Checks if the model supports predicting of the probabilities"""
+        return self.supports("predict_proba")
+
+    @property
+    def n_features(self):
+        """Returns the number of the features the model expects (``n_features_in_``; None if not known)"""
+        return self.signature.n_features
+
+    @property
+    def features_dtype(self):
+        """Returns the dtype the model expects the feature values in (None if not known)"""
+        return self.signature.features_dtype
+
+    @property
+    def allows_nan(self):
+        """Checks if the model allows the missing (NaN) feature values (the ``allow_nan`` estimator tag)"""
+        return self.signature.allows_nan
+
+    def supports(self, method):
+        """Checks if the model supports the <method> (e.g. predict_proba)"""
+        return self.signature.supports(method)
+
+    @property
+    def predicts_argmax_proba(self):
+        """
+        Checks if the model predicts the argmax of its probabilities (the class(/es) can be derived from them).
+
+        Only the classifiers whose ``predict`` is the argmax of
+        ``predict_proba`` are listed (``ARGMAX_PROBA_CLASSIFIERS``; the final
+        estimator of a pipeline and the compiled tree ensembles are checked as
+        well); the other models (e.g. ``SVC(probability=True)`` or the
+        estimators with custom decision thresholds) can predict different
+        classes than the argmax.
+        """
+        model = self.model.model if isinstance(self.model, RemoteModel) else self.model
+        if hasattr(model, "steps"):
+            model = model.steps[-1][1]
+        if isinstance(model, CompiledTreeEnsemble):
+            return model.aggregation != GRADIENT_BOOSTING
+        return type(model).__module__.startswith("sklearn.") and type(model).__name__ in ARGMAX_PROBA_CLASSIFIERS
+
+    def predict_from_proba(self, probabilities):
+        """
+        Derives the class(/es) from the predicted probabilit(y/ies) (argmax and the model's ``classes_``).
+
+        The class(/es) are derived only if the model predicts the argmax of
+        its probabilities (see: ``predicts_argmax_proba``).
+
+        :param probabilities: predicted probabilit(y/ies)
+        :type probabilities: numpy.ndarray
+        :return: predicted class(/es) or None if the model does not allow the derivation
+        :rtype: numpy.ndarray
+        """
+        classes = getattr(self.model, "classes_", None)
+        if not self.predicts_argmax_proba:
+            return None
+        if classes is None or not isinstance(probabilities, numpy.ndarray) or probabilities.ndim != 2:
+            return None
+        if numpy.ndim(classes) != 1 or len(classes) != probabilities.shape[1]:
+            return None
+        return numpy.take(classes, numpy.argmax(probabilities, axis=1))
@@ -1,9 +1,16 @@
 import os
-import glob
-import ntpath
-import joblib
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from api.ml import configure_machine_learning
 from api.ml.interface import Predictor
+from api.ml.backends import InferenceBackendException, get_backend, get_backend_for_path, supported_extensions
+from api.ml.batching import BatchingPredictor, DEFAULT_BATCHING_WINDOW, DEFAULT_MAX_BATCH_SIZE
+from api.ml.executor import InferenceExecutor, RemoteModel
+from api.ml.executor import DEFAULT_EXECUTOR_MODE, DEFAULT_EXECUTOR_PROCESSES, DEFAULT_EXECUTOR_MAX_MODELS
+from api.ml.registry import ModelRegistry, split_identifier, DEFAULT_REFRESH_INTERVAL, DEFAULT_SETTLE_TIME
+from api.ml.signature import ModelSignature
 
 
 # ---------------------------------------- #
@@ -12,6 +19,152 @@ from api.ml.interface import Predictor
 class NoLoadablePredictorException(Exception): pass
 
 
+# ----------------------------------------- #
+# Default predictor cache values definition #
+# ----------------------------------------- #
+DEFAULT_CACHE_SIZE = 8
+
+# Version resolving to the active version of the model (as the identifier without the version)
+LATEST_VERSION = "latest"
+
+
+# -------------------------- #
+# Predictor cache definition #
+# -------------------------- #
+
+class PredictorCache(object):
+    """Class implementing thread-safe, size-bounded predictor cache (LRU and TTL eviction)"""
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE, expiration_time=None):
+        """
+        Initializes the PredictorCache.
+
+        :param max_size: maximum number of cached predictors, defaults to DEFAULT_CACHE_SIZE
+        :type max_size: int, optional
+        :param expiration_time: time-to-live of the cached predictors in seconds, defaults to None (no expiration)
+        :type expiration_time: float, optional
+        """
+        self.max_size = max(int(max_size), 1)
+        self.expiration_time = expiration_time
+
+        # Cached entries (key: (predictor, time of insertion)) ordered from the least recently used
+        self._entries = OrderedDict()
+
+        # Locks: a) cache-wide lock, b) per-key loading locks (loading the same model only once)
+        self._lock = threading.RLock()
+        self._loading = {}
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries and not self._is_expired(self._entries[key][1])
+
+    def _is_expired(self, inserted):
+        """Checks if the entry inserted at <inserted> has expired"""
+        return self.expiration_time is not None and (time.monotonic() - inserted) > self.expiration_time
+
+    def get(self, key):
+        """Returns the cached predictor (or None if it is not cached or it has expired)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self._is_expired(entry[1]):
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, predictor):
+        """Caches the predictor (evicts the least recently used predictors if needed)"""
+        with self._lock:
+            self._entries[key] = (predictor, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        """
+        Returns the cached predictor or loads it via <loader> and caches it.
+
+        Concurrent requests for the same (not yet cached) key wait for a single
+        load instead of deserializing the same model several times.
+
+        :param key: cache key
+        :type key: Hashable
+        :param loader: callable that loads the predictor
+        :type loader: callable
+        :return: predictor
+        :rtype: api.ml.interface.Predictor
+        """
+
+        # Get the predictor from the cache
+        predictor = self.get(key)
+        if predictor is not None:
+            return predictor
+
+        # Get the per-key loading lock
+        with self._lock:
+            lock = self._loading.setdefault(key, threading.Lock())
+
+        # Load the predictor (only once for the concurrent requests)
+        with lock:
+            try:
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None and not self._is_expired(entry[1]):
+                        self._entries.move_to_end(key)
+                        return entry[0]
+                predictor = loader()
+                self.put(key, predictor)
+                return predictor
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+
+    def invalidate(self, key=None):
+        """Removes the predictor with <key> from the cache (or all predictors if key is None)"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def keys(self):
+        """Returns the keys of the cached (not expired) predictors"""
+        with self._lock:
+            return [key for key, entry in self._entries.items() if not self._is_expired(entry[1])]
+
+    def reset_locks(self):
+        """Resets the locks of the cache (in the forked process; the threads holding them were not forked)"""
+        self._lock = threading.RLock()
+        self._loading = {}
+
+    def statistics(self):
+        """Returns the cache statistics (hits, misses, evictions, size)"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size
+            }
+
+
 # ---------------------------- #
 # Predictor manager definition #
 # ---------------------------- #
@@ -19,27 +172,386 @@ class NoLoadablePredictorException(Exception): pass
 class PredictorManager(object):
     """Class implementing the predictor manager"""
 
-    # Supported serialization
-    extension = "joblib"
+    # Supported serialization (extensions of the inference backends ordered by the priority; see: api.ml.backends)
+    extensions = supported_extensions()
+
+    # Configuration for machine learning
+    configuration = configure_machine_learning()
+
+    # Predictor cache (shared by all requests handled by the process)
+    cache = PredictorCache(
+        max_size=configuration["cache"].get("max_size", DEFAULT_CACHE_SIZE),
+        expiration_time=configuration["cache"].get("expiration_time_in_seconds"))
+
+    # Model registry (index of the available models built once and refreshed via mtime polling)
+    registry = ModelRegistry(
+        location=configuration["location"],
+        extensions=extensions,
+        refresh_interval=configuration["registry"].get("refresh_interval_in_seconds", DEFAULT_REFRESH_INTERVAL),
+        settle_time=configuration["registry"].get("settle_time_in_seconds", DEFAULT_SETTLE_TIME))
+
+    # Active versions of the models (model name: record of the version the name resolves to)
+    active = {}
+    _active_lock = threading.RLock()
+
+    # Inference executor (pool of the worker processes used by the models in the process executor mode)
+    executor = InferenceExecutor(
+        processes=configuration["executor"].get("processes", DEFAULT_EXECUTOR_PROCESSES),
+        max_models=configuration["executor"].get("max_models", DEFAULT_EXECUTOR_MAX_MODELS))
+
+    # Signature extraction thread (created lazily by the process that registers the models, so it is not inherited
+    # by forking)
+    _signature_executor = None
+    _signature_executor_pid = None
+    _signature_lock = threading.Lock()
 
     def load(self, model_identifier):
         """Loads the predictor model and returns the interface instance"""
 
-        # Get the configuration
-        configuration = configure_machine_learning()
+        # Resolve the model identifier
+        record = self.resolve(model_identifier)
+
+        # Load the predictor (cached; the content hash makes sure a modified model is reloaded)
+        if self.configuration["cache"].get("enabled", True):
+            return self.cache.get_or_load(self.cache_key(record), lambda: self.load_predictor(record))
+
+        # Load the predictor (not cached)
+        return self.load_predictor(record)
+
+    def load_predictor(self, record):
+        """Loads the predictor model described by the registry record and returns the interface instance"""
+        backend = self.backend_for(record)
+        model = self.load_model(record, backend)
+
+        # Prepare the predictor (the signature is extracted from the loaded model if there is no sidecar yet)
+        predictor = Predictor(
+            model,
+            identifier=record.identifier,
+            content_hash=record.content_hash,
+            signature=self.read_signature(record, model),
+            backend=backend.name)
+
+        # Run the inference in the inference executor (if the process executor mode is set for the model and backend)
+        executor = self.model_configuration(record.name, "executor")
+        if executor.get("mode", DEFAULT_EXECUTOR_MODE) == "process" and backend.supports_executor:
+            predictor.model = RemoteModel(
+                predictor.model,
+                path=record.path,
+                content_hash=record.content_hash,
+                executor=self.executor,
+                backend=backend.name,
+                options=self.backend_options(record.name, backend))
+
+        # Wrap the predictor with the micro-batching layer (if enabled for the model)
+        batching = self.model_configuration(record.name, "batching")
+        if batching.get("enabled", False):
+            return BatchingPredictor(
+                predictor,
+                window=batching.get("window_in_milliseconds", DEFAULT_BATCHING_WINDOW),
+                max_batch_size=batching.get("max_batch_size", DEFAULT_MAX_BATCH_SIZE))
+
+        # Return the predictor
+        return predictor
+
+    @classmethod
+    def load_model(cls, record, backend=None):
+        """
+        Loads the serialized model described by the registry record via its inference backend.
 
-        # Get the models location
-        location = configuration["location"]
+        :param record: model registry record
+        :type record: api.ml.registry.ModelRecord
+        :param backend: inference backend, defaults to None (see: ``backend_for``)
+        :type backend: api.ml.backends.InferenceBackend, optional
+        :return: loaded model
+        :rtype: Any
+        """
+        backend = backend or cls.backend_for(record)
+        try:
+            return backend.load(record.path, cls.backend_options(record.name, backend))
+        except (OSError, InferenceBackendException):
+            raise NoLoadablePredictorException(f"Model with identifier '{record.identifier}' cannot be loaded")
 
-        # Load the model
-        if model_identifier not in self.available_models(location):
+    @classmethod
+    def backend_for(cls, record):
+        """
+        Returns the inference backend of the model described by the registry record.
+
+        The backend is named by the signature sidecar (``backend``) if there is
+        a valid one, otherwise it is chosen by the extension of the model file
+        (``.joblib``: joblib, ``.onnx``: ONNX Runtime).
+
+        :param record: model registry record
+        :type record: api.ml.registry.ModelRecord
+        :return: inference backend
+        :rtype: api.ml.backends.InferenceBackend
+        """
+        signature = record.signature or ModelSignature.load(record.path, record.content_hash)
+        try:
+            if signature is not None and signature.backend is not None:
+                return get_backend(signature.backend)
+            return get_backend_for_path(record.path)
+        except InferenceBackendException:
+            raise NoLoadablePredictorException(f"Model with identifier '{record.identifier}' cannot be loaded")
+
+    @classmethod
+    def backend_options(cls, name, backend):
+        """Returns the options of the <backend> for the model with <name> (the defaults updated by the model ones)"""
+        return {
+            "mmap_mode": cls.configuration.get("mmap_mode"),
+            **cls.configuration["backends"].get(backend.name, {}),
+            **cls.configuration["models"].get(name, {}).get("backends", {}).get(backend.name, {})
+        }
+
+    def signature(self, model_identifier):
+        """
+        Returns the signature of the model (read from the sidecar; the model is loaded only if there is none).
+
+        :param model_identifier: model identifier
+        :type model_identifier: str
+        :return: model signature
+        :rtype: api.ml.signature.ModelSignature
+        """
+        return self.read_signature(self.resolve(model_identifier))
+
+    @classmethod
+    def read_signature(cls, record, model=None):
+        """
+        Reads the signature of the model described by the registry record.
+
+        The signature is kept by the record (the record is replaced when the
+        model changes). If it is not kept yet, it is read from the JSON sidecar
+        next to the serialized model (``<identifier>.signature.json``; the
+        sidecar of other content is stale). If there is no valid sidecar,
+        the signature is extracted from the <model> (loaded if not given)
+        and written as the sidecar (``predictors.signatures.write_sidecars``).
+
+        :param record: model registry record
+        :type record: api.ml.registry.ModelRecord
+        :param model: deserialized model, defaults to None (loaded if needed)
+        :type model: Any, optional
+        :return: model signature
+        :rtype: api.ml.signature.ModelSignature
+        """
+
+        # Read the signature kept by the record or its sidecar
+        signature = record.signature or ModelSignature.load(record.path, record.content_hash)
+        if signature is not None:
+            record.signature = signature
+            return signature
+
+        # Extract the signature from the model (once per model content)
+        backend = cls.backend_for(record)
+        if model is None:
+            model = cls.load_model(record, backend)
+        signature = ModelSignature.extract(model, record.content_hash, backend.name)
+
+        # Write the sidecar (the signature is still kept by the record if the models location is read-only)
+        if cls.configuration["signatures"].get("write_sidecars", True):
+            try:
+                signature.save(record.path)
+            except OSError:
+                pass
+
+        # Return the signature
+        record.signature = signature
+        return signature
+
+    def describe_models(self):
+        """Lists the signatures of the available models (versions) keyed by the identifier (read from the sidecars)"""
+        models = {}
+        for record in self.registry.records():
+            try:
+                models[record.identifier] = self.read_signature(record).to_dict()
+            except Exception as e:
+                models[record.identifier] = {"content_hash": record.content_hash, "message": str(e)}
+            models[record.identifier].update({
+                "name": record.name,
+                "version": record.version,
+                "active": self.active_version(record.name) is record
+            })
+        return models
+
+    def model_configuration(self, model_identifier, section):
+        """Returns the configuration <section> of the model (the defaults updated by the model-specific values)"""
+        return {
+            **self.configuration.get(section, {}),
+            **self.configuration["models"].get(model_identifier, {}).get(section, {})
+        }
+
+    def resolve(self, model_identifier):
+        """
+        Resolves the model identifier to the model registry record.
+
+        The versions of a model are deployed as ``<name>@<version>.<extension>``
+        files (the ``<name>.<extension>`` file is the unversioned, i.e. the
+        oldest, version). The ``<name>@<version>`` identifier resolves to that version
+        (pinned by the client), the ``<name>`` (or ``<name>@latest``) one to the
+        active version of the model (see: ``active_version``).
+
+        :param model_identifier: model identifier
+        :type model_identifier: str
+        :return: model registry record
+        :rtype: api.ml.registry.ModelRecord
+        """
+        name, version = split_identifier(model_identifier)
+        if version is None or version == LATEST_VERSION:
+            record = self.active_version(name)
+        else:
+            record = self.registry.get(model_identifier)
+        if record is None:
             raise NoLoadablePredictorException(f"Model with identifier '{model_identifier}' cannot be loaded")
-        with open(os.path.join(location, f"{model_identifier}.{self.extension}"), "rb") as file:
-            return Predictor(joblib.load(file))
-
-    def available_models(self, models_path):
-        """Lists the models that are available"""
-        return [
-            os.path.splitext(ntpath.basename(f))[0]
-            for f in glob.glob(f"{models_path}**/*.{self.extension}")
-        ]
+        return record
+
+    @classmethod
+    def active_version(cls, name):
+        """Returns the record of the active version of the model with <name> (or None if there is no version)"""
+        record = cls.active.get(name)
+        if record is None:
+            with cls._active_lock:
+                record = cls.active.get(name)
+                if record is None:
+                    record = cls.select_version(name)
+                    if record is not None:
+                        cls.active[name] = record
+        return record
+
+    @classmethod
+    def select_version(cls, name):
+        """Selects the version of the model with <name> to be active (the configured or the latest version)"""
+        versions = cls.registry.versions(name)
+        pinned = cls.configuration["models"].get(name, {}).get("version")
+        if pinned is not None:
+            for record in versions:
+                if record.version == str(pinned):
+                    return record
+        return versions[-1] if versions else None
+
+    @staticmethod
+    def cache_key(record):
+        """Returns the predictor cache key of the model described by the registry record"""
+        return record.identifier, record.content_hash
+
+    def available_models(self):
+        """Lists the models that are available (names; each of them resolves to its active version)"""
+        return sorted({record.name for record in self.registry.records()})
+
+    @classmethod
+    def index_models(cls):
+        """Indexes the models location (builds or incrementally refreshes the model registry)"""
+        return cls.registry.scan()
+
+    @classmethod
+    def resident_models(cls):
+        """Lists the models that are loaded (cached) by the process"""
+        return sorted({identifier for identifier, _ in cls.cache.keys()})
+
+    @classmethod
+    def cache_statistics(cls):
+        """Returns the predictor cache statistics (hits, misses, evictions, size)"""
+        return cls.cache.statistics()
+
+    @classmethod
+    def _activate_version(cls, identifier, old, new):
+        """
+        Activates the version of the model selected after the change of the model file (atomic swap).
+
+        If the active version of the model is resident (cached), the newly
+        selected version is loaded first (by the registry watcher thread, i.e.
+        in the background) and the active version is swapped only then, so the
+        requests never wait for the loading. The requests in flight keep the
+        previous predictor instance; it is removed from the cache and unloaded
+        once the last of them finishes. If the selected version cannot be
+        loaded (e.g. a broken file), the previous version stays active.
+
+        :param identifier: identifier of the changed model file
+        :type identifier: str
+        :param old: previous record of the model file (None if added)
+        :type old: api.ml.registry.ModelRecord
+        :param new: new record of the model file (None if removed)
+        :type new: api.ml.registry.ModelRecord
+        :return: None
+        :rtype: None type
+        """
+
+        # Select the version to be activated (only if the model has been resolved yet)
+        name = split_identifier(identifier)[0]
+        with cls._active_lock:
+            previous = cls.active.get(name)
+            selected = cls.select_version(name) if previous is not None else None
+
+        # Load the selected version in the background (if the previous one is resident)
+        if previous is not None and selected is not None and cls.cache_key(selected) != cls.cache_key(previous):
+            if cls.configuration["cache"].get("enabled", True) and cls.cache_key(previous) in cls.cache:
+                try:
+                    cls.cache.get_or_load(cls.cache_key(selected), lambda: cls().load_predictor(selected))
+                except Exception:
+                    return
+
+        # Swap the active version
+        with cls._active_lock:
+            if previous is not None and cls.active.get(name) is previous:
+                if selected is not None:
+                    cls.active[name] = selected
+                else:
+                    cls.active.pop(name, None)
+
+        # Unload the previous version and the previous content of the changed file
+        unloaded = {cls.cache_key(record) for record in (previous, old) if record is not None}
+        unloaded.discard(cls.cache_key(selected) if selected is not None else None)
+        for key in unloaded:
+            cls.cache.invalidate(key)
+
+    @classmethod
+    def _extract_signature(cls, identifier, old, new):
+        """
+        Queues the reading (or the extraction) of the signature of the new/modified model at the registration time.
+
+        The registry notifies the listeners while it indexes the models (the
+        first index is built under the registry lock), so the signatures are
+        read (and the models without the sidecar are loaded) by the
+        background signature thread, not by the indexing thread; a signature
+        needed before that is read (extracted) on its first use.
+        """
+        if new is not None and cls.configuration["signatures"].get("extract_on_registration", True):
+            cls._get_signature_executor().submit(cls._read_signature_quietly, new)
+
+    @classmethod
+    def _read_signature_quietly(cls, record):
+        """Reads (or extracts) the signature of the model described by the registry record (errors are ignored)"""
+        try:
+            cls.read_signature(record)
+        except Exception:
+            pass
+
+    @classmethod
+    def _reset_after_fork(cls):
+        """
+        Resets the locks and the signature thread in the forked process.
+
+        The threads of the parent process (e.g. the signature thread) can hold
+        the locks when the process forks; the locks of the child would stay
+        locked forever, as the threads do not exist in the child.
+        """
+        cls.cache.reset_locks()
+        cls._active_lock = threading.RLock()
+        cls._signature_lock = threading.Lock()
+        cls._signature_executor = None
+        cls._signature_executor_pid = None
+
+    @classmethod
+    def _get_signature_executor(cls):
+        """Returns the signature extraction thread (single-thread pool) of the current process"""
+        with cls._signature_lock:
+            if cls._signature_executor is None or cls._signature_executor_pid != os.getpid():
+                cls._signature_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-signature")
+                cls._signature_executor_pid = os.getpid()
+            return cls._signature_executor
+
+
+# Activate the versions (unload the previous ones) and extract the signatures on the model changes
+PredictorManager.registry.subscribe(PredictorManager._activate_version)
+PredictorManager.registry.subscribe(PredictorManager._extract_signature)
+
+# Reset the locks in the forked processes (the registry resets its own ones)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=PredictorManager._reset_after_fork)
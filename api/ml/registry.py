@@ -0,0 +1,324 @@
+import os
+import re
+import time
+import hashlib
+import weakref
+import threading
+
+
+# ---------------------------------------- #
+# Default model registry values definition #
+# ---------------------------------------- #
+DEFAULT_REFRESH_INTERVAL = 5.0
+DEFAULT_SETTLE_TIME = 2.0
+DEFAULT_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Separator of the model name and the model version in the identifiers (<name>@<version>)
+VERSION_SEPARATOR = "@"
+
+
+# -------------------------------- #
+# Model registry record definition #
+# -------------------------------- #
+
+class ModelRecord(object):
+    """Class implementing the model registry record (indexed model file)"""
+
+    def __init__(self, identifier, path, size, mtime, content_hash):
+        """Initializes the ModelRecord"""
+        self.identifier = identifier
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.content_hash = content_hash
+
+        # Model signature (read from the sidecar or extracted on demand; see: PredictorManager.signature)
+        self.signature = None
+
+    def __repr__(self):
+        return str({
+            "identifier": self.identifier,
+            "path": self.path,
+            "size": self.size,
+            "mtime": self.mtime,
+            "content_hash": self.content_hash
+        })
+
+    def __str__(self):
+        return repr(self)
+
+    def is_modified(self, stat):
+        """Checks if the file described by <stat> differs from the indexed one"""
+        return self.size != stat.st_size or self.mtime != stat.st_mtime_ns
+
+    @property
+    def name(self):
+        """Returns the name of the model (the identifier without the version)"""
+        return split_identifier(self.identifier)[0]
+
+    @property
+    def version(self):
+        """Returns the version of the model (None for the unversioned model file)"""
+        return split_identifier(self.identifier)[1]
+
+
+# ------------------------------------ #
+# Model versioning routines definition #
+# ------------------------------------ #
+
+def split_identifier(identifier):
+    """Splits the model <identifier> to the name and the version (``<name>@<version>``; None if not versioned)"""
+    name, separator, version = identifier.partition(VERSION_SEPARATOR)
+    return name, (version if separator else None)
+
+
+def version_key(version):
+    """Returns the sorting key of the model <version> (natural order: v9 < v10; the unversioned model is the oldest)"""
+    if version is None:
+        return 0, ()
+    return 1, tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in re.findall(r"\d+|\D+", version))
+
+
+# ------------------------- #
+# Model registry definition #
+# ------------------------- #
+
+class ModelRegistry(object):
+    """Class implementing the model registry (index of the serialized models keyed by the identifier)"""
+
+    def __init__(self, location, extensions, refresh_interval=DEFAULT_REFRESH_INTERVAL, settle_time=DEFAULT_SETTLE_TIME):
+        """
+        Initializes the ModelRegistry.
+
+        :param location: location of the serialized models
+        :type location: str
+        :param extensions: supported extensions of the serialized models (ordered by the priority)
+        :type extensions: tuple
+        :param refresh_interval: interval of the mtime polling in seconds (None disables polling)
+        :type refresh_interval: float, optional
+        :param settle_time: time in seconds a new/modified file must stay unmodified to be indexed by the polling
+        :type settle_time: float, optional
+        """
+        self.location = location
+        self.extensions = tuple(f".{extension.lstrip('.')}" for extension in extensions)
+        self.refresh_interval = refresh_interval
+        self.settle_time = settle_time
+
+        # Indexed models (identifier: ModelRecord)
+        self._records = {}
+        self._indexed = False
+        self._lock = threading.RLock()
+
+        # Change listeners (called with: identifier, old record, new record)
+        self._listeners = []
+
+        # Polling (watcher) thread (threads do not survive forking, so the PID is tracked)
+        self._watcher = None
+        self._watcher_pid = None
+
+        # Process that does not poll (e.g. the pre-fork supervisor; see: suspend_watching)
+        self._suspended_pid = None
+
+        # Reset the locks and the watcher in the forked processes
+        registries.add(self)
+
+    def __len__(self):
+        self._ensure_indexed()
+        return len(self._records)
+
+    def __contains__(self, identifier):
+        return self.get(identifier) is not None
+
+    def get(self, identifier):
+        """Returns the record of the model with <identifier> (or None if it is not indexed)"""
+        self._ensure_indexed()
+        self._ensure_watching()
+        return self._records.get(identifier)
+
+    def identifiers(self):
+        """Lists the identifiers of the indexed models"""
+        self._ensure_indexed()
+        return list(self._records.keys())
+
+    def records(self):
+        """Lists the records of the indexed models"""
+        self._ensure_indexed()
+        return list(self._records.values())
+
+    def versions(self, name):
+        """Lists the records of the versions of the model with <name> (ordered from the oldest version)"""
+        self._ensure_indexed()
+        self._ensure_watching()
+        records = [record for record in self._records.values() if record.name == name]
+        return sorted(records, key=lambda record: version_key(record.version))
+
+    def subscribe(self, listener):
+        """Registers the <listener> called on each change of the indexed models"""
+        self._listeners.append(listener)
+
+    def scan(self):
+        """
+        Indexes the models location (incrementally).
+
+        Only the new or modified files (size or mtime changed) are hashed, the
+        unchanged files keep their records. The removed files are dropped from
+        the index. The listeners are notified about every change.
+
+        Once the location is indexed, the new or modified files are indexed
+        only after they stay unmodified for ``settle_time`` seconds (until then,
+        the previous record is kept), so the files that are still being
+        written (copied) are not loaded half-written. If the model is stored
+        in several formats (e.g. ``<identifier>.onnx`` and
+        ``<identifier>.joblib``), the file of the extension listed first is
+        indexed.
+
+        :return: identifiers of the added, modified and removed models
+        :rtype: list
+        """
+        with self._lock:
+
+            # Prepare the updated index
+            records, changes = {}, []
+
+            # Index the models location
+            for directory, _, filenames in os.walk(self.location):
+                for filename in filenames:
+                    identifier, extension = os.path.splitext(filename)
+                    if extension not in self.extensions:
+                        continue
+
+                    # Prefer the file of the higher-priority extension (the same model in several formats)
+                    path = os.path.join(directory, filename)
+                    if identifier in records and self._priority(records[identifier].path) <= self._priority(path):
+                        continue
+
+                    # Get the file information
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+
+                    # Reuse the unchanged record or index the file (once it settles)
+                    record = self._records.get(identifier)
+                    if record is None or record.path != path or record.is_modified(stat):
+                        if self._indexed and not self._is_settled(stat):
+                            if record is not None:
+                                records[identifier] = record
+                            continue
+                        record = ModelRecord(
+                            identifier=identifier,
+                            path=path,
+                            size=stat.st_size,
+                            mtime=stat.st_mtime_ns,
+                            content_hash=self.hash_file(path))
+
+                    # Register the record
+                    records[identifier] = record
+
+            # Get the changes
+            for identifier in set(self._records.keys()) | set(records.keys()):
+                old, new = self._records.get(identifier), records.get(identifier)
+                if old is not new:
+                    changes.append((identifier, old, new))
+
+            # Swap the index
+            self._records = records
+            self._indexed = True
+
+        # Notify the listeners
+        for identifier, old, new in changes:
+            for listener in self._listeners:
+                listener(identifier, old, new)
+
+        # Return the changed identifiers
+        return [identifier for identifier, _, _ in changes]
+
+    def _priority(self, path):
+        """Returns the priority of the model file at <path> (the index of its extension; lower is preferred)"""
+        return self.extensions.index(os.path.splitext(path)[1])
+
+    def _is_settled(self, stat):
+        """Checks if the file described by <stat> has not been modified for the settle time"""
+        return not self.settle_time or (time.time() - stat.st_mtime) >= self.settle_time
+
+    @staticmethod
+    def hash_file(path, chunk_size=DEFAULT_HASH_CHUNK_SIZE):
+        """Computes the content hash (SHA-256) of the file at <path>"""
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _ensure_indexed(self):
+        """Makes sure the models location is indexed"""
+        if not self._indexed:
+            with self._lock:
+                if not self._indexed:
+                    self.scan()
+
+    def suspend_watching(self):
+        """
+        Suspends the polling of the models location in the current process.
+
+        The pre-fork supervisor does not serve the requests, so it must not
+        poll (nor load the new versions of the models that only the workers
+        use); the forked processes start their own watcher on the first use.
+        A watcher already running in the current process stops after its
+        current poll.
+
+        :return: None
+        :rtype: None type
+        """
+        self._suspended_pid = os.getpid()
+
+    def _ensure_watching(self):
+        """Makes sure the models location is polled for changes (once per process, unless suspended)"""
+        if not self.refresh_interval or self._watcher_pid == os.getpid() or self._suspended_pid == os.getpid():
+            return
+        with self._lock:
+            if self._watcher_pid != os.getpid():
+                self._watcher = threading.Thread(target=self._watch, name="model-registry-watcher", daemon=True)
+                self._watcher.start()
+                self._watcher_pid = os.getpid()
+
+    def _watch(self):
+        """Polls the models location for changes (until the polling is suspended in the process)"""
+        while True:
+            time.sleep(self.refresh_interval)
+            if self._suspended_pid == os.getpid():
+                return
+            try:
+                self.scan()
+            except Exception:
+                pass
+
+    def _reset_after_fork(self):
+        """
+        Resets the lock and the watcher in the forked process.
+
+        A thread of the parent process (e.g. its watcher hashing a new model)
+        can hold the lock when the process forks; the lock of the child would
+        stay locked forever, as the thread does not exist in the child.
+        """
+        self._lock = threading.RLock()
+        self._watcher = None
+        self._watcher_pid = None
+
+
+# --------------------------------------- #
+# Model registry fork handling definition #
+# --------------------------------------- #
+
+# Model registries of the process (their locks and watchers are reset in the forked processes)
+registries = weakref.WeakSet()
+
+
+def reset_registries_after_fork():
+    """Resets the locks and the watchers of the model registries (called in the forked process)"""
+    for registry in list(registries):
+        registry._reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_registries_after_fork)
@@ -0,0 +1,211 @@
+import os
+import json
+import numpy
+import shutil
+import tempfile
+
+
+# ----------------------------------------- #
+# Default model signature values definition #
+# ----------------------------------------- #
+DEFAULT_SIGNATURE_SUFFIX = ".signature.json"
+DEFAULT_SIGNATURE_VERSION = 1
+
+# Methods of the models recorded in the signature (if supported by the model)
+SIGNATURE_METHODS = ("predict", "predict_proba", "predict_log_proba", "decision_function", "transform")
+
+
+# -------------------------- #
+# Model signature definition #
+# -------------------------- #
+
+class ModelSignature(object):
+    """Class implementing the model signature (what the model expects and supports, stored in the JSON sidecar)"""
+
+    def __init__(self,
+                 content_hash=None,
+                 n_features=None,
+                 feature_names=None,
+                 classes=None,
+                 methods=(),
+                 dtype=None,
+                 allows_nan=False,
+                 estimator=None,
+                 backend=None):
+        """
+        Initializes the ModelSignature.
+
+        :param content_hash: content hash of the serialized model, defaults to None
+        :type content_hash: str, optional
+        :param n_features: number of the features (``n_features_in_``), defaults to None (not known)
+        :type n_features: int, optional
+        :param feature_names: names of the features (``feature_names_in_``), defaults to None (not known)
+        :type feature_names: list, optional
+        :param classes: class labels (``classes_``), defaults to None (not known)
+        :type classes: list, optional
+        :param methods: supported methods (see: ``SIGNATURE_METHODS``), defaults to ()
+        :type methods: tuple, optional
+        :param dtype: dtype of the feature values the model expects, defaults to None (not known)
+        :type dtype: str, optional
+        :param allows_nan: the model allows the missing (NaN) feature values, defaults to False
+        :type allows_nan: bool, optional
+        :param estimator: fully qualified class name of the model, defaults to None
+        :type estimator: str, optional
+        :param backend: name of the inference backend loading the model, defaults to None (chosen by the extension)
+        :type backend: str, optional
+        """
+        self.content_hash = content_hash
+        self.n_features = int(n_features) if n_features is not None else None
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.classes = list(classes) if classes is not None else None
+        self.methods = tuple(methods)
+        self.dtype = str(dtype) if dtype is not None else None
+        self.allows_nan = bool(allows_nan)
+        self.estimator = estimator
+        self.backend = backend
+
+    def __repr__(self):
+        return str(self.to_dict())
+
+    def __str__(self):
+        return repr(self)
+
+    @property
+    def features_dtype(self):
+        """Returns the dtype of the feature values the model expects (None if not known)"""
+        return numpy.dtype(self.dtype) if self.dtype is not None else None
+
+    def supports(self, method):
+        """Checks if the model supports the <method>"""
+        return method in self.methods
+
+    def to_dict(self):
+        """Returns the JSON-serializable signature"""
+        return {
+            "version": DEFAULT_SIGNATURE_VERSION,
+            "content_hash": self.content_hash,
+            "n_features": self.n_features,
+            "feature_names": self.feature_names,
+            "classes": self.classes,
+            "methods": list(self.methods),
+            "dtype": self.dtype,
+            "allows_nan": self.allows_nan,
+            "estimator": self.estimator,
+            "backend": self.backend
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Creates the ModelSignature instance from the JSON-serializable signature"""
+        return cls(
+            content_hash=data.get("content_hash"),
+            n_features=data.get("n_features"),
+            feature_names=data.get("feature_names"),
+            classes=data.get("classes"),
+            methods=data.get("methods", ()),
+            dtype=data.get("dtype"),
+            allows_nan=data.get("allows_nan", False),
+            estimator=data.get("estimator"),
+            backend=data.get("backend"))
+
+    @classmethod
+    def extract(cls, model, content_hash=None, backend=None):
+        """
+        Extracts the signature by inspecting the (deserialized) model.
+
+        The number and the names of the features, the class labels and the NaN
+        handling are read from the fitted scikit-learn attributes and tags
+        (``n_features_in_``, ``feature_names_in_``, ``classes_``, ``allow_nan``).
+        The dtype is known only for the fitted estimators: the tree-based models
+        (the first step of the pipelines) evaluate float32 features, the other
+        ones float64 features (the models loaded by other backends than joblib
+        declare the dtype of their input as ``features_dtype``).
+
+        :param model: deserialized model
+        :type model: Any
+        :param content_hash: content hash of the serialized model, defaults to None
+        :type content_hash: str, optional
+        :param backend: name of the inference backend that loaded the model, defaults to None
+        :type backend: str, optional
+        :return: model signature
+        :rtype: api.ml.signature.ModelSignature
+        """
+
+        # Get the features
+        n_features = getattr(model, "n_features_in_", None)
+        feature_names = getattr(model, "feature_names_in_", None)
+
+        # Get the class labels
+        classes = getattr(model, "classes_", None)
+        classes = numpy.asarray(classes).tolist() if classes is not None and numpy.ndim(classes) == 1 else None
+
+        # Return the signature
+        return cls(
+            content_hash=content_hash,
+            n_features=n_features,
+            feature_names=[str(name) for name in feature_names] if feature_names is not None else None,
+            classes=classes,
+            methods=tuple(method for method in SIGNATURE_METHODS if hasattr(model, method)),
+            dtype=cls.extract_dtype(model) if n_features is not None else None,
+            allows_nan=cls.extract_allows_nan(model),
+            estimator=f"{type(model).__module__}.{type(model).__qualname__}",
+            backend=backend)
+
+    @staticmethod
+    def extract_dtype(model):
+        """Returns the dtype of the feature values the (fitted) <model> expects"""
+        if getattr(model, "features_dtype", None) is not None:
+            return str(numpy.dtype(model.features_dtype))
+        model = model.steps[0][1] if hasattr(model, "steps") else model
+
+        # The tree-based models evaluate the float32 features (the float64 ones would be converted by each call)
+        estimators = getattr(model, "estimators_", None)
+        estimator = numpy.ravel(estimators)[0] if estimators is not None and len(estimators) else model
+        return "float32" if hasattr(estimator, "tree_") else "float64"
+
+    @staticmethod
+    def extract_allows_nan(model):
+        """Checks if the <model> allows the missing (NaN) feature values (the ``allow_nan`` estimator tag)"""
+        try:
+            return bool(model.__sklearn_tags__().input_tags.allow_nan)
+        except (AttributeError, TypeError):
+            return False
+
+    @staticmethod
+    def path_for(model_path):
+        """Returns the path to the signature sidecar of the serialized model at <model_path>"""
+        return os.path.splitext(model_path)[0] + DEFAULT_SIGNATURE_SUFFIX
+
+    @classmethod
+    def load(cls, model_path, content_hash=None):
+        """
+        Loads the signature sidecar of the serialized model at <model_path>.
+
+        :param model_path: path to the serialized model
+        :type model_path: str
+        :param content_hash: content hash of the serialized model (stale sidecars are ignored), defaults to None
+        :type content_hash: str, optional
+        :return: model signature (None if the sidecar does not exist, is not readable or is stale)
+        :rtype: api.ml.signature.ModelSignature
+        """
+        try:
+            with open(cls.path_for(model_path), "rt") as file:
+                signature = cls.from_dict(json.load(file))
+        except (OSError, ValueError, AttributeError):
+            return None
+        if content_hash is not None and signature.content_hash != content_hash:
+            return None
+        return signature
+
+    def save(self, model_path):
+        """Saves the signature sidecar next to the serialized model at <model_path> (atomically, with its file mode)"""
+        path = self.path_for(model_path)
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wt") as file:
+                json.dump(self.to_dict(), file, indent=2)
+            shutil.copymode(model_path, temporary)
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
@@ -0,0 +1,301 @@
+import numpy
+import warnings
+
+
+# ------------------------------------------ #
+# Default tree compilation values definition #
+# ------------------------------------------ #
+DEFAULT_CHUNK_SIZE = 16384
+
+# Output aggregation of the compiled ensembles
+AVERAGE, GRADIENT_BOOSTING = "average", "gradient_boosting"
+
+
+# --------------------------------- #
+# Compiled tree ensemble definition #
+# --------------------------------- #
+
+class CompiledTreeEnsemble(object):
+    """Class implementing the compiled tree ensemble (flat node arrays evaluated by the batched NumPy traversal)"""
+
+    def __init__(self, trees, aggregation, classes=None, n_features=None, feature_names=None, tags=None,
+                 learning_rate=1.0, baseline=None, loss=None, chunk_size=DEFAULT_CHUNK_SIZE, fallback=None,
+                 max_batch_size=None):
+        """
+        Initializes the CompiledTreeEnsemble.
+
+        The nodes of all trees are stored in the flat arrays (indexed by the
+        global node index): the split feature, the split threshold, the
+        children (``2 * node`` for the left child, ``2 * node + 1`` for the
+        right one), the direction of the missing values and the leaf values.
+        The leaves point to themselves, so all trees are traversed by the same
+        number of steps (the maximum depth) without masking; each step moves
+        the nodes of all subjects and all trees at once. The subjects are
+        traversed in chunks of about <chunk_size> nodes (subjects x trees),
+        so the working arrays stay in the CPU caches.
+
+        :param trees: fitted scikit-learn decision trees (``tree_`` attributes)
+        :type trees: list
+        :param aggregation: aggregation of the tree outputs (AVERAGE or GRADIENT_BOOSTING)
+        :type aggregation: str
+        :param classes: class labels (None for the regressors), defaults to None
+        :type classes: numpy.ndarray, optional
+        :param n_features: number of the features, defaults to None
+        :type n_features: int, optional
+        :param feature_names: names of the features, defaults to None
+        :type feature_names: numpy.ndarray, optional
+        :param tags: estimator tags of the compiled model, defaults to None
+        :type tags: sklearn.utils.Tags, optional
+        :param learning_rate: learning rate of the gradient boosting, defaults to 1.0
+        :type learning_rate: float, optional
+        :param baseline: initial raw predictions of the gradient boosting (per output), defaults to None
+        :type baseline: numpy.ndarray, optional
+        :param loss: loss of the gradient boosting classifier (log_loss, exponential), defaults to None
+        :type loss: str, optional
+        :param chunk_size: number of the nodes (subjects x trees) traversed at once, defaults to DEFAULT_CHUNK_SIZE
+        :type chunk_size: int, optional
+        :param fallback: original model predicting the batches larger than <max_batch_size>, defaults to None
+        :type fallback: Any, optional
+        :param max_batch_size: maximum number of the subjects predicted by the compiled model, defaults to None
+        :type max_batch_size: int, optional
+        """
+        self.aggregation = aggregation
+        self.learning_rate = learning_rate
+        self.baseline = baseline
+        self.loss = loss
+        self.chunk_size = max(int(chunk_size), 1)
+        self.tags = tags
+        self.fallback = fallback
+        self.max_batch_size = max_batch_size if fallback is not None else None
+
+        # Set the estimator attributes (the scikit-learn estimator interface)
+        if classes is not None:
+            self.classes_ = classes
+        if n_features is not None:
+            self.n_features_in_ = n_features
+        if feature_names is not None:
+            self.feature_names_in_ = feature_names
+        self.features_dtype = numpy.dtype(numpy.float32)
+
+        # Flatten the nodes of the trees
+        self._flatten([tree.tree_ for tree in trees])
+
+    def _flatten(self, trees):
+        """Flattens the nodes of the <trees> to the global node arrays"""
+        offsets = numpy.cumsum([0] + [tree.node_count for tree in trees])
+        features, thresholds, children, missing, values = [], [], [], [], []
+        for offset, tree in zip(offsets, trees):
+            nodes = numpy.arange(tree.node_count)
+            leaves = tree.children_left < 0
+
+            # Prepare the splits (the leaves point to themselves)
+            features.append(numpy.where(leaves, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            children.append(numpy.stack([
+                numpy.where(leaves, nodes, tree.children_left),
+                numpy.where(leaves, nodes, tree.children_right)], axis=1) + offset)
+            missing.append(numpy.asarray(getattr(tree, "missing_go_to_left", numpy.zeros(tree.node_count)), bool))
+
+            # Prepare the leaf values (class probabilities or regression values)
+            value = tree.value[:, 0, :]
+            if self.aggregation == AVERAGE and hasattr(self, "classes_"):
+                total = value.sum(axis=1, keepdims=True)
+                value = value / numpy.where(total == 0, 1, total)
+            values.append(value)
+
+        # Store the node arrays
+        self.roots = offsets[:-1].astype(numpy.intp)
+        self.feature = numpy.concatenate(features).astype(numpy.intp)
+        self.threshold = numpy.concatenate(thresholds).astype(numpy.float64)
+        self.children = numpy.concatenate(children).astype(numpy.intp).ravel()
+        self.missing_go_to_left = numpy.concatenate(missing)
+        self.value = numpy.ascontiguousarray(numpy.concatenate(values), dtype=numpy.float64)
+        self.max_depth = max(tree.max_depth for tree in trees)
+
+        # The missing values go right (as for the trees fitted without them) unless a split says otherwise
+        if not self.missing_go_to_left.any():
+            self.missing_go_to_left = None
+
+    def __sklearn_tags__(self):
+        """Returns the estimator tags of the compiled model"""
+        if self.tags is None:
+            raise AttributeError("The compiled model has no estimator tags")
+        return self.tags
+
+    @property
+    def n_trees(self):
+        """Returns the number of the compiled trees"""
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        """Returns the number of the compiled nodes"""
+        return len(self.feature)
+
+    def apply(self, values):
+        """
+        Returns the (global) indices of the leaves the feature <values> end in (subjects x trees).
+
+        :param values: feature values (subjects x features; converted to float32 as by scikit-learn)
+        :type values: numpy.ndarray
+        :return: indices of the leaves
+        :rtype: numpy.ndarray
+        """
+        values = numpy.ascontiguousarray(values, dtype=numpy.float32)
+        if values.ndim != 2:
+            raise ValueError(f"Expected 2-dimensional feature values, got the shape {values.shape}")
+        if len(values) == 0:
+            return numpy.empty((0, self.n_trees), dtype=numpy.intp)
+
+        # Traverse the trees by the chunks of the subjects (the missing values are routed only if there are any)
+        rows = max(self.chunk_size // self.n_trees, 1)
+        return numpy.concatenate([
+            self._traverse(chunk, bool(numpy.isnan(chunk).any()))
+            for chunk in (values[start:start + rows] for start in range(0, len(values), rows))])
+
+    def _traverse(self, values, missing_values=False):
+        """Traverses all trees by the chunk of the feature <values> at once"""
+        flat = values.ravel()
+        rows = (numpy.arange(len(values), dtype=numpy.intp) * values.shape[1])[:, None]
+        nodes = numpy.repeat(self.roots[None, :], len(values), axis=0)
+        for _ in range(self.max_depth):
+            x = flat[rows + self.feature[nodes]]
+            right = x > self.threshold[nodes]
+
+            # Route the missing values (to the right unless the split sends them to the left)
+            if missing_values:
+                missing = numpy.isnan(x)
+                if self.missing_go_to_left is not None:
+                    missing &= ~self.missing_go_to_left[nodes]
+                right |= missing
+
+            # Move to the children
+            nodes = self.children[2 * nodes + right]
+        return nodes
+
+    def _raw_predict(self, values):
+        """Aggregates the leaf values of the feature <values> (averaged outputs or raw boosting predictions)"""
+        leaves = self.value[self.apply(values)]
+        if self.aggregation == AVERAGE:
+            return leaves.mean(axis=1)
+        outputs = len(self.baseline)
+        return self.baseline + self.learning_rate * leaves[..., 0].reshape(len(leaves), -1, outputs).sum(axis=1)
+
+    def predict(self, values):
+        """Predicts the values (labels) of the feature <values>"""
+        if self.max_batch_size is not None and len(values) > self.max_batch_size:
+            return self.fallback.predict(values)
+        raw = self._raw_predict(values)
+        if not hasattr(self, "classes_"):
+            return raw[:, 0]
+        if self.aggregation == GRADIENT_BOOSTING and raw.shape[1] == 1:
+            return self.classes_.take((raw[:, 0] >= 0).astype(numpy.intp))
+        return self.classes_.take(numpy.argmax(raw, axis=1))
+
+    @property
+    def predict_proba(self):
+        """Predicts the probabilities of the feature values (available only for the classifiers)"""
+        if not hasattr(self, "classes_"):
+            raise AttributeError("The compiled regressor does not predict the probabilities")
+        return self._predict_proba
+
+    def _predict_proba(self, values):
+        """Predicts the probabilities of the feature <values>"""
+        if self.max_batch_size is not None and len(values) > self.max_batch_size:
+            return self.fallback.predict_proba(values)
+        raw = self._raw_predict(values)
+        if self.aggregation == AVERAGE:
+            return raw
+
+        # Convert the raw predictions of the gradient boosting to the probabilities
+        if raw.shape[1] == 1:
+            positive = 1.0 / (1.0 + numpy.exp(-(2.0 if self.loss == "exponential" else 1.0) * raw[:, 0]))
+            return numpy.stack([1.0 - positive, positive], axis=1)
+        exponential = numpy.exp(raw - raw.max(axis=1, keepdims=True))
+        return exponential / exponential.sum(axis=1, keepdims=True)
+
+
+# ------------------------------------ #
+# Tree compilation routines definition #
+# ------------------------------------ #
+
+def compile_trees(model, chunk_size=DEFAULT_CHUNK_SIZE, max_batch_size=None):
+    """
+    Compiles the fitted scikit-learn tree ensemble to the flat node arrays.
+
+    Supported are the single-output decision trees, random forests and
+    extra trees (classifiers and regressors) and the gradient boosting
+    classifiers (log-loss or exponential loss) and regressors with the
+    constant initial predictions (the default ``init``). The compiled model
+    predicts the same values as the original one (the probabilities within
+    the floating-point rounding of the different summation order).
+
+    The compiled traversal removes the per-call and per-tree overhead of
+    scikit-learn, which dominates the small batches; the large batches of
+    the large ensembles can be faster in scikit-learn, so the batches of
+    more than <max_batch_size> subjects can be left to the original model
+    (which is then kept in the memory along with the compiled one).
+
+    :param model: fitted scikit-learn model
+    :type model: Any
+    :param chunk_size: number of the nodes (subjects x trees) traversed at once, defaults to DEFAULT_CHUNK_SIZE
+    :type chunk_size: int, optional
+    :param max_batch_size: maximum number of the subjects predicted by the compiled model, defaults to None (all)
+    :type max_batch_size: int, optional
+    :return: compiled model (None if the model is not supported)
+    :rtype: api.ml.trees.CompiledTreeEnsemble
+    """
+    try:
+        from sklearn.dummy import DummyClassifier, DummyRegressor
+        from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+        from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+        from sklearn.ensemble import ExtraTreesClassifier, ExtraTreesRegressor
+        from sklearn.ensemble import GradientBoostingClassifier, GradientBoostingRegressor
+    except ImportError:
+        return None
+
+    # Prepare the supported trees and forests (the extra trees are subclasses of the decision trees)
+    trees = (DecisionTreeClassifier, DecisionTreeRegressor)
+    forests = (RandomForestClassifier, RandomForestRegressor, ExtraTreesClassifier, ExtraTreesRegressor)
+
+    # Prepare the estimator attributes
+    attributes = {
+        "classes": getattr(model, "classes_", None),
+        "n_features": getattr(model, "n_features_in_", None),
+        "feature_names": getattr(model, "feature_names_in_", None),
+        "tags": model.__sklearn_tags__() if hasattr(model, "__sklearn_tags__") else None,
+        "chunk_size": chunk_size,
+        "fallback": model if max_batch_size is not None else None,
+        "max_batch_size": max_batch_size
+    }
+
+    # Compile the decision trees and the forests (averaged outputs)
+    if isinstance(model, trees + forests):
+        if getattr(model, "n_outputs_", 1) != 1 or not hasattr(model, "n_features_in_"):
+            return None
+        return CompiledTreeEnsemble(model.estimators_ if isinstance(model, forests) else [model], AVERAGE, **attributes)
+
+    # Compile the gradient boosting (raw predictions of the trees summed per output)
+    if isinstance(model, (GradientBoostingClassifier, GradientBoostingRegressor)):
+        if not (model.init_ == "zero" or isinstance(model.init_, (DummyClassifier, DummyRegressor))):
+            return None
+        if isinstance(model, GradientBoostingClassifier) and model.loss not in ("log_loss", "exponential"):
+            return None
+        compiled = CompiledTreeEnsemble(
+            list(model.estimators_.ravel()),
+            GRADIENT_BOOSTING,
+            learning_rate=model.learning_rate,
+            baseline=numpy.zeros(model.estimators_.shape[1]),
+            loss=getattr(model, "loss", None),
+            **attributes)
+
+        # Derive the (constant) initial raw predictions from the model's own raw predictions
+        origin = numpy.zeros((1, model.n_features_in_), dtype=numpy.float32)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            raw = model.decision_function(origin) if hasattr(compiled, "classes_") else model.predict(origin)
+        compiled.baseline = numpy.ravel(raw) - compiled._raw_predict(origin)[0]
+        return compiled
+
+    # The model is not supported
+    return None
@@ -0,0 +1,125 @@
+import time
+import numpy
+import threading
+from api.ml.manager import PredictorManager
+from api.interfaces.inputs.interface import Features
+
+
+# --------------------------------- #
+# Default warm-up values definition #
+# --------------------------------- #
+DEFAULT_WARMUP_SAMPLES = 1
+
+
+# ------------------------ #
+# Model warm-up definition #
+# ------------------------ #
+
+class ModelWarmup(object):
+    """Class implementing the warm-up of the models (loading and a synthetic prediction at the start-up)"""
+
+    # Configuration for the warm-up
+    configuration = PredictorManager.configuration.get("warmup", {})
+
+    # Warm-up state (shared by the process)
+    _lock = threading.Lock()
+    _done = False
+    _models = {}
+
+    @classmethod
+    def is_enabled(cls):
+        """Checks if the warm-up is enabled"""
+        return cls.configuration.get("enabled", True)
+
+    @classmethod
+    def is_done(cls):
+        """Checks if the warm-up is done (True if the warm-up is disabled)"""
+        with cls._lock:
+            return cls._done or not cls.is_enabled()
+
+    @classmethod
+    def status(cls):
+        """Returns the warm-up status of the models"""
+        with cls._lock:
+            return {identifier: dict(status) for identifier, status in cls._models.items()}
+
+    @classmethod
+    def identifiers(cls):
+        """Returns the identifiers of the models to be warmed up (``*`` stands for all available models)"""
+        identifiers = cls.configuration.get("models") or []
+        if "*" in identifiers:
+            return PredictorManager().available_models()
+        return list(identifiers)
+
+    @classmethod
+    def run(cls, background=False):
+        """
+        Warms up the configured models.
+
+        Each model is loaded (cached by ``PredictorManager``) and, if the
+        number of its features is known (``n_features_in_``), the synthetic
+        feature values are predicted (by all supported methods), so the first
+        request does not pay the deserialization, the first-call and the
+        allocation costs. The failures are reported in the warm-up status and
+        do not prevent the start-up.
+
+        :param background: run the warm-up in a background thread, defaults to False
+        :type background: bool, optional
+        :return: None
+        :rtype: None type
+        """
+
+        # Skip the disabled warm-up
+        if not cls.is_enabled():
+            return
+
+        # Run the warm-up in a background thread
+        if background:
+            threading.Thread(target=cls.run, name="model-warmup", daemon=True).start()
+            return
+
+        # Warm up the models
+        with cls._lock:
+            cls._done = False
+        for identifier in cls.identifiers():
+            status = cls.warm_up(identifier)
+            with cls._lock:
+                cls._models[identifier] = status
+
+        # Finish the warm-up
+        with cls._lock:
+            cls._done = True
+
+    @classmethod
+    def warm_up(cls, identifier):
+        """Warms up the model with <identifier> (returns the warm-up status)"""
+        start = time.monotonic()
+        try:
+
+            # Load the predictor
+            predictor = PredictorManager().load(identifier)
+
+            # Predict the synthetic features
+            features = cls.synthetic_features(predictor)
+            if features is not None:
+                predictor.predict(features)
+                if predictor.supports_proba:
+                    predictor.predict_proba(features)
+
+            # Return the status
+            return {
+                "status": "warm" if features is not None else "loaded",
+                "duration_in_seconds": round(time.monotonic() - start, 6)
+            }
+
+        # Handle the failures
+        except Exception as e:
+            return {"status": "failed", "message": str(e), "duration_in_seconds": round(time.monotonic() - start, 6)}
+
+    @classmethod
+    def synthetic_features(cls, predictor):
+        """Prepares the synthetic features for the <predictor> (None if the number of features is not known)"""
+        if not predictor.n_features:
+            return None
+        samples = max(int(cls.configuration.get("samples", DEFAULT_WARMUP_SAMPLES)), 1)
+        return Features(numpy.zeros((samples, predictor.n_features), dtype=predictor.features_dtype), [])
@@ -0,0 +1,289 @@
+import os
+import sys
+import json
+import time
+import flask
+import pstats
+import cProfile
+import tempfile
+import functools
+import threading
+from pathlib import Path
+from flask_jwt_extended import get_jwt
+from api.common.identifiers import get_identifier
+from api.configuration import load_configuration, application_path
+
+
+# --------------------------------------- #
+# Default profiling attributes definition #
+# --------------------------------------- #
+DEFAULT_PROFILING_HEADER = "X-Profile"
+DEFAULT_PROFILING_RESPONSE_HEADER = "X-Profile-Location"
+DEFAULT_PROFILING_MODE = "deterministic"
+DEFAULT_PROFILING_CLAIM = "profiling"
+DEFAULT_SAMPLING_INTERVAL = 1.0
+
+# Profiling modes (mode: aliases accepted in the profiling header)
+PROFILING_MODES = {
+    "deterministic": ("deterministic", "pstats", "cprofile"),
+    "sampling": ("sampling", "speedscope")
+}
+
+
+# ------------------------------------------- #
+# Profiling configuration routines definition #
+# ------------------------------------------- #
+
+def configure_profiling():
+    """Configures the on-demand request profiling"""
+
+    # Get the configuration
+    configuration = load_configuration("profiling.json").get("profiling", {})
+
+    # Get the location of the profiles
+    profiles_location = configuration.get("location")
+    profiles_location = profiles_location or os.path.join(application_path, "..", "logs", "profiles")
+
+    # Return the configuration
+    return {
+        "enabled": configuration.get("enabled", True),
+        "header": configuration.get("header", DEFAULT_PROFILING_HEADER),
+        "response_header": configuration.get("response_header", DEFAULT_PROFILING_RESPONSE_HEADER),
+        "mode": configuration.get("mode", DEFAULT_PROFILING_MODE),
+        "sampling_interval": configuration.get("sampling_interval_in_milliseconds", DEFAULT_SAMPLING_INTERVAL),
+        "claim": configuration.get("claim", DEFAULT_PROFILING_CLAIM),
+        "allowed_users": list(configuration.get("allowed_users", [])),
+        "location": os.path.realpath(profiles_location)
+    }
+
+
+# ---------------------------- #
+# Sampling profiler definition #
+# ---------------------------- #
+
+class SamplingProfiler(object):
+    """Class implementing the sampling profiler of one thread (call stacks exported in the speedscope format)"""
+
+    def __init__(self, thread_identifier=None, interval=DEFAULT_SAMPLING_INTERVAL):
+        """
+        Initializes the SamplingProfiler.
+
+        :param thread_identifier: identifier of the sampled thread, defaults to None (the calling thread)
+        :type thread_identifier: int, optional
+        :param interval: sampling interval in milliseconds, defaults to DEFAULT_SAMPLING_INTERVAL
+        :type interval: float, optional
+        """
+        self.thread_identifier = thread_identifier or threading.get_ident()
+        self.interval = max(float(interval), 0.1) / 1000.0
+
+        # Sampled call stacks (frame indices from the root) and their weights (seconds)
+        self.frames = {}
+        self.samples = []
+        self.weights = []
+
+        # Sampling thread
+        self._stopped = threading.Event()
+        self._sampler = None
+        self._start = None
+        self._end = None
+
+    def enable(self):
+        """Starts sampling the thread"""
+        self._stopped.clear()
+        self._start = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample, name="request-profiler", daemon=True)
+        self._sampler.start()
+
+    def disable(self):
+        """Stops sampling the thread"""
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self._end = time.perf_counter()
+
+    def dump_stats(self, path, name=None):
+        """Writes the sampled call stacks to <path> in the speedscope file format"""
+        frames = [None] * len(self.frames)
+        for (function, filename, line), index in self.frames.items():
+            frames[index] = {"name": function, "file": filename, "line": line}
+        with open(path, "wt") as file:
+            json.dump({
+                "$schema": "https://www.speedscope.app/file-format-schema.json",
+                "shared": {"frames": frames},
+                "profiles": [{
+                    "type": "sampled",
+                    "name": name or "request",
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": (self._end or time.perf_counter()) - self._start,
+                    "samples": self.samples,
+                    "weights": self.weights
+                }],
+                "name": name or "request",
+                "activeProfileIndex": 0,
+                "exporter": "predictor-api"
+            }, file)
+
+    def _sample(self):
+        """Samples the call stack of the thread every interval"""
+        previous = time.perf_counter()
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_identifier)
+            now = time.perf_counter()
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                key = (code.co_name, code.co_filename, frame.f_lineno)
+                stack.append(self.frames.setdefault(key, len(self.frames)))
+                frame = frame.f_back
+            self.samples.append(stack[::-1])
+            self.weights.append(now - previous)
+            previous = now
+
+
+# --------------------------- #
+# Request profiler definition #
+# --------------------------- #
+
+class RequestProfiler(object):
+    """Class implementing the on-demand request profiler (opt-in via the request header, authorized users only)"""
+
+    def __init__(self, configuration):
+        """
+        Initializes the RequestProfiler.
+
+        :param configuration: profiling configuration (see: ``configure_profiling``)
+        :type configuration: dict
+        """
+        self.configuration = configuration
+
+        # Only one request is profiled by the process at a time (the other requests are not profiled)
+        self._lock = threading.Lock()
+
+    def requested_mode(self):
+        """Returns the profiling mode requested by the header of the current request (or None if not requested)"""
+        if not self.configuration["enabled"]:
+            return None
+        value = flask.request.headers.get(self.configuration["header"])
+        if value is None:
+            return None
+        value = value.strip().lower()
+        for mode, aliases in PROFILING_MODES.items():
+            if value in aliases:
+                return mode
+        return self.configuration["mode"]
+
+    def is_allowed(self):
+        """Checks if the user of the current (authorized) request is allowed to profile (JWT claim)"""
+        try:
+            return get_jwt().get(self.configuration["claim"]) is True
+        except (RuntimeError, KeyError):
+            return False
+
+    def claims(self, username=None, token_claims=None):
+        """
+        Returns the profiling claims of the tokens issued to the user.
+
+        The claim is issued at the log-in to the users whose username is
+        listed in ``allowed_users`` and it is carried over by the refreshed
+        access tokens (<token_claims>: claims of the refresh token), so the
+        changes of the allowlist apply from the next log-in.
+
+        :param username: username of the logged-in user, defaults to None
+        :type username: str, optional
+        :param token_claims: claims of the refresh token, defaults to None
+        :type token_claims: dict, optional
+        :return: additional claims of the tokens
+        :rtype: dict
+        """
+        claim = self.configuration["claim"]
+        if username is not None and username in self.configuration["allowed_users"]:
+            return {claim: True}
+        if token_claims is not None and token_claims.get(claim) is True:
+            return {claim: True}
+        return {}
+
+    def profile(self, function, resource, *args, **kwargs):
+        """
+        Calls the <function> under the profiler if the current request asks for it and the user is allowed.
+
+        The deterministic mode profiles every call (cProfile; saved as the
+        pstats file ``<identifier>.prof``), the sampling mode samples the call
+        stack of the request thread (saved as the speedscope file
+        ``<identifier>.speedscope.json``). The identifier is the request
+        identifier used by the request/response logs (a new one if the request
+        was not logged). The path to the profile is sent in the response header.
+
+        :param function: function handling the request (resource method)
+        :type function: callable
+        :param resource: resource instance
+        :type resource: flask_restful.Resource
+        :return: HTTP response
+        :rtype: flask.Response
+        """
+
+        # Handle the request without profiling (not requested, not allowed or another request is profiled)
+        mode = self.requested_mode()
+        if mode is None or not self.is_allowed() or not self._lock.acquire(blocking=False):
+            return function(resource, *args, **kwargs)
+
+        # Handle the request under the profiler
+        try:
+            if mode == "sampling":
+                profiler = SamplingProfiler(interval=self.configuration["sampling_interval"])
+            else:
+                profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = flask.make_response(function(resource, *args, **kwargs))
+            finally:
+                profiler.disable()
+                path = self.save(profiler, getattr(resource, "identifier", None) or get_identifier())
+        finally:
+            self._lock.release()
+
+        # Point to the profile
+        response.headers[self.configuration["response_header"]] = self.display_path(path)
+        return response
+
+    def save(self, profiler, identifier):
+        """Saves the profile of the request with <identifier> (atomically) and returns its path"""
+        Path(self.configuration["location"]).mkdir(parents=True, exist_ok=True)
+        suffix = ".speedscope.json" if isinstance(profiler, SamplingProfiler) else ".prof"
+        path = os.path.join(self.configuration["location"], f"{identifier}{suffix}")
+        descriptor, temporary = tempfile.mkstemp(dir=self.configuration["location"], suffix=".tmp")
+        os.close(descriptor)
+        try:
+            if isinstance(profiler, SamplingProfiler):
+                profiler.dump_stats(temporary, name=identifier)
+            else:
+                pstats.Stats(profiler).dump_stats(temporary)
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        return path
+
+    @staticmethod
+    def display_path(path):
+        """Returns the <path> relative to the application root (or the absolute one if it is outside)"""
+        root = os.path.realpath(os.path.join(application_path, ".."))
+        return os.path.relpath(path, root) if os.path.commonpath((path, root)) == root else path
+
+
+# Profiling configuration and request profiler (shared by the process)
+configuration = configure_profiling()
+request_profiler = RequestProfiler(configuration)
+
+
+def profiled(function):
+    """Decorates the resource method, so the request can be profiled on demand (apply under ``@jwt_required()``)"""
+
+    @functools.wraps(function)
+    def wrapper(resource, *args, **kwargs):
+        return request_profiler.profile(function, resource, *args, **kwargs)
+
+    return wrapper
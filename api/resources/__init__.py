@@ -1,6 +1,12 @@
 from api.resources.security import SignupResource, LoginResource, RefreshAccessTokenResource
 from api.resources.predict import PredictClassesResource
 from api.resources.predict_proba import PredictProbaResource
+from api.resources.predict_combined import PredictCombinedResource
+from api.resources.predict_stream import PredictStreamResource
+from api.resources.jobs import JobsResource, JobResource, JobResultResource
+from api.resources.models import ModelsResource
+from api.resources.health import HealthResource, ReadyResource
+from api.resources.metrics import MetricsResource
 
 
 # ------------------------------------------ #
@@ -17,6 +23,39 @@ def add_predict_proba_resource(api):
     api.add_resource(PredictProbaResource, "/predict_proba")
 
 
+def add_predict_combined_resource(api):
+    """Registers predict_combined resource"""
+    api.add_resource(PredictCombinedResource, "/predict_combined")
+
+
+def add_predict_stream_resource(api):
+    """Registers predict_stream resource"""
+    api.add_resource(PredictStreamResource, "/predict_stream")
+
+
+def add_jobs_resources(api):
+    """Registers batch-scoring jobs resources"""
+    api.add_resource(JobsResource, "/jobs")
+    api.add_resource(JobResource, "/jobs/<string:job>")
+    api.add_resource(JobResultResource, "/jobs/<string:job>/result")
+
+
+def add_models_resource(api):
+    """Registers models resource"""
+    api.add_resource(ModelsResource, "/models")
+
+
+def add_health_resources(api):
+    """Registers health (liveness and readiness) resources"""
+    api.add_resource(HealthResource, "/health")
+    api.add_resource(ReadyResource, "/ready")
+
+
+def add_metrics_resource(api):
+    """Registers metrics resource"""
+    api.add_resource(MetricsResource, "/metrics")
+
+
 def add_signup_resource(api):
     """Registers signup resource"""
     api.add_resource(SignupResource, "/signup")
@@ -50,11 +89,23 @@ def configure_routes(api):
     #
     #  1. add and register the PredictClassesResource
     #  2. add and register the PredictProbaResource
-    #  3. add and register the SignupResource
-    #  4. add and register the LoginResource
-    #  5. add and register the RefreshAccessTokenResource
+    #  3. add and register the PredictCombinedResource
+    #  4. add and register the PredictStreamResource
+    #  5. add and register the JobsResource, JobResource and JobResultResource
+    #  6. add and register the ModelsResource
+    #  7. add and register the HealthResource and ReadyResource
+    #  8. add and register the MetricsResource
+    #  9. add and register the SignupResource
+    # 10. add and register the LoginResource
+    # 11. add and register the RefreshAccessTokenResource
     add_predict_resource(api)
     add_predict_proba_resource(api)
+    add_predict_combined_resource(api)
+    add_predict_stream_resource(api)
+    add_jobs_resources(api)
+    add_models_resource(api)
+    add_health_resources(api)
+    add_metrics_resource(api)
     add_signup_resource(api)
     add_login_resource(api)
     add_refresh_resource(api)
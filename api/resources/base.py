@@ -1,9 +1,19 @@
 import os
+import flask
 from pathlib import Path
+from http import HTTPStatus
+from flask_restful import Resource
 from api.common.identifiers import get_identifier
 from api.common.logging import get_request_logger, get_response_logger, get_application_logger, get_loggable_object
+from api.common.logging import configure_payload_logging, is_sampled
 from api.configuration import application_path
-from api.caching import configure_caching, DEFAULT_CACHING_TIME
+from api.caching import configure_caching, PredictionCache
+from api.caching import DEFAULT_CACHING_TIME, DEFAULT_CACHE_ENTRIES, DEFAULT_CACHE_SIZE_IN_BYTES
+from api.ml.manager import PredictorManager
+from api.metrics import StageTimer
+from api.wrappers.request import RequestWrapper
+from api.wrappers.response import ResponseWrapper
+from api.interfaces.inputs.interface import Features, PredictorModel
 
 
 # --------------------------------------- #
@@ -20,17 +30,32 @@ class LoggableResource(object):
     request_logger = get_request_logger()
     response_logger = get_response_logger()
 
+    # Configuration for logging of the payloads (truncation/summarization and sampling)
+    payload_configuration = configure_payload_logging()
+
     def __init__(self):
         self.identifier = None
+        self.sampled = True
 
     def log_request_data(self, request):
-        """Logs the request data"""
+        """Logs the request data (sampled; the payload is truncated/summarized)"""
         self.identifier = get_identifier()
-        self.request_logger.info(get_loggable_object(request, self.identifier))
+        self.sampled = is_sampled(self.payload_configuration["sampling_rate"])
+        if self.sampled:
+            self.request_logger.info(get_loggable_object(
+                request,
+                self.identifier,
+                mode=self.payload_configuration["mode"],
+                max_length=self.payload_configuration["max_length"]))
 
     def log_response_data(self, response):
-        """Logs the response data"""
-        self.response_logger.info(get_loggable_object(response, self.identifier))
+        """Logs the response data (sampled; the payload is truncated/summarized)"""
+        if self.sampled:
+            self.response_logger.info(get_loggable_object(
+                response,
+                self.identifier,
+                mode=self.payload_configuration["mode"],
+                max_length=self.payload_configuration["max_length"]))
 
     @property
     def application_logger(self):
@@ -49,4 +74,137 @@ class CacheableResource(object):
     caching_configuration = configure_caching()
 
     # Caching attributes
+    CACHE_ENABLED = caching_configuration.get("enabled", True)
     CACHE_EXPIRATION_TIME = caching_configuration.get("expiration_time_in_seconds", DEFAULT_CACHING_TIME)
+    CACHE_MAX_ENTRIES = caching_configuration.get("max_entries", DEFAULT_CACHE_ENTRIES)
+    CACHE_MAX_SIZE_IN_BYTES = caching_configuration.get("max_size_in_bytes", DEFAULT_CACHE_SIZE_IN_BYTES)
+
+    # Prediction cache (shared by all requests handled by the process)
+    prediction_cache = PredictionCache(
+        max_entries=CACHE_MAX_ENTRIES,
+        max_size_in_bytes=CACHE_MAX_SIZE_IN_BYTES,
+        expiration_time=CACHE_EXPIRATION_TIME)
+
+    def predict_cached(self, endpoint, predictor, features):
+        """
+        Predicts the <features> via the <endpoint> method of the predictor (cached).
+
+        :param endpoint: endpoint (predictor method) name (predict or predict_proba)
+        :type endpoint: str
+        :param predictor: predictor
+        :type predictor: api.ml.interface.Predictor
+        :param features: features
+        :type features: api.interfaces.inputs.Features
+        :return: predicted value(s)
+        :rtype: numpy.ndarray
+        """
+
+        # Predict (not cached)
+        key = self.prediction_cache.make_key(endpoint, predictor, features.values) if self.CACHE_ENABLED else None
+        if key is None:
+            return getattr(predictor, endpoint)(features)
+
+        # Predict (cached)
+        predicted = self.prediction_cache.get(key)
+        if predicted is None:
+            predicted = getattr(predictor, endpoint)(features)
+            self.prediction_cache.put(key, predicted)
+
+        # Return the predicted value(s)
+        return predicted
+
+
+# Invalidate the cached predictions on the model changes
+PredictorManager.registry.subscribe(CacheableResource.prediction_cache.invalidate_model)
+
+
+# ---------------------------------------- #
+# Predictor API Resources class definition #
+# ---------------------------------------- #
+
+class PredictorResource(Resource, LoggableResource, CacheableResource):
+    """Class implementing the predictor API resource (shared prediction workflow)"""
+
+    def predict(self, request, features, model):
+        """
+        Predicts the output(s) for the features (implemented by the specific predictor resources).
+
+        :param request: unwrapped request
+        :type request: dict
+        :param features: features
+        :type features: api.interfaces.inputs.Features
+        :param model: predictor
+        :type model: api.ml.interface.Predictor
+        :return: predictions
+        :rtype: api.interfaces.outputs.Predictions
+        """
+        raise NotImplementedError
+
+    def process(self):
+        """
+        Processes the prediction request.
+
+        1. Unwrap the input request
+        2. Prepare and validate the predictor based on the model identifier
+        3. Prepare and validate the features (decoded for the model)
+        4. Predict the output(s) for the features (see: ``predict``)
+        5. Prepare and validate the prediction(s)
+        6. Wrap the output response
+        7. Send the successful HTTP Response
+
+        The format of the predicted values in the response is negotiated via
+        the ``format`` query parameter (``json``: json-tricks strings, the
+        default; ``native``: nested JSON lists; ``compact``: compact ndarray
+        envelopes with the base64-encoded buffers). The ``native`` and
+        ``compact`` responses are serialized in a single pass.
+
+        :return: HTTP response
+        :rtype: flask.Response
+        """
+
+        # Measure the stages of the workflow (labeled by the endpoint and the model)
+        timer = StageTimer(flask.request.url_rule.rule if flask.request.url_rule else flask.request.path)
+        status = "error"
+
+        try:
+
+            # Unwrap the input request (and negotiate the response format)
+            with timer.stage("unwrap"):
+                request = RequestWrapper.unwrap_request(flask.request)
+                response_format = ResponseWrapper.negotiate_format(flask.request)
+            self.log_request_data(request)
+
+            # Prepare predictor based on the model name specification and configuration
+            with timer.stage("model"):
+                model = PredictorModel.from_request(request).model
+            timer.model = model.identifier or ""
+
+            # Prepare and validate the features (decoded for the model)
+            with timer.stage("features"):
+                features = Features.from_request(request, model)
+
+            # Predict the output(s) for the features
+            with timer.stage("predict"):
+                predicted = self.predict(request, features, model)
+
+            # Prepare and validate the prediction(s)
+            with timer.stage("to_response"):
+                predicted = predicted.to_response(response_format)
+            self.log_response_data(predicted)
+
+            # Wrap the output response
+            with timer.stage("wrap"):
+                response = ResponseWrapper.wrap_response(predicted, response_format)
+
+            # Send the successful HTTP Response
+            status = "success"
+            return flask.Response(response=response, status=HTTPStatus.OK, mimetype="application/json")
+
+        # Handle the error logging
+        except Exception as e:
+            self.application_logger.error(e)
+            raise
+
+        # Record the metrics
+        finally:
+            timer.finish(status)
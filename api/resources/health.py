@@ -0,0 +1,48 @@
+from flask_restful import Resource
+from http import HTTPStatus
+from api.ml.manager import PredictorManager
+from api.ml.warmup import ModelWarmup
+
+
+# ---------------------------------------------------- #
+# Health (liveness/readiness) API Resources definition #
+# ---------------------------------------------------- #
+
+class HealthResource(Resource):
+    """Class implementing the liveness API resource"""
+
+    def get(self):
+        """
+        Checks if the API process is alive.
+
+        The check is intentionally cheap (no database or model access), so it
+        can be polled frequently by the load balancer or the orchestrator.
+
+        :return: liveness status
+        :rtype: dict
+        """
+        return {"status": "alive"}, HTTPStatus.OK
+
+
+class ReadyResource(Resource):
+    """Class implementing the readiness API resource"""
+
+    def get(self):
+        """
+        Checks if the API process is ready to serve the predictions (the warm-up of the models is done).
+
+        The response comprises the readiness, the models that are resident in
+        the process (loaded and cached) and the warm-up status of the models.
+        Until the warm-up is done, HTTP 503 is returned.
+
+        :return: readiness status
+        :rtype: dict
+        """
+        ready = ModelWarmup.is_done()
+        return {
+            "status": "ready" if ready else "warming-up",
+            "models": {
+                "resident": PredictorManager.resident_models(),
+                "warmup": ModelWarmup.status()
+            }
+        }, HTTPStatus.OK if ready else HTTPStatus.SERVICE_UNAVAILABLE
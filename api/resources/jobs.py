@@ -0,0 +1,180 @@
+import flask
+import marshmallow
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required
+from http import HTTPStatus
+from api.wrappers.data import DataWrapper
+from api.wrappers.request import RequestWrapper
+from api.wrappers.response import ResponseWrapper
+from api.interfaces.inputs.interface import Features, PredictorModel
+from api.interfaces.outputs.interface import Predictions
+from api.jobs.manager import JobManager
+from api.resources.base import LoggableResource
+
+
+# ------------------------------------------- #
+# Batch-scoring jobs API Resources definition #
+# ------------------------------------------- #
+
+class BaseJobResource(Resource, LoggableResource):
+    """Base class for the batch-scoring job resources"""
+
+    # Supported predictor methods
+    predictor_methods = ("predict", "predict_proba")
+
+    # Job manager
+    manager = JobManager()
+
+    @staticmethod
+    def get_status(state):
+        """Returns the public job status (without the internal fields)"""
+        return {key: value for key, value in state.items() if key not in ("pid", "labels")}
+
+
+class JobsResource(BaseJobResource):
+    """Class implementing the batch-scoring job submission API resource"""
+
+    @jwt_required()
+    def post(self):
+        """
+        Submits the batch-scoring job.
+
+        The method expects the same input data as ``/predict`` (see:
+        ``api.resources.predict.py``) extended by the optional ``method`` field
+        (``predict`` or ``predict_proba``; defaults to ``predict``; it can be
+        passed via the query parameters as well). The features are validated
+        and stored, the job is queued and its status is returned immediately
+        (HTTP 202), so the long-running scoring does not occupy the request
+        thread. The job is processed by the local worker pool chunk by chunk.
+
+        **Workflow**
+
+        1. Unwrap the input request
+        2. Prepare and validate the predictor based on the model identifier
+        3. Prepare and validate the features (decoded for the model)
+        4. Submit the job
+        5. Send the job status (``Location``: ``/jobs/<job>``)
+
+        **Example**
+
+        .. code-block:: python
+
+            import time
+            import requests
+
+            # Submit the job (example: locally deployed API, body as for /predict)
+            job = requests.post("http://localhost:5000/jobs", json=body, headers=headers).json()
+
+            # Poll the job status
+            while job["status"] in ("queued", "running"):
+                time.sleep(1)
+                job = requests.get(f"http://localhost:5000/jobs/{job['job']}", headers=headers).json()
+
+            # Download the results
+            response = requests.get(f"http://localhost:5000/jobs/{job['job']}/result", headers=headers)
+        """
+
+        try:
+
+            # Unwrap the input request
+            request = RequestWrapper.unwrap_request(flask.request)
+            self.log_request_data(request)
+
+            # Prepare and validate the predictor method
+            method = request.get("method") or flask.request.args.get("method", "predict")
+            if method not in self.predictor_methods:
+                raise marshmallow.ValidationError(f"Must be one of: {', '.join(self.predictor_methods)}.", "method")
+
+            # Prepare and validate the predictor based on the model identifier
+            model = PredictorModel.from_request(request)
+            if not model.model.supports(method):
+                raise marshmallow.ValidationError(f"The model does not support {method}.", "method")
+
+            # Prepare and validate the features (decoded for the model)
+            features = Features.from_request(request, model.model)
+
+            # Submit the job
+            state = self.get_status(self.manager.submit(model.identifier, method, features))
+            self.log_response_data(state)
+
+            # Send the job status
+            return state, HTTPStatus.ACCEPTED, {"Location": f"/jobs/{state['job']}"}
+
+        # Handle the error logging
+        except Exception as e:
+            self.application_logger.error(e)
+            raise
+
+
+class JobResource(BaseJobResource):
+    """Class implementing the batch-scoring job status/cancellation API resource"""
+
+    @jwt_required()
+    def get(self, job):
+        """
+        Gets the status of the job.
+
+        The status comprises the job identifier, the model identifier, the
+        predictor method, the status (``queued``, ``running``, ``finished``,
+        ``failed``, ``cancelled``), the progress (``processed`` and ``total``
+        number of the subjects), the error message of the failed job and the
+        timestamps (``created_on``, ``started_on``, ``finished_on`` and
+        ``expires_on``; the finished jobs and their results are removed after
+        the expiration time).
+
+        :param job: job identifier
+        :type job: str
+        :return: job status
+        :rtype: dict
+        """
+        return self.get_status(self.manager.status(job)), HTTPStatus.OK
+
+    @jwt_required()
+    def delete(self, job):
+        """
+        Cancels the queued or running job (the running job stops before its next chunk) or removes the finished job.
+
+        :param job: job identifier
+        :type job: str
+        :return: job status
+        :rtype: dict
+        """
+        return self.get_status(self.manager.cancel(job)), HTTPStatus.OK
+
+
+class JobResultResource(BaseJobResource):
+    """Class implementing the batch-scoring job result API resource"""
+
+    @jwt_required()
+    def get(self, job):
+        """
+        Downloads the results of the finished job.
+
+        The results are returned in the same format as the ``/predict``
+        response (``{"predicted": ...}``; ``?format=native`` or
+        ``?format=compact`` selects the format of the predicted values), or as
+        the raw ``.npy`` buffer if ``?format=npy`` is passed or
+        ``application/x-npy`` is accepted.
+        Requesting the results of an unfinished job returns HTTP 409.
+
+        :param job: job identifier
+        :type job: str
+        :return: HTTP response
+        :rtype: flask.Response
+        """
+
+        # Get the results
+        predicted = self.manager.result(job)
+
+        # Send the raw .npy buffer
+        if flask.request.args.get("format") == "npy" or \
+                flask.request.accept_mimetypes.best in RequestWrapper.binary_mimetypes:
+            return flask.Response(
+                response=DataWrapper.wrap_binary_data(predicted),
+                status=HTTPStatus.OK,
+                mimetype="application/x-npy")
+
+        # Send the JSON-serialized results (in the negotiated response format)
+        response_format = ResponseWrapper.negotiate_format(flask.request)
+        response = ResponseWrapper.wrap_response(Predictions(predicted).to_response(response_format), response_format)
+        return flask.Response(response=response, status=HTTPStatus.OK, mimetype="application/json")
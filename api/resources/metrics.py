@@ -0,0 +1,32 @@
+import flask
+from flask_restful import Resource
+from http import HTTPStatus
+from api.metrics import metrics
+
+
+# ------------------------------- #
+# Metrics API Resource definition #
+# ------------------------------- #
+
+class MetricsResource(Resource):
+    """Class implementing the metrics API resource"""
+
+    def get(self):
+        """
+        Exposes the metrics in the Prometheus text format.
+
+        The metrics comprise the number of the processed requests
+        (``predictor_api_requests_total``), the duration of the requests
+        (``predictor_api_request_duration_seconds``) and the duration of the
+        stages of the request workflow (``predictor_api_stage_duration_seconds``;
+        stages: ``unwrap``, ``features``, ``model``, ``predict``,
+        ``to_response``, ``wrap``), labeled by the endpoint and the model. The
+        metrics are aggregated across all worker processes.
+
+        :return: HTTP response
+        :rtype: flask.Response
+        """
+        return flask.Response(
+            response=metrics.expose(),
+            status=HTTPStatus.OK,
+            mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,29 @@
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required
+from http import HTTPStatus
+from api.ml.manager import PredictorManager
+
+
+# ------------------------------ #
+# Models API Resource definition #
+# ------------------------------ #
+
+class ModelsResource(Resource):
+    """Class implementing the models (listing of the available models) API resource"""
+
+    @jwt_required()
+    def get(self):
+        """
+        Lists the available models and their signatures.
+
+        The signature of a model comprises the number and the names of the
+        features, the class labels, the supported methods, the dtype of the
+        feature values the model expects and the content hash of the model
+        file. The signatures are read from the JSON sidecars written next to
+        the serialized models at the registration time, so the models are not
+        unpickled (see: ``api.ml.manager.PredictorManager.read_signature``).
+
+        :return: signatures of the available models keyed by the model identifier
+        :rtype: dict
+        """
+        return {"models": PredictorManager().describe_models()}, HTTPStatus.OK
@@ -1,24 +1,18 @@
-import flask
-from flask_restful import Resource
 from flask_jwt_extended import jwt_required
-from flask_api_cache import ApiCache
-from http import HTTPStatus
-from api.wrappers.request import RequestWrapper
-from api.wrappers.response import ResponseWrapper
-from api.interfaces.inputs.interface import Features, PredictorModel
 from api.interfaces.outputs.interface import Predictions
-from api.resources.base import LoggableResource, CacheableResource
+from api.resources.base import PredictorResource
+from api.profiling import profiled
 
 
 # ------------------------------------------ #
 # Predict class(/es) API Resource definition #
 # ------------------------------------------ #
 
-class PredictClassesResource(Resource, LoggableResource, CacheableResource):
+class PredictClassesResource(PredictorResource):
     """Class implementing the predict classes API resource (controller)"""
 
     @jwt_required()
-    @ApiCache(expired_time=CacheableResource.CACHE_EXPIRATION_TIME)
+    @profiled
     def post(self):
         """
         Predicts the class(/es) for 1-M subjects.
@@ -35,6 +29,10 @@ class PredictClassesResource(Resource, LoggableResource, CacheableResource):
         and ``/login`` API calls. For more information, see:
         ``api.resources.security.py``.
 
+        The request can be profiled on demand by the authorized users (the
+        profiling header; see: ``api.profiling``). The profile is saved under
+        ``logs/profiles`` and its path is sent in the response header.
+
         **Input data**
 
         Structure of the input data is the following: it is a ``dict`` object
@@ -47,21 +45,20 @@ class PredictClassesResource(Resource, LoggableResource, CacheableResource):
 
         .. code-block:: python
 
-            # Example: 10 subjects, each having 5 2-D features (shape: (2, 5))
+            # Example: 10 subjects, each having 5 features (shape: (10, 5))
             {
                 "features": {
                     "labels": ["feature 1", ... "feature 5"],
-                    "values": np.array((10, 2, 5))
+                    "values": np.array((10, 5))
                 },
                 "model": "model_identifier"
             }
 
-        It can be seen that the feature values can be multi-dimensional. The
-        logic is that the last dimension of the N-dimensional feature values
-        array for a particular subject stands for the number of features in the
-        array. E.g. in the case of 1-D data (N 1-D features), it can be
-        ``(1, N)`` or ``(N,)``, in the case of 2-D data (N 2-D features), it
-        is ``(2, N)``, etc.
+        The feature values are 2-dimensional: the first dimension stands for
+        the subjects, the second one for the features, i.e. ``(M, N)`` for M
+        subjects with N features each (N must match the number of the features
+        of the model, ``n_features_in_``). The feature values of other shapes
+        (e.g. ``(M, 1, N)``) are rejected with 400 Bad Request.
 
         As the feature values are stored in a ``np.array``, they must be
         serialized before sending in the request. The predictor API expects the
@@ -91,8 +88,8 @@ class PredictClassesResource(Resource, LoggableResource, CacheableResource):
         **Workflow**
 
         1. Unwrap the input request
-        2. Prepare and validate the features
-        3. Prepare and validate the predictor based on the model identifier
+        2. Prepare and validate the predictor based on the model identifier
+        3. Prepare and validate the features (decoded for the model)
         4. Predict the class(/es) for the features
         5. Prepare and validate the prediction(s)
         6. Wrap the output response
@@ -107,8 +104,8 @@ class PredictClassesResource(Resource, LoggableResource, CacheableResource):
             from pprint import pprint
             from api.wrappers.data import DataWrapper
 
-            # Prepare the features (example: 10 subjects, each 100 1-D features)
-            features = numpy.random.rand(10, *(1, 100))
+            # Prepare the features (example: 10 subjects, each 100 features; shape: (10, 100))
+            features = numpy.random.rand(10, 100)
 
             # Serialize the features
             features = DataWrapper.wrap_data(features)
@@ -146,42 +143,8 @@ class PredictClassesResource(Resource, LoggableResource, CacheableResource):
             pprint(predicted)
         """
 
-        try:
-
-            # Predict the class(/es) for the input sample features
-            #
-            #  1. Unwrap the input request
-            #  2. Prepare and validate the features
-            #  3. Prepare and validate the predictor based on the model identifier
-            #  4. Predict the class(/es) for the features
-            #  5. Prepare and validate the prediction
-            #  6. Wrap the output response
-            #  7. Send the successful HTTP Response
-
-            # Unwrap the input request
-            request = RequestWrapper.unwrap_request(flask.request)
-            self.log_request_data(request)
-
-            # Prepare and validate the features
-            features = Features.from_request(request)
-
-            # Prepare predictor based on the model name specification and configuration
-            model = PredictorModel.from_request(request).model
-
-            # Predict the class(/es) for the features
-            predicted = model.predict(features)
-
-            # Prepare and validate the prediction(s)
-            predicted = Predictions(predicted).to_response()
-            self.log_response_data(predicted)
-
-            # Wrap the output response
-            response = ResponseWrapper.wrap_response(predicted)
-
-            # Send the successful HTTP Response
-            return flask.Response(response=response, status=HTTPStatus.OK, mimetype="application/json")
+        return self.process()
 
-        # Handle the error logging
-        except Exception as e:
-            self.application_logger.error(e)
-            raise
+    def predict(self, request, features, model):
+        """Predicts the class(/es) for the features (cached)"""
+        return Predictions(self.predict_cached("predict", model, features))
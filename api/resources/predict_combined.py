@@ -0,0 +1,86 @@
+import marshmallow
+from flask_jwt_extended import jwt_required
+from api.interfaces.inputs.interface import PredictorOutputs
+from api.interfaces.outputs.interface import CombinedPredictions
+from api.resources.base import PredictorResource
+from api.profiling import profiled
+
+
+# ------------------------------------------------------- #
+# Predict combined (classes/probabilities) API definition #
+# ------------------------------------------------------- #
+
+class PredictCombinedResource(PredictorResource):
+    """Class implementing the predict combined (classes and probabilities) API resource (controller)"""
+
+    @jwt_required()
+    @profiled
+    def post(self):
+        """
+        Predicts the class(/es) and the class probabilit(y/ies) for 1-M subjects in one pass.
+
+        The method expects the same input data as ``/predict`` and
+        ``/predict_proba`` (see: ``api.resources.predict.py``), so the features
+        are decoded and validated only once. The output sections can be
+        selected by the optional ``outputs`` field (defaults to both):
+
+        - ``outputs`` (``list``, optional): ``["predicted", "probabilities"]``
+
+        If the model supports ``predict_proba``, exposes ``classes_`` and its
+        ``predict`` is the argmax of the probabilities (e.g. the scikit-learn
+        forests, naive Bayes or logistic regression; see:
+        ``Predictor.predicts_argmax_proba``), only ``predict_proba`` is run and
+        the class(/es) are derived from the probabilities (argmax), so the
+        model is evaluated once. Otherwise, ``predict`` is run for the
+        class(/es), so they are always the same as the ``/predict`` ones.
+
+        **Output data**
+
+        Structure of the output data is the following: it is a ``dict`` object
+        with the selected field-value pairs (example bellow): ``predicted``
+        (``np.array``, optional), ``probabilities`` (``np.array``, optional)
+
+        .. code-block:: python
+
+            # Example: 10 subjects, 1 predicted value, 3 classes
+            {
+                "predicted": np.array((10, 1)),
+                "probabilities": np.array((10, 3))
+            }
+
+        **Workflow**
+
+        1. Unwrap the input request
+        2. Prepare and validate the predictor based on the model identifier
+        3. Prepare and validate the features (decoded for the model)
+        4. Predict the class probabilit(y/ies) and derive the class(/es)
+        5. Prepare and validate the prediction(s)
+        6. Wrap the output response
+        7. Send the successful HTTP Response
+        """
+        return self.process()
+
+    def predict(self, request, features, model):
+        """Predicts the selected outputs for the features (cached; the class(/es) derived from the probabilities)"""
+
+        # Prepare and validate the selected output sections
+        outputs = PredictorOutputs.from_request(request)
+
+        # Predict the class probabilit(y/ies) (needed for the derived classes as well)
+        probabilities = None
+        if model.supports_proba:
+            probabilities = self.predict_cached("predict_proba", model, features)
+        elif "probabilities" in outputs:
+            raise marshmallow.ValidationError("The model does not support predicting of the probabilities.", "outputs")
+
+        # Derive the class(/es) from the probabilities (fall back to predict)
+        predicted = None
+        if "predicted" in outputs:
+            predicted = model.predict_from_proba(probabilities) if probabilities is not None else None
+            if predicted is None:
+                predicted = self.predict_cached("predict", model, features)
+
+        # Return the selected predictions
+        return CombinedPredictions(
+            predicted=predicted,
+            probabilities=probabilities if "probabilities" in outputs else None)
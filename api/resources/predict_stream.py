@@ -0,0 +1,196 @@
+import flask
+import marshmallow
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required
+from http import HTTPStatus
+from api.wrappers.data import DataWrapper
+from api.wrappers.request import RequestWrapper, RequestUnwrappingException
+from api.wrappers.response import ResponseWrapper, DEFAULT_RESPONSE_FORMAT
+from api.interfaces.inputs.interface import Features, PredictorModel
+from api.interfaces.outputs.interface import Predictions
+from api.ml.manager import PredictorManager
+from api.resources.base import LoggableResource
+
+
+# --------------------------------------- #
+# Default streaming attributes definition #
+# --------------------------------------- #
+DEFAULT_MAX_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+# -------------------------------------- #
+# Predict stream API Resource definition #
+# -------------------------------------- #
+
+class PredictStreamResource(Resource, LoggableResource):
+    """Class implementing the streaming predict API resource (controller)"""
+
+    # Supported predictor methods
+    predictor_methods = ("predict", "predict_proba")
+
+    # Maximum size of a chunk of the streamed features
+    max_chunk_size = PredictorManager.configuration.get("streaming", {}).get(
+        "max_chunk_size_in_bytes", DEFAULT_MAX_CHUNK_SIZE)
+
+    @jwt_required()
+    def post(self):
+        """
+        Predicts the class(/es) or the class probabilit(y/ies) for the streamed chunks of subjects.
+
+        The method is intended for very large batches that do not fit into the
+        memory at once. The body of the request is a stream of the feature
+        chunks, each of them is predicted by the same predictor as soon as it
+        is read, and the predictions are streamed back chunk by chunk. The peak
+        memory is bounded by the chunk size (``predictors.streaming`` in
+        ``ml.json``), not by the size of the whole batch.
+
+        **Input data**
+
+        The model identifier and the predictor method are passed via the query
+        parameters: ``?model=<identifier>&method=<predict|predict_proba>``
+        (the method defaults to ``predict``). The body of the request is one of:
+
+        - ``application/x-ndjson``: each line holds the JSON-serialized
+          features of a chunk (``{"values": ..., "labels": [...]}``; the values
+          are serialized in the same way as for ``/predict``)
+        - ``application/x-npy-stream``: the length-prefixed ``.npy`` frames of
+          the feature values (the 8-byte little-endian unsigned size of the
+          frame followed by the ``.npy`` buffer; see:
+          ``api.wrappers.data.DataWrapper.wrap_binary_frame``)
+
+        **Output data**
+
+        The predictions are streamed in the format of the request: the NDJSON
+        lines (``{"predicted": ...}``; the format of the predicted values can
+        be selected via ``?format=native|compact``; if a chunk fails, the last
+        line is ``{"message": ...}``) or the length-prefixed ``.npy`` frames (if a
+        chunk fails, the stream ends prematurely). The errors in the first
+        chunk are reported by the standard error responses.
+
+        **Workflow**
+
+        1. Prepare and validate the predictor based on the model identifier
+        2. Unwrap the first chunk of the input request and predict it
+        3. Stream the predictions of the first and of the following chunks
+
+        **Example**
+
+        .. code-block:: python
+
+            import json
+            import numpy
+            import requests
+            from api.wrappers.data import DataWrapper
+
+            # Prepare the chunks of the features (example: 100 chunks of 10000 subjects)
+            def chunks():
+                for _ in range(100):
+                    features = numpy.random.rand(10000, 100)
+                    yield json.dumps({"values": DataWrapper.wrap_data(features)}).encode() + b"\\n"
+
+            # Call the predict stream endpoint (example: locally deployed API)
+            response = requests.post(
+                url="http://localhost:5000/predict_stream?model=model&method=predict",
+                data=chunks(),
+                headers={"Authorization": f"Bearer 123456789", "Content-Type": "application/x-ndjson"},
+                stream=True)
+
+            # Get the predictions chunk by chunk
+            for line in response.iter_lines():
+                predicted = DataWrapper.unwrap_data(json.loads(line).get("predicted"))
+        """
+
+        try:
+
+            # Prepare and validate the predictor method
+            method = flask.request.args.get("method", "predict")
+            if method not in self.predictor_methods:
+                raise marshmallow.ValidationError(f"Must be one of: {', '.join(self.predictor_methods)}.", "method")
+
+            # Prepare the request streaming mode
+            ndjson = flask.request.mimetype in RequestWrapper.ndjson_mimetypes
+            if not ndjson and flask.request.mimetype not in RequestWrapper.frames_mimetypes:
+                raise RequestUnwrappingException(f"Unsupported streaming content type: '{flask.request.mimetype}'")
+            response_format = ResponseWrapper.negotiate_format(flask.request)
+
+            # Prepare predictor based on the model name specification and configuration
+            self.log_request_data({"model": flask.request.args.get("model"), "method": method, "stream": ndjson})
+            model = PredictorModel.from_request(flask.request.args).model
+            if not model.supports(method):
+                raise marshmallow.ValidationError(f"The model does not support {method}.", "method")
+
+            # Unwrap the first chunk of the input request and predict it (the errors are reported by the status)
+            chunks = RequestWrapper.unwrap_stream_request(flask.request, max_chunk_size=self.max_chunk_size)
+            first = next(chunks, None)
+            first = self.predict_chunk(model, method, first, ndjson, response_format) if first is not None else None
+
+            # Stream the predictions
+            return flask.Response(
+                response=flask.stream_with_context(self.stream(model, method, first, chunks, ndjson, response_format)),
+                status=HTTPStatus.OK,
+                mimetype=RequestWrapper.ndjson_mimetypes[0] if ndjson else RequestWrapper.frames_mimetypes[0])
+
+        # Handle the error logging
+        except Exception as e:
+            self.application_logger.error(e)
+            raise
+
+    def stream(self, model, method, first, chunks, ndjson, response_format=DEFAULT_RESPONSE_FORMAT):
+        """Streams the predictions of the <first> (already predicted) and the remaining <chunks>"""
+        streamed = {"chunks": 0, "subjects": 0}
+        try:
+            if first is not None:
+                streamed["chunks"], streamed["subjects"] = 1, first[1]
+                yield first[0]
+            for chunk in chunks:
+                predicted, subjects = self.predict_chunk(model, method, chunk, ndjson, response_format)
+                streamed["chunks"] += 1
+                streamed["subjects"] += subjects
+                yield predicted
+
+        # Handle the errors (the status is already sent)
+        except Exception as e:
+            self.application_logger.error(e)
+            streamed["message"] = str(e)
+            if ndjson:
+                yield (ResponseWrapper.wrap_response({"message": str(e)}) + "\n").encode("utf8")
+
+        # Log the streamed response summary
+        finally:
+            self.log_response_data(streamed)
+
+    @staticmethod
+    def predict_chunk(model, method, chunk, ndjson, response_format=DEFAULT_RESPONSE_FORMAT):
+        """
+        Predicts the chunk of the streamed features.
+
+        :param model: predictor
+        :type model: api.ml.interface.Predictor
+        :param method: predictor method (predict, predict_proba)
+        :type method: str
+        :param chunk: unwrapped chunk of the request data
+        :type chunk: dict
+        :param ndjson: NDJSON streaming mode (otherwise length-prefixed .npy frames)
+        :type ndjson: bool
+        :param response_format: format of the predicted values (NDJSON streaming mode), defaults to "json"
+        :type response_format: str, optional
+        :return: wrapped predictions and the number of subjects in the chunk
+        :rtype: tuple
+        """
+
+        # Prepare and validate the features
+        features = Features.from_request(chunk, model)
+
+        # Predict the output(s) for the features
+        predicted = getattr(model, method)(features)
+
+        # Wrap the predictions
+        if ndjson:
+            wrapped = Predictions(predicted).to_response(response_format)
+            wrapped = ResponseWrapper.wrap_response(wrapped, response_format)
+            wrapped = (wrapped.encode("utf8") if isinstance(wrapped, str) else wrapped) + b"\n"
+        else:
+            wrapped = DataWrapper.wrap_binary_frame(predicted)
+
+        # Return the wrapped predictions
+        return wrapped, len(features.values)
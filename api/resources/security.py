@@ -1,10 +1,11 @@
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token, create_refresh_token
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity, create_access_token, create_refresh_token
 from http import HTTPStatus
 from webargs import validate
 from webargs import fields
 from webargs.flaskparser import use_args, use_kwargs
 from api.authentication.database.models import User
+from api.profiling import request_profiler
 
 
 # --------------------------------- #
@@ -77,10 +78,11 @@ class SignupResource(BaseUserResource):
         if self.model.get_by_username(username):
             return {"message": "Username already exist"}, HTTPStatus.BAD_REQUEST
 
-        # Create the new user
+        # Create the new user (only the unique username violation is reported here, other database errors are 5xx)
         user = self.model(username=username, password=password)
         user.hash_password()
-        user.save()
+        if not user.save():
+            return {"message": "Username already exist"}, HTTPStatus.BAD_REQUEST
 
         # Return the response
         return {"username": str(user.username)}, HTTPStatus.CREATED
@@ -129,11 +131,12 @@ class LoginResource(BaseUserResource):
         if not user:
             return {"message": "Invalid credentials"}, HTTPStatus.UNAUTHORIZED
 
-        # Create the token: a) access token, b) refresh token
+        # Create the token: a) access token, b) refresh token (with the profiling claim for the allowed users)
+        claims = request_profiler.claims(username=user.username)
         data = {
             "username": user.username,
-            "access_token": create_access_token(identity=str(user.id), fresh=True),
-            "refresh_token": create_refresh_token(identity=str(user.id))
+            "access_token": create_access_token(identity=str(user.id), fresh=True, additional_claims=claims),
+            "refresh_token": create_refresh_token(identity=str(user.id), additional_claims=claims)
         }
 
         # Return the response with the token
@@ -177,8 +180,11 @@ class RefreshAccessTokenResource(Resource):
         if not current_user:
             return {"message": "Invalid user"}, HTTPStatus.UNAUTHORIZED
 
-        # Refresh the token
-        token = create_access_token(identity=current_user, fresh=False)
+        # Refresh the token (the profiling claim is carried over from the refresh token)
+        token = create_access_token(
+            identity=current_user,
+            fresh=False,
+            additional_claims=request_profiler.claims(token_claims=get_jwt()))
 
         # Return the response with the fresh token
         return {"access_token": token}, HTTPStatus.OK
@@ -0,0 +1,172 @@
+import os
+import sys
+import time
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import BaseWSGIServer
+from api.common.logging import close_queues
+from api.metrics import flush_metrics, retire_metrics
+
+
+# ------------------------------------ #
+# Default server attributes definition #
+# ------------------------------------ #
+DEFAULT_WORKERS = 2
+DEFAULT_THREADS = 4
+DEFAULT_RESTART_DELAY = 1.0
+
+
+# ---------------------------------- #
+# Thread-pool WSGI server definition #
+# ---------------------------------- #
+
+class ThreadPoolWSGIServer(BaseWSGIServer):
+    """Class implementing WSGI server handling the requests by a bounded pool of threads"""
+
+    # Set the server attributes
+    multithread = True
+    multiprocess = True
+
+    def __init__(self, host, port, app, threads=DEFAULT_THREADS, **kwargs):
+        """Initializes the ThreadPoolWSGIServer (binds the listening socket)"""
+        super().__init__(host, port, app, **kwargs)
+        self.threads = max(int(threads), 1)
+
+        # The requests are accepted only if there is a free thread (other workers can accept them instead)
+        self.slots = threading.BoundedSemaphore(self.threads)
+        self.executor = None
+
+    def serve_forever(self, poll_interval=0.5):
+        """Handles the requests until shutdown (the threads are created in the process that serves)"""
+        self.executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="worker")
+        self.socket.setblocking(False)
+        try:
+            super().serve_forever(poll_interval=poll_interval)
+        finally:
+            self.executor.shutdown(wait=True)
+
+    def _handle_request_noblock(self):
+        """Handles one request (waits for a free thread first)"""
+        with self.slots:
+            pass
+        super()._handle_request_noblock()
+
+    def process_request(self, request, client_address):
+        """Processes the request in the thread pool"""
+        self.slots.acquire()
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        """Processes the request (executed by the thread pool)"""
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+
+
+# ------------------------------------- #
+# Pre-fork server supervisor definition #
+# ------------------------------------- #
+
+class PreforkServer(object):
+    """Class implementing the pre-fork server (supervisor of the worker processes)"""
+
+    def __init__(self, app, host, port, workers=DEFAULT_WORKERS, threads=DEFAULT_THREADS):
+        """
+        Initializes the PreforkServer.
+
+        :param app: WSGI application (prepared in the supervisor before forking)
+        :type app: flask.Flask
+        :param host: hostname or ip address to listen on
+        :type host: str
+        :param port: port of the web-server
+        :type port: int
+        :param workers: number of the worker processes, defaults to DEFAULT_WORKERS
+        :type workers: int, optional
+        :param threads: number of the threads per worker, defaults to DEFAULT_THREADS
+        :type threads: int, optional
+        """
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = max(int(workers), 1)
+        self.threads = max(int(threads), 1)
+
+        # Worker processes (PID: worker number)
+        self.processes = {}
+        self.stopping = False
+        self.server = None
+
+    def serve(self):
+        """
+        Binds the listening socket, forks the workers and supervises them.
+
+        The application (including the preloaded models) is prepared before the
+        workers are forked, so the memory is shared copy-on-write. The workers
+        that die are restarted. SIGTERM/SIGINT stop the workers gracefully.
+
+        :return: None
+        :rtype: None type
+        """
+
+        # Bind the listening socket (shared by the workers)
+        self.server = ThreadPoolWSGIServer(self.host, self.port, self.app, threads=self.threads)
+
+        # Handle the termination signals
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        # Fork the workers
+        for number in range(self.workers):
+            self._spawn(number)
+
+        # Supervise the workers (restart the dead ones)
+        while self.processes:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            number = self.processes.pop(pid, None)
+            retire_metrics(pid)
+            if number is not None and not self.stopping:
+                print(f"Worker {number} (PID {pid}) died with status {status}, restarting", file=sys.stderr)
+                time.sleep(DEFAULT_RESTART_DELAY)
+                self._spawn(number)
+
+        # Close the listening socket
+        self.server.server_close()
+
+    def _spawn(self, number):
+        """Forks the worker with the <number>"""
+        pid = os.fork()
+        if pid:
+            self.processes[pid] = number
+            return
+
+        # Serve the requests in the worker (SIGTERM finishes the in-flight requests and stops the worker)
+        status = 0
+        try:
+            signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=self.server.shutdown).start())
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            self.server.serve_forever()
+        except BaseException:
+            status = 1
+        finally:
+            flush_metrics()
+            close_queues()
+            os._exit(status)
+
+    def _stop(self, *_):
+        """Stops the workers"""
+        self.stopping = True
+        for pid in list(self.processes.keys()):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
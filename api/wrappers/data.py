@@ -1,5 +1,17 @@
+import io
+import gzip
+import json
+import base64
+import struct
+import functools
+import numpy
 import json_tricks
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # ---------------------------------------------- #
 # Data wrapping/unwrapping exceptions definition #
@@ -15,14 +27,96 @@ class DataWrappingException(Exception): pass
 class DataWrapper(object):
     """Class implementing data wrapper (wrapping and unwrapping data)"""
 
+    # Prefix of the base64-encoded compact ndarray data (json-tricks ndarray_compact)
+    compact_prefix = "b64:"
+
+    # Prefix of the base64-encoded gzip-compressed compact ndarray data (json-tricks ndarray_compact, compressed)
+    compressed_prefix = "b64.gz:"
+
+    # Kinds of the dtypes serialized as the raw buffer in the compact ndarray envelope (booleans and numbers)
+    compact_kinds = "biufc"
+
+    # Length prefix of the binary frames (little-endian unsigned 64-bit size of the following .npy buffer)
+    frame_prefix = struct.Struct("<Q")
+
+    # Supported formats of the wrapped data (json: json-tricks string, native: nested lists, compact: ndarray envelope)
+    data_formats = ("json", "native", "compact")
+
     @staticmethod
     def unwrap_data(data):
-        """Unwraps the data (deserialize from JSON-string to numpy.ndarray)"""
+        """Unwraps the data (deserialize from JSON-string/compact ndarray envelope to numpy.ndarray)"""
         try:
-            return json_tricks.loads(data) if isinstance(data, str) else data
+            if isinstance(data, str):
+                return json_tricks.loads(data)
+            if isinstance(data, dict) and "__ndarray__" in data:
+                return DataWrapper.unwrap_compact_data(data)
+            return data
         except Exception as e:
             raise DataUnwrappingException(e)
 
+    @staticmethod
+    def unwrap_typed_data(data, dtype=None):
+        """
+        Unwraps the data straight to the contiguous numpy.ndarray of the <dtype>.
+
+        The JSON-strings are parsed by ``orjson`` if installed (the standard
+        JSON decoder is used otherwise and for the non-standard ``NaN`` and
+        ``Infinity`` literals) and the ndarray envelopes (json-tricks
+        ``__ndarray__`` objects, including the compact ones) are converted to
+        the <dtype> as they are decoded, so the values are not materialized in
+        the intermediate float64 array (or by the json-tricks object hooks)
+        first. The non-numeric data keep their dtype.
+
+        :param data: data to be unwrapped (JSON-string, ndarray envelope, nested list or numpy.ndarray)
+        :type data: str or dict or list or numpy.ndarray
+        :param dtype: target dtype of the numeric data, defaults to None (the dtype of the data)
+        :type dtype: numpy.dtype, optional
+        :return: unwrapped data
+        :rtype: numpy.ndarray or Any
+        """
+        try:
+            if isinstance(data, str):
+                data = DataWrapper._loads_json(data, dtype)
+            elif isinstance(data, dict):
+                data = DataWrapper._unwrap_envelope(dtype, data)
+            if isinstance(data, (list, tuple)):
+                data = numpy.asarray(data, dtype=dtype)
+            if not isinstance(data, numpy.ndarray):
+                return data
+            return numpy.ascontiguousarray(data, dtype=DataWrapper._target_dtype(data.dtype, dtype))
+        except Exception as e:
+            raise DataUnwrappingException(e)
+
+    @staticmethod
+    def _loads_json(data, dtype=None):
+        """Parses the JSON-string (the ndarray envelopes are unwrapped to numpy.ndarray of the <dtype>)"""
+        if orjson is not None:
+            try:
+                data = orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+            else:
+                return DataWrapper._unwrap_envelope(dtype, data) if isinstance(data, dict) else data
+        return json.loads(data, object_hook=functools.partial(DataWrapper._unwrap_envelope, dtype))
+
+    @staticmethod
+    def _unwrap_envelope(dtype, data):
+        """Unwraps the ndarray envelope to numpy.ndarray of the <dtype> (other objects are kept as they are)"""
+        if "__ndarray__" not in data:
+            return data
+        values = data["__ndarray__"]
+        if isinstance(values, str):
+            array = DataWrapper.unwrap_compact_data(data)
+            return array.astype(DataWrapper._target_dtype(array.dtype, dtype), copy=False)
+        source = numpy.dtype(data.get("dtype", "float64"))
+        array = numpy.asarray(values, dtype=DataWrapper._target_dtype(source, dtype))
+        return array.reshape(data["shape"]) if data.get("shape") is not None else array
+
+    @staticmethod
+    def _target_dtype(source, dtype):
+        """Returns the <dtype> if the <source> dtype is numeric and the <dtype> is given (the <source> otherwise)"""
+        return numpy.dtype(dtype) if dtype is not None and numpy.dtype(source).kind in "biuf" else source
+
     @staticmethod
     def wrap_data(data):
         """Wraps the data (serialize numpy.ndarray to JSON-string)"""
@@ -30,3 +124,173 @@ class DataWrapper(object):
             return json_tricks.dumps(data, allow_nan=True) if not isinstance(data, str) else data
         except Exception as e:
             raise DataWrappingException(e)
+
+    @staticmethod
+    def wrap_formatted_data(data, data_format="json"):
+        """
+        Wraps the data in the <data_format>.
+
+        Formats:
+
+        - ``json``: json-tricks string (see: ``wrap_data``)
+        - ``native``: the numpy.ndarray is kept as it is, so it is serialized to
+          the nested JSON lists by the numpy-aware JSON encoder of the response
+          in the same pass as the rest of the response
+        - ``compact``: compact ndarray envelope (see: ``wrap_compact_data``)
+
+        :param data: data to be wrapped
+        :type data: numpy.ndarray
+        :param data_format: format of the wrapped data, defaults to "json"
+        :type data_format: str, optional
+        :return: wrapped data
+        :rtype: str or numpy.ndarray or dict
+        """
+        if data_format == "native":
+            return data
+        if data_format == "compact":
+            return DataWrapper.wrap_compact_data(data)
+        return DataWrapper.wrap_data(data)
+
+    @staticmethod
+    def unwrap_compact_data(data):
+        """
+        Unwraps the compact ndarray envelope (decode the base64 buffer directly to numpy.ndarray).
+
+        Both buffers written by json-tricks (``ndarray_compact``) are decoded:
+        the raw one (``b64:``) and the gzip-compressed one (``b64.gz:``;
+        json-tricks compresses the buffers that compress well). The envelopes
+        of the other forms are decoded by json-tricks.
+        """
+        try:
+            values = data["__ndarray__"]
+            dtype = numpy.dtype(data.get("dtype", "float64"))
+            shape = data.get("shape")
+
+            # Decode the envelope not recognized by the wrapper by json-tricks
+            if isinstance(values, str) and not values.startswith(
+                    (DataWrapper.compact_prefix, DataWrapper.compressed_prefix)):
+                return numpy.asarray(json_tricks.loads(json.dumps(data)))
+
+            # Decode the base64-encoded raw (or gzip-compressed) buffer (no intermediate Python objects)
+            if isinstance(values, str):
+                dtype = dtype.newbyteorder("<" if data.get("endian", "little") == "little" else ">")
+                if values.startswith(DataWrapper.compressed_prefix):
+                    buffer = gzip.decompress(
+                        base64.b64decode(values[len(DataWrapper.compressed_prefix):], validate=True))
+                else:
+                    buffer = base64.b64decode(values[len(DataWrapper.compact_prefix):], validate=True)
+                array = numpy.frombuffer(buffer, dtype=dtype)
+                if not data.get("Corder", True):
+                    return array.reshape(shape, order="F")
+                return array.reshape(shape) if shape is not None else array
+
+            # Decode the (non-compact) nested list
+            return numpy.asarray(values, dtype=dtype).reshape(shape) if shape is not None else numpy.asarray(values)
+        except Exception as e:
+            raise DataUnwrappingException(e)
+
+    @staticmethod
+    def wrap_compact_data(data):
+        """
+        Wraps the data (serialize numpy.ndarray to the compact ndarray envelope with the base64-encoded buffer).
+
+        Only the numeric (and boolean) arrays are serialized as the raw
+        buffer. The other arrays (e.g. the object or string class labels) are
+        wrapped to the envelope with the nested list of the values (the raw
+        buffer of an object array holds the addresses of the Python objects).
+        """
+        try:
+            data = numpy.ascontiguousarray(data)
+
+            # Wrap the non-numeric values to the nested list
+            if data.dtype.kind not in DataWrapper.compact_kinds:
+                return {
+                    "__ndarray__": data.tolist(),
+                    "dtype": str(data.dtype),
+                    "shape": list(data.shape)
+                }
+
+            # Wrap the numeric values to the base64-encoded raw buffer
+            return {
+                "__ndarray__": DataWrapper.compact_prefix + base64.b64encode(data.tobytes()).decode("ascii"),
+                "dtype": str(data.dtype.newbyteorder("=")),
+                "shape": list(data.shape),
+                "Corder": True,
+                "endian": "big" if data.dtype.byteorder == ">" or (
+                        data.dtype.byteorder == "=" and not numpy.little_endian) else "little"
+            }
+        except Exception as e:
+            raise DataWrappingException(e)
+
+    @staticmethod
+    def unwrap_binary_data(data):
+        """Unwraps the binary data (deserialize from .npy bytes to numpy.ndarray)"""
+        try:
+            return numpy.load(io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data, allow_pickle=False)
+        except Exception as e:
+            raise DataUnwrappingException(e)
+
+    @staticmethod
+    def wrap_binary_data(data):
+        """Wraps the data (serialize numpy.ndarray to .npy bytes)"""
+        try:
+            buffer = io.BytesIO()
+            numpy.save(buffer, numpy.asarray(data), allow_pickle=False)
+            return buffer.getvalue()
+        except Exception as e:
+            raise DataWrappingException(e)
+
+    @staticmethod
+    def unwrap_binary_frames(stream, max_frame_size=None):
+        """
+        Unwraps the length-prefixed binary frames (deserialize each .npy frame to numpy.ndarray).
+
+        Each frame consists of the 8-byte little-endian unsigned size of the
+        frame followed by the raw ``.npy`` buffer. The frames are read from
+        the <stream> one by one, so only one frame is held in memory.
+
+        :param stream: readable binary stream
+        :type stream: io.RawIOBase
+        :param max_frame_size: maximum size of a frame in bytes, defaults to None (no limit)
+        :type max_frame_size: int, optional
+        :return: generator of the unwrapped frames
+        :rtype: Generator[numpy.ndarray]
+        """
+        while True:
+            try:
+                prefix = DataWrapper._read_exactly(stream, DataWrapper.frame_prefix.size)
+                if prefix is None:
+                    return
+                size = DataWrapper.frame_prefix.unpack(prefix)[0]
+                if max_frame_size is not None and size > max_frame_size:
+                    raise ValueError(f"Frame of {size} bytes exceeds the maximum size of {max_frame_size} bytes")
+                buffer = DataWrapper._read_exactly(stream, size)
+                if buffer is None:
+                    raise ValueError("Missing frame data")
+                frame = DataWrapper.unwrap_binary_data(bytes(buffer))
+            except DataUnwrappingException:
+                raise
+            except Exception as e:
+                raise DataUnwrappingException(e)
+            yield frame
+
+    @staticmethod
+    def wrap_binary_frame(data):
+        """Wraps the data (serialize numpy.ndarray to the length-prefixed .npy frame)"""
+        buffer = DataWrapper.wrap_binary_data(data)
+        return DataWrapper.frame_prefix.pack(len(buffer)) + buffer
+
+    @staticmethod
+    def _read_exactly(stream, size):
+        """Reads exactly <size> bytes from the <stream> (None at the end of the stream)"""
+        buffer = bytearray()
+        while len(buffer) < size:
+            data = stream.read(size - len(buffer))
+            if not data:
+                break
+            buffer.extend(data)
+        if not buffer and size:
+            return None
+        if len(buffer) < size:
+            raise ValueError(f"Truncated frame ({len(buffer)} of {size} bytes)")
+        return buffer
@@ -1,4 +1,5 @@
 import json
+from api.wrappers.data import DataWrapper
 
 
 # ------------------------------------------------- #
@@ -15,14 +16,122 @@ class RequestWrappingException(Exception): pass
 class RequestWrapper(object):
     """Class implementing Request wrapper (wrapping and unwrapping requests)"""
 
+    # Supported binary content types (body: raw .npy feature values)
+    binary_mimetypes = ("application/octet-stream", "application/x-npy")
+
+    # Supported multipart content types (file part: raw .npy feature values)
+    multipart_mimetypes = ("multipart/form-data",)
+
+    # Supported streaming content types (body: NDJSON lines or length-prefixed .npy frames of feature chunks)
+    ndjson_mimetypes = ("application/x-ndjson", "application/jsonlines")
+    frames_mimetypes = ("application/x-npy-stream",)
+
     @staticmethod
     def unwrap_request(request):
-        """Unwraps the request (deserialize from JSON-string)"""
+        """Unwraps the request (deserialize from JSON-string or from the binary/multipart body)"""
         try:
-            return request.args if request.method == "GET" else (request.get_json() or json.loads(request.data))
+            if request.method == "GET":
+                return request.args
+            if request.mimetype in RequestWrapper.binary_mimetypes:
+                return RequestWrapper.unwrap_binary_request(request)
+            if request.mimetype in RequestWrapper.multipart_mimetypes:
+                return RequestWrapper.unwrap_multipart_request(request)
+            return request.get_json() or json.loads(request.data)
         except Exception as e:
             raise RequestUnwrappingException(e)
 
+    @staticmethod
+    def unwrap_binary_request(request):
+        """
+        Unwraps the binary request.
+
+        The body of the request holds the feature values serialized as a raw
+        ``.npy`` buffer. The model identifier and the (optional) feature labels
+        are passed via the query parameters (``?model=<id>&labels=<label>``).
+
+        :param request: request
+        :type request: flask.Request
+        :return: unwrapped request data
+        :rtype: dict
+        """
+        return {
+            "features": {
+                "values": DataWrapper.unwrap_binary_data(request.get_data(cache=False)),
+                "labels": request.args.getlist("labels")
+            },
+            "model": request.args.get("model")
+        }
+
+    @staticmethod
+    def unwrap_multipart_request(request):
+        """
+        Unwraps the multipart request.
+
+        The file part ``values`` holds the feature values serialized as a raw
+        ``.npy`` buffer. The model identifier and the (optional) feature labels
+        are passed via the form fields (``model`` and ``labels``).
+
+        :param request: request
+        :type request: flask.Request
+        :return: unwrapped request data
+        :rtype: dict
+        """
+        values = request.files.get("values")
+        return {
+            "features": {
+                "values": DataWrapper.unwrap_binary_data(values.stream) if values else None,
+                "labels": request.form.getlist("labels")
+            },
+            "model": request.form.get("model")
+        }
+
+    @staticmethod
+    def unwrap_stream_request(request, max_chunk_size=None):
+        """
+        Unwraps the streaming request (chunk by chunk).
+
+        The body of the request holds the feature chunks either as the NDJSON
+        lines (each line is the JSON-serialized ``features`` object, i.e.
+        ``{"values": ..., "labels": [...]}``) or as the length-prefixed ``.npy``
+        frames (see: ``DataWrapper.unwrap_binary_frames``). The body is read
+        from the input stream chunk by chunk, so only one chunk is held in
+        memory. The model identifier is passed via the query parameters.
+
+        :param request: request
+        :type request: flask.Request
+        :param max_chunk_size: maximum size of a chunk in bytes, defaults to None (no limit)
+        :type max_chunk_size: int, optional
+        :return: generator of the unwrapped request data (one per chunk)
+        :rtype: Generator[dict]
+        """
+
+        # Unwrap the length-prefixed .npy frames
+        if request.mimetype in RequestWrapper.frames_mimetypes:
+            labels = request.args.getlist("labels")
+            for values in DataWrapper.unwrap_binary_frames(request.stream, max_frame_size=max_chunk_size):
+                yield {"features": {"values": values, "labels": labels}}
+            return
+
+        # Unwrap the NDJSON lines
+        if request.mimetype in RequestWrapper.ndjson_mimetypes:
+            while True:
+                try:
+                    line = request.stream.readline(max_chunk_size + 1 if max_chunk_size is not None else -1)
+                    if not line:
+                        return
+                    if max_chunk_size is not None and len(line) > max_chunk_size:
+                        raise ValueError(f"Line exceeds the maximum size of {max_chunk_size} bytes")
+                    if not line.strip():
+                        continue
+                    features = json.loads(line)
+                except Exception as e:
+                    raise RequestUnwrappingException(e)
+                yield {"features": features}
+            return
+
+        # Handle the unsupported content types
+        raise RequestUnwrappingException(f"Unsupported streaming content type: '{request.mimetype}'")
+
     @staticmethod
     def wrap_request(request):
         """Wraps the request (serialize to JSON-string)"""
@@ -1,4 +1,17 @@
 import json
+import numpy
+from api.wrappers.data import DataWrapper
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# -------------------------------------- #
+# Default response attributes definition #
+# -------------------------------------- #
+DEFAULT_RESPONSE_FORMAT = "json"
 
 
 # -------------------------------------------------- #
@@ -23,14 +36,81 @@ class ResponseWrapper(object):
         except Exception as e:
             raise ResponseUnwrappingException(e)
 
+    # Supported response formats (formats of the predicted values; see: DataWrapper.wrap_formatted_data)
+    response_formats = DataWrapper.data_formats
+
     @staticmethod
-    def wrap_response(response):
-        """Wraps the response (serialize to JSON-string)"""
+    def wrap_response(response, response_format=DEFAULT_RESPONSE_FORMAT):
+        """
+        Wraps the response (serialize to JSON-string).
+
+        The responses in the default ``json`` format (the predicted values are
+        already the json-tricks strings) are serialized by the standard JSON
+        encoder. The responses in the ``native`` and ``compact`` formats are
+        serialized in a single pass by the numpy-aware JSON encoder (see:
+        ``encode_json``).
+
+        :param response: response data
+        :type response: dict
+        :param response_format: response format, defaults to DEFAULT_RESPONSE_FORMAT
+        :type response_format: str, optional
+        :return: serialized response
+        :rtype: str or bytes
+        """
         try:
-            return json.dumps(response) if not isinstance(response, str) else response
+            if isinstance(response, (str, bytes)):
+                return response
+            if response_format != DEFAULT_RESPONSE_FORMAT:
+                return ResponseWrapper.encode_json(response)
+            return json.dumps(response)
         except Exception as e:
             raise ResponseWrappingException(e)
 
+    @staticmethod
+    def negotiate_format(request):
+        """Returns the response format requested via the ``format`` query parameter (defaults to json)"""
+        response_format = request.args.get("format") or DEFAULT_RESPONSE_FORMAT
+        if response_format not in ResponseWrapper.response_formats:
+            raise ResponseWrappingException(
+                f"Unsupported response format '{response_format}' "
+                f"(supported: {', '.join(ResponseWrapper.response_formats)})")
+        return response_format
+
+    @staticmethod
+    def encode_json(response):
+        """
+        Serializes the response to JSON bytes in a single pass (the numpy arrays are encoded as nested lists).
+
+        If ``orjson`` is installed, the numpy arrays are serialized natively by
+        ``orjson`` (without the intermediate Python lists); otherwise, the
+        standard JSON encoder is used. The non-finite values are encoded as
+        ``null`` in both cases (the output is always valid JSON).
+
+        :param response: response data
+        :type response: dict
+        :return: serialized response
+        :rtype: bytes
+        """
+        if orjson is not None:
+            return orjson.dumps(response, default=ResponseWrapper._encode_default, option=orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(
+            response,
+            default=ResponseWrapper._encode_default,
+            allow_nan=False,
+            separators=(",", ":")).encode("utf8")
+
+    @staticmethod
+    def _encode_default(value):
+        """Converts the numpy values not handled by the JSON encoder to the JSON-serializable values"""
+        if isinstance(value, numpy.ndarray):
+            if value.dtype.kind == "f" and not numpy.isfinite(value).all():
+                return numpy.where(numpy.isfinite(value), value, None).tolist()
+            return value.tolist()
+        if isinstance(value, numpy.generic):
+            value = value.item()
+            return value if not isinstance(value, float) or numpy.isfinite(value) else None
+        raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
 
 # ----------------------------- #
 # HTTPError wrapping definition #
@@ -1,8 +1,12 @@
 import argparse
+import warnings
 from api import prepare_app
+from api.authentication.hashing import password_hasher
+from api.ml.manager import PredictorManager
+from api.server import PreforkServer, DEFAULT_WORKERS, DEFAULT_THREADS
 
 
-def main(host, port, debug=False):
+def main(host, port, debug=False, production=False, workers=DEFAULT_WORKERS, threads=DEFAULT_THREADS, preload=None):
     """
     Runs the API.
 
@@ -12,15 +16,43 @@ def main(host, port, debug=False):
     :type port: int
     :param debug: debug mode, defaults to False
     :type debug: bool, optional
+    :param production: production mode (pre-forked workers), defaults to False
+    :type production: bool, optional
+    :param workers: number of the worker processes (production mode), defaults to DEFAULT_WORKERS
+    :type workers: int, optional
+    :param threads: number of the threads per worker (production mode), defaults to DEFAULT_THREADS
+    :type threads: int, optional
+    :param preload: models to load before forking (empty list: all models up to the cache size), defaults to None
+    :type preload: list, optional
     :return: None
     :rtype: None type
     """
 
-    # Predictor API initialization
-    app = prepare_app(__name__)
+    # Do not poll the models location in the supervisor (the forked workers poll it on their own)
+    if production:
+        PredictorManager.registry.suspend_watching()
 
-    # Predictor API start
-    app.run(host=host, port=port, debug=debug)
+    # Predictor API initialization (the production mode never installs the predictor dependencies)
+    app = prepare_app(__name__, production=production)
+
+    # Preload the models (shared copy-on-write by the forked workers; no more than the cache keeps)
+    if preload is not None:
+        manager = PredictorManager()
+        models = preload or manager.available_models()
+        if len(models) > manager.cache.max_size:
+            warnings.warn(
+                f"Preloading only {manager.cache.max_size} of {len(models)} models (the predictor cache size); "
+                f"list the models to preload or increase predictors.cache.max_size", RuntimeWarning)
+            models = models[:manager.cache.max_size]
+        for model_identifier in models:
+            manager.load(model_identifier)
+
+    # Predictor API start (production: pre-forked workers, development: Werkzeug development server)
+    if production:
+        password_hasher.limit_request_threads(threads)
+        PreforkServer(app, host=host, port=port, workers=workers, threads=threads).serve()
+    else:
+        app.run(host=host, port=port, debug=debug)
 
 
 if __name__ == "__main__":
@@ -30,6 +62,13 @@ if __name__ == "__main__":
     parser.add_argument("--host", help="the hostname to listen on (defaults to '0.0.0.0')", type=str)
     parser.add_argument("--port", help="the port of the web-server (defaults to 5000)", type=int)
     parser.add_argument("--debug", help="debug run", action="store_true")
+    parser.add_argument("--production", help="production run (pre-forked workers)", action="store_true")
+    parser.add_argument("--workers", help=f"the number of workers (defaults to {DEFAULT_WORKERS})", type=int)
+    parser.add_argument("--threads", help=f"the number of threads per worker (defaults to {DEFAULT_THREADS})", type=int)
+    parser.add_argument(
+        "--preload",
+        help="the models to load before forking (all up to the cache size if no model is given)",
+        nargs="*")
 
     # Parse the command line arguments
     args = parser.parse_args()
@@ -38,6 +77,16 @@ if __name__ == "__main__":
     host_ = args.host if args.host else "0.0.0.0"
     port_ = args.port if args.port else 5000
     debug_ = True if args.debug else False
+    production_ = True if args.production else False
+    workers_ = args.workers if args.workers else DEFAULT_WORKERS
+    threads_ = args.threads if args.threads else DEFAULT_THREADS
 
     # Run the API
-    main(host=host_, port=port_, debug=debug_)
+    main(
+        host=host_,
+        port=port_,
+        debug=debug_,
+        production=production_,
+        workers=workers_,
+        threads=threads_,
+        preload=args.preload)
@@ -0,0 +1,142 @@
+import sys
+import json
+import time
+import platform
+import statistics
+
+
+# ------------------------------------------ #
+# Default benchmarking attributes definition #
+# ------------------------------------------ #
+DEFAULT_TOLERANCE = 0.2
+DEFAULT_COMPARED_STATISTIC = "median"
+
+
+# -------------------------------- #
+# Benchmarking routines definition #
+# -------------------------------- #
+
+def summarize(durations):
+    """
+    Summarizes the durations in microseconds.
+
+    :param durations: durations in microseconds
+    :type durations: list
+    :return: timing statistics in microseconds (mean, median, p95, min)
+    :rtype: dict
+    """
+    durations = sorted(durations)
+    return {
+        "mean": statistics.fmean(durations),
+        "median": statistics.median(durations),
+        "p95": durations[min(int(len(durations) * 0.95), len(durations) - 1)],
+        "min": durations[0]
+    }
+
+
+def measure(function, repeat=1000, warmup=10):
+    """
+    Measures the duration of the <function> calls.
+
+    :param function: function to be measured (no arguments)
+    :type function: callable
+    :param repeat: number of the measured calls, defaults to 1000
+    :type repeat: int, optional
+    :param warmup: number of the calls before the measurement, defaults to 10
+    :type warmup: int, optional
+    :return: timing statistics in microseconds (mean, median, p95, min)
+    :rtype: dict
+    """
+
+    # Warm up (caches, lazy imports, etc.)
+    for _ in range(warmup):
+        function()
+
+    # Measure the calls
+    durations = []
+    for _ in range(max(int(repeat), 1)):
+        start = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start) * 1e6)
+
+    # Return the timing statistics
+    return summarize(durations)
+
+
+# ------------------------------------- #
+# Benchmark results routines definition #
+# ------------------------------------- #
+
+def describe_environment():
+    """Describes the environment the benchmarks run in (Python, platform and the versions of the key libraries)"""
+    environment = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor()
+    }
+    for name in ("numpy", "sklearn", "marshmallow", "flask", "json_tricks", "joblib"):
+        module = sys.modules.get(name)
+        if module is not None:
+            environment[name] = getattr(module, "__version__", None)
+    return environment
+
+
+def save_results(results, path):
+    """
+    Saves the benchmark <results> as the machine-readable JSON at <path>.
+
+    :param results: timing statistics keyed by the benchmark name
+    :type results: dict
+    :param path: path to the JSON file
+    :type path: str
+    :return: None
+    :rtype: None type
+    """
+    with open(path, "wt") as file:
+        json.dump({
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "environment": describe_environment(),
+            "results": results
+        }, file, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    """Loads the benchmark results (timing statistics keyed by the benchmark name) stored at <path>"""
+    with open(path, "rt") as file:
+        return json.load(file)["results"]
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE, statistic=DEFAULT_COMPARED_STATISTIC):
+    """
+    Compares the benchmark <results> with the <baseline>.
+
+    The benchmark regressed if its <statistic> exceeds the baseline by more than
+    the relative <tolerance> (e.g. 0.2: 20 % slower). The benchmarks missing in
+    either of the results are skipped.
+
+    :param results: timing statistics keyed by the benchmark name
+    :type results: dict
+    :param baseline: baseline timing statistics keyed by the benchmark name
+    :type baseline: dict
+    :param tolerance: relative tolerance of the slowdown, defaults to DEFAULT_TOLERANCE
+    :type tolerance: float, optional
+    :param statistic: compared statistic, defaults to DEFAULT_COMPARED_STATISTIC
+    :type statistic: str, optional
+    :return: comparison keyed by the benchmark name (baseline, current, ratio, regressed)
+    :rtype: dict
+    """
+    comparison = {}
+    for name in sorted(set(results) & set(baseline)):
+        current, previous = results[name].get(statistic), baseline[name].get(statistic)
+        if not current or not previous:
+            continue
+        ratio = current / previous
+        comparison[name] = {
+            "baseline": previous,
+            "current": current,
+            "ratio": ratio,
+            "regressed": ratio > 1.0 + tolerance
+        }
+    return comparison
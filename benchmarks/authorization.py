@@ -0,0 +1,61 @@
+import argparse
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token, verify_jwt_in_request
+from api.authorization import CachingJWTManager
+from benchmarks import measure
+
+
+# ---------------------------------- #
+# Authorization benchmark definition #
+# ---------------------------------- #
+
+def prepare_app(manager):
+    """Prepares the minimal application authorized by the JWT <manager> class"""
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "benchmark-secret-key-of-sufficient-length"
+    manager(app)
+    return app
+
+
+def benchmark_authorization(repeat=10000):
+    """
+    Benchmarks the per-request authorization overhead (``verify_jwt_in_request``).
+
+    The same access token is verified <repeat> times (the integration clients
+    reuse one token for many requests) with the default JWT manager (the token
+    is decoded and its signature verified on every request) and with the
+    caching JWT manager (the verified claims are cached until the token's exp).
+
+    :param repeat: number of the measured verifications, defaults to 10000
+    :type repeat: int, optional
+    :return: timing statistics in microseconds per JWT manager
+    :rtype: dict
+    """
+    results = {}
+    for name, manager in (("default", JWTManager), ("cached", CachingJWTManager)):
+        app = prepare_app(manager)
+
+        # Create the access token
+        with app.app_context():
+            token = create_access_token(identity="benchmark")
+
+        # Measure the verification of the token
+        with app.test_request_context(headers={"Authorization": f"Bearer {token}"}):
+            results[name] = measure(verify_jwt_in_request, repeat=repeat)
+
+    # Return the timing statistics
+    return results
+
+
+if __name__ == "__main__":
+
+    # Prepare the command line arguments
+    parser = argparse.ArgumentParser(description="Predictor API authorization benchmark")
+    parser.add_argument("--repeat", help="the number of the measured verifications (defaults to 10000)", type=int)
+
+    # Parse the command line arguments
+    args = parser.parse_args()
+
+    # Run the benchmark
+    for name, timing in benchmark_authorization(args.repeat or 10000).items():
+        print(f"{name:>8}: " + ", ".join(f"{k} {v:.1f} us" for k, v in timing.items()))
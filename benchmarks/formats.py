@@ -0,0 +1,174 @@
+import sys
+import json
+import argparse
+import tempfile
+import numpy
+import json_tricks
+from benchmarks.zoo import make_features, DEFAULT_RANDOM_STATE
+from api.wrappers.data import DataWrapper
+
+
+# ---------------------------------------------- #
+# Default round-trip check attributes definition #
+# ---------------------------------------------- #
+DEFAULT_CHECKED_SAMPLES = 200
+DEFAULT_FEATURES = 12
+DEFAULT_CHUNK_SIZE = 64
+
+
+# ----------------------------------------- #
+# Data round-trip check routines definition #
+# ----------------------------------------- #
+
+def make_arrays(samples=DEFAULT_CHECKED_SAMPLES, n_features=DEFAULT_FEATURES):
+    """Makes the checked arrays (name: array) of the dtypes and the shapes served by the API"""
+    features = make_features(samples, n_features)
+    return {
+        "float64": features,
+        "float32": features.astype(numpy.float32),
+        "float64,zeros": numpy.zeros((samples, n_features)),
+        "int64,labels": numpy.random.default_rng(DEFAULT_RANDOM_STATE).integers(0, 3, samples),
+        "float64,missing": numpy.where(features > 1.0, numpy.nan, features),
+        "float64,single": features[:1],
+        "object,labels": numpy.array(["low", "middle", "high"], dtype=object)[features[:, 0].argsort() % 3],
+        "str,labels": numpy.array(["low", "middle", "high"])[features[:, 1].argsort() % 3]
+    }
+
+
+def check_round_trip(array):
+    """
+    Checks the round trip of the <array> wrapped by json-tricks (and by the wrapper) and unwrapped by the wrapper.
+
+    :param array: checked array
+    :type array: numpy.ndarray
+    :return: mismatches (check name: description); empty if the round trips match
+    :rtype: dict
+    """
+    mismatches = {}
+
+    # Check that only the numeric arrays are wrapped as the raw buffer (never the addresses of the Python objects)
+    compact = DataWrapper.wrap_compact_data(array)
+    if array.dtype.kind not in DataWrapper.compact_kinds and isinstance(compact["__ndarray__"], str):
+        mismatches["wrapper,compact.buffer"] = f"{array.dtype} values wrapped as the raw buffer"
+
+    # Prepare the wrapped data (the compact json-tricks buffers are gzip-compressed if they compress well; json-tricks
+    # writes the raw buffers of the non-numeric arrays as well, so they are not checked)
+    wrapped = {
+        "json_tricks": json_tricks.dumps(array, allow_nan=True),
+        "wrapper,compact": json.dumps(compact)
+    }
+    if array.dtype.kind in DataWrapper.compact_kinds:
+        wrapped["json_tricks,compact"] = json_tricks.dumps(
+            array, allow_nan=True, properties={"ndarray_compact": True})
+    for name, data in wrapped.items():
+        for label, unwrap in (
+                ("unwrap_data", DataWrapper.unwrap_data),
+                ("unwrap_typed_data", DataWrapper.unwrap_typed_data),
+                ("unwrap_data[envelope]", lambda value: DataWrapper.unwrap_data(json.loads(value))),
+                ("unwrap_typed_data[envelope]", lambda value: DataWrapper.unwrap_typed_data(json.loads(value)))):
+            try:
+                unwrapped = numpy.asarray(unwrap(data))
+            except Exception as e:
+                mismatches[f"{name}.{label}"] = f"{type(e).__name__}: {e}"
+                continue
+            if unwrapped.dtype != array.dtype or not numpy.array_equal(
+                    unwrapped, array, equal_nan=array.dtype.kind in "fc"):
+                mismatches[f"{name}.{label}"] = f"different values ({unwrapped.dtype}, shape {unwrapped.shape})"
+
+    # Return the mismatches
+    return mismatches
+
+
+def check_job_results(samples=DEFAULT_CHECKED_SAMPLES, n_features=DEFAULT_FEATURES, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Checks the round trip of the job results of the string-label model (``api.jobs.store``).
+
+    The predictions of the classifier with the object (string) class labels
+    are written to the job results chunk by chunk (as the job manager does)
+    and the read results must equal the predictions of the model.
+
+    :param samples: number of the checked subjects, defaults to DEFAULT_CHECKED_SAMPLES
+    :type samples: int, optional
+    :param n_features: number of the features, defaults to DEFAULT_FEATURES
+    :type n_features: int, optional
+    :param chunk_size: number of the subjects written at once, defaults to DEFAULT_CHUNK_SIZE
+    :type chunk_size: int, optional
+    :return: mismatches keyed by the check name (empty if the results match)
+    :rtype: dict
+    """
+    from sklearn.linear_model import LogisticRegression
+    from api.jobs.store import JobStore, FINISHED
+
+    # Fit the string-label model
+    features = make_features(samples, n_features)
+    classes = numpy.array(["low", "middle", "high"], dtype=object)
+    labels = classes[(features[:, 0] > 0).astype(int) + (features[:, 1] > 0.5)]
+    model = LogisticRegression().fit(features, labels)
+    expected = model.predict(features)
+
+    # Write the results chunk by chunk and read them
+    mismatches = {}
+    with tempfile.TemporaryDirectory() as location:
+        store = JobStore(location)
+        job_identifier = store.create("labels", "predict", features)["job"]
+        try:
+            result = None
+            for start in range(0, samples, chunk_size):
+                predicted = model.predict(features[start:start + chunk_size])
+                if result is None:
+                    shape = (samples, *predicted.shape[1:])
+                    result = store.create_result(job_identifier, shape, predicted.dtype, labels=model.classes_.tolist())
+                result[start:start + len(predicted)] = predicted
+            result.flush()
+            store.update_state(job_identifier, status=FINISHED)
+            read = store.read_result(job_identifier)
+        except Exception as e:
+            return {"job_results.predict": f"{type(e).__name__}: {e}"}
+    if read.dtype != expected.dtype or not numpy.array_equal(read, expected):
+        mismatches["job_results.predict"] = f"different values ({read.dtype}, shape {read.shape})"
+
+    # Return the mismatches
+    return mismatches
+
+
+def check_formats(samples=DEFAULT_CHECKED_SAMPLES, n_features=DEFAULT_FEATURES):
+    """
+    Checks the round trips of the data formats accepted by the API (``api.wrappers.data``).
+
+    The checked arrays are wrapped by json-tricks (the nested lists and the
+    compact base64 buffers, both raw and gzip-compressed, as json-tricks
+    compresses the buffers that compress well) and by the wrapper, and they
+    are unwrapped by the wrapper from the JSON strings and the ndarray
+    envelopes (the same values and dtypes are expected). The non-numeric
+    arrays (e.g. the class labels) must not be wrapped as the raw buffer.
+
+    :param samples: number of the checked subjects, defaults to DEFAULT_CHECKED_SAMPLES
+    :type samples: int, optional
+    :param n_features: number of the features, defaults to DEFAULT_FEATURES
+    :type n_features: int, optional
+    :return: mismatches keyed by the check name (empty if all round trips match)
+    :rtype: dict
+    """
+    mismatches = {}
+    for name, array in make_arrays(samples, n_features).items():
+        for check, description in check_round_trip(array).items():
+            mismatches[f"{name}.{check}"] = description
+    return mismatches
+
+
+if __name__ == "__main__":
+
+    # Prepare the command line arguments
+    parser = argparse.ArgumentParser(description="Predictor API data formats (and job results) round-trip check")
+    parser.add_argument("--samples", help=f"the checked subjects (defaults to {DEFAULT_CHECKED_SAMPLES})", type=int)
+
+    # Parse the command line arguments
+    args = parser.parse_args()
+
+    # Check the round trips (non-zero exit status on mismatch)
+    mismatches_ = check_formats(samples=args.samples or DEFAULT_CHECKED_SAMPLES)
+    mismatches_.update(check_job_results(samples=args.samples or DEFAULT_CHECKED_SAMPLES))
+    for check_, description_ in mismatches_.items():
+        print(f"{check_:<72} {description_}")
+    print(f"{len(make_arrays())} arrays and the job results checked, {len(mismatches_)} mismatches")
+    sys.exit(1 if mismatches_ else 0)
@@ -0,0 +1,171 @@
+import sys
+import argparse
+import warnings
+import numpy
+from benchmarks.zoo import make_features, DEFAULT_RANDOM_STATE
+
+
+# ------------------------------------------ #
+# Default parity check attributes definition #
+# ------------------------------------------ #
+DEFAULT_TRAINING_SAMPLES = 1000
+DEFAULT_CHECKED_SAMPLES = 2000
+DEFAULT_FEATURES = 12
+DEFAULT_PARITY_TOLERANCE = 1e-9
+
+
+# Checked tree ensembles (name: estimator class name, target, estimator parameters)
+ENSEMBLES = {
+    "decision_tree_classifier": ("DecisionTreeClassifier", "binary", {"max_depth": 12}),
+    "decision_tree_regressor": ("DecisionTreeRegressor", "continuous", {}),
+    "random_forest_classifier": ("RandomForestClassifier", "multiclass", {"n_estimators": 30}),
+    "random_forest_regressor": ("RandomForestRegressor", "continuous", {"n_estimators": 20}),
+    "extra_trees_classifier": ("ExtraTreesClassifier", "labels", {"n_estimators": 20}),
+    "extra_trees_regressor": ("ExtraTreesRegressor", "continuous", {"n_estimators": 20}),
+    "gradient_boosting_classifier": ("GradientBoostingClassifier", "binary", {"n_estimators": 50}),
+    "gradient_boosting_multiclass": ("GradientBoostingClassifier", "multiclass", {"n_estimators": 30}),
+    "gradient_boosting_exponential": ("GradientBoostingClassifier", "binary", {"loss": "exponential"}),
+    "gradient_boosting_regressor": ("GradientBoostingRegressor", "continuous", {"n_estimators": 50}),
+    "gradient_boosting_huber_zero": ("GradientBoostingRegressor", "continuous", {"loss": "huber", "init": "zero"})
+}
+
+
+# -------------------------------- #
+# Parity check routines definition #
+# -------------------------------- #
+
+def make_target(features, target):
+    """Makes the synthetic target of the <features> (binary, multiclass, labels or continuous)"""
+    if target == "binary":
+        return (features[:, 0] + 0.5 * features[:, 1] > 0).astype(int)
+    if target == "multiclass":
+        return (features[:, 0] > 0).astype(int) + (features[:, 2] > 0.5)
+    if target == "labels":
+        return numpy.array(["low", "middle", "high"])[(features[:, 0] > 0).astype(int) + (features[:, 2] > 0.5)]
+    return 2.0 * features[:, 0] + features[:, 3] ** 2
+
+
+def with_missing_values(features, fraction=0.1, random_state=DEFAULT_RANDOM_STATE):
+    """Replaces the <fraction> of the <features> by the missing (NaN) values"""
+    features = features.copy()
+    features[numpy.random.default_rng(random_state).random(features.shape) < fraction] = numpy.nan
+    return features
+
+
+def check_parity(model, values, tolerance=DEFAULT_PARITY_TOLERANCE):
+    """
+    Checks the parity of the compiled <model> with the original one on the feature <values>.
+
+    :param model: fitted scikit-learn model
+    :type model: Any
+    :param values: feature values
+    :type values: numpy.ndarray
+    :param tolerance: maximum absolute difference of the probabilities (regression values), defaults to 1e-9
+    :type tolerance: float, optional
+    :return: mismatches (check name: description); empty if the models match
+    :rtype: dict
+    """
+    from api.ml.trees import compile_trees
+
+    # Compile the model
+    compiled = compile_trees(model)
+    if compiled is None:
+        return {"compile": f"{type(model).__name__} is not supported"}
+
+    # Compare the predictions (the batches of all sizes, i.e. the single subjects and the chunked batches)
+    mismatches = {}
+    for size in (1, 7, len(values)):
+        batch = values[:size]
+        expected, predicted = model.predict(batch), compiled.predict(batch)
+        if hasattr(model, "classes_"):
+            if not numpy.array_equal(expected, predicted):
+                mismatches[f"predict[{size}]"] = f"{int((expected != predicted).sum())} different labels"
+            difference = numpy.abs(model.predict_proba(batch) - compiled.predict_proba(batch)).max()
+            if difference > tolerance:
+                mismatches[f"predict_proba[{size}]"] = f"max difference {difference:.3g}"
+        else:
+            difference = numpy.abs(expected - predicted).max()
+            if difference > tolerance:
+                mismatches[f"predict[{size}]"] = f"max difference {difference:.3g}"
+
+    # Return the mismatches
+    return mismatches
+
+
+def check_ensembles(ensembles=None,
+                    samples=DEFAULT_CHECKED_SAMPLES,
+                    n_features=DEFAULT_FEATURES,
+                    tolerance=DEFAULT_PARITY_TOLERANCE):
+    """
+    Checks the parity of the compiled tree ensembles with scikit-learn (``api.ml.trees``).
+
+    Each ensemble is fitted on the synthetic data (with and without the
+    missing values) and the predictions of the compiled ensemble are compared
+    with the original ``predict`` (equal labels) and ``predict_proba``
+    (probabilities within <tolerance>) on the float64 and float32 feature
+    values, with and without the missing values.
+
+    :param ensembles: names of the checked ensembles (all if None), defaults to None
+    :type ensembles: list, optional
+    :param samples: number of the checked subjects, defaults to DEFAULT_CHECKED_SAMPLES
+    :type samples: int, optional
+    :param n_features: number of the features, defaults to DEFAULT_FEATURES
+    :type n_features: int, optional
+    :param tolerance: maximum absolute difference of the probabilities (regression values), defaults to 1e-9
+    :type tolerance: float, optional
+    :return: mismatches keyed by the check name (empty if all ensembles match)
+    :rtype: dict
+    """
+    import sklearn.tree
+    import sklearn.ensemble
+
+    # Prepare the training and the checked feature values
+    training = make_features(DEFAULT_TRAINING_SAMPLES, n_features)
+    checked = make_features(samples, n_features, random_state=DEFAULT_RANDOM_STATE + 1)
+
+    # Check the ensembles
+    mismatches = {}
+    for name in ensembles or ENSEMBLES.keys():
+        estimator, target, parameters = ENSEMBLES[name]
+        module = sklearn.tree if estimator.startswith("DecisionTree") else sklearn.ensemble
+        for missing in (False, True):
+            features = with_missing_values(training) if missing else training
+            if missing and not getattr(module, estimator)().__sklearn_tags__().input_tags.allow_nan:
+                continue
+            model = getattr(module, estimator)(random_state=DEFAULT_RANDOM_STATE, **parameters)
+            model.fit(features, make_target(training, target))
+
+            # Check the float64 and float32 values (with the missing values only if the model allows them)
+            for variant, values in (("float64", checked), ("float32", checked.astype(numpy.float32))):
+                variants = ((variant, values), (f"{variant},missing", with_missing_values(values)))
+                for label, checked_values in variants[:2 if model.__sklearn_tags__().input_tags.allow_nan else 1]:
+                    for check, description in check_parity(model, checked_values, tolerance).items():
+                        mismatches[f"{name}[{'missing,' if missing else ''}{label}].{check}"] = description
+
+    # Return the mismatches
+    return mismatches
+
+
+if __name__ == "__main__":
+
+    # Prepare the command line arguments
+    parser = argparse.ArgumentParser(description="Predictor API compiled tree ensembles parity check")
+    parser.add_argument("ensembles", help="the ensembles to check (all if no ensemble is given)", nargs="*")
+    parser.add_argument("--samples", help=f"the checked subjects (defaults to {DEFAULT_CHECKED_SAMPLES})", type=int)
+    parser.add_argument("--tolerance", help=f"the tolerance (defaults to {DEFAULT_PARITY_TOLERANCE})", type=float)
+
+    # Parse the command line arguments
+    args = parser.parse_args()
+
+    # Check the parity (non-zero exit status on mismatch)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        mismatches_ = check_ensembles(
+            ensembles=args.ensembles,
+            samples=args.samples or DEFAULT_CHECKED_SAMPLES,
+            tolerance=DEFAULT_PARITY_TOLERANCE if args.tolerance is None else args.tolerance)
+    for check_, description_ in mismatches_.items():
+        print(f"{check_:<72} {description_}")
+    print(f"{len(ENSEMBLES) if not args.ensembles else len(args.ensembles)} ensembles checked, "
+          f"{len(mismatches_)} mismatches")
+    sys.exit(1 if mismatches_ else 0)
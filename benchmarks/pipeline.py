@@ -0,0 +1,524 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks import measure, summarize, save_results, load_results, compare, DEFAULT_TOLERANCE
+from benchmarks.zoo import build_zoo, make_features, DEFAULT_ZOO_LOCATION
+
+
+# ------------------------------------------------ #
+# Default pipeline benchmark attributes definition #
+# ------------------------------------------------ #
+DEFAULT_REPEAT = 200
+DEFAULT_REQUESTS = 200
+DEFAULT_CONCURRENCY = 4
+DEFAULT_BATCH_SIZES = (1, 100, 10000)
+DEFAULT_END_TO_END_BATCH_SIZES = (1, 100)
+DEFAULT_DATA_FEATURES = 32
+DEFAULT_BACKEND_BATCH_SIZES = (1, 100, 10000)
+DEFAULT_PARITY_TOLERANCE = 1e-5
+
+
+# Benchmark suites
+SUITES = ("data", "schemas", "manager", "predictor", "backends", "trees", "end_to_end")
+
+
+# ----------------------------------------- #
+# Benchmark preparation routines definition #
+# ----------------------------------------- #
+
+def scale_repeat(repeat, batch_size):
+    """Scales the number of the measured calls down for the large batches (the same order of the total work)"""
+    return max(repeat * 100 // max(batch_size, 100), 3)
+
+
+def use_zoo(location):
+    """
+    Points the predictor manager to the model zoo at <location> (in-process; the registry polling is disabled).
+
+    :param location: location of the model zoo
+    :type location: str
+    :return: predictor manager
+    :rtype: api.ml.manager.PredictorManager
+    """
+    from api.ml.manager import PredictorManager
+
+    # Re-index the model registry (the cached predictors of the previous location are invalidated)
+    PredictorManager.registry.location = location
+    PredictorManager.registry.refresh_interval = None
+    PredictorManager.index_models()
+
+    # Return the predictor manager
+    return PredictorManager()
+
+
+# -------------------------- #
+# Microbenchmarks definition #
+# -------------------------- #
+
+def benchmark_data(repeat=DEFAULT_REPEAT, batch_sizes=DEFAULT_BATCH_SIZES, n_features=DEFAULT_DATA_FEATURES):
+    """
+    Benchmarks the data wrapping/unwrapping (JSON-string and compact ndarray envelope).
+
+    :param repeat: number of the measured calls, defaults to DEFAULT_REPEAT
+    :type repeat: int, optional
+    :param batch_sizes: numbers of the subjects, defaults to DEFAULT_BATCH_SIZES
+    :type batch_sizes: tuple, optional
+    :param n_features: number of the features, defaults to DEFAULT_DATA_FEATURES
+    :type n_features: int, optional
+    :return: timing statistics in microseconds keyed by the benchmark name
+    :rtype: dict
+    """
+    from api.wrappers.data import DataWrapper
+
+    results = {}
+    for batch_size in batch_sizes:
+        values = make_features(batch_size, n_features)
+        wrapped = DataWrapper.wrap_data(values)
+        compact = DataWrapper.wrap_compact_data(values)
+        count, size = scale_repeat(repeat, batch_size), f"{batch_size}x{n_features}"
+
+        # Measure the wrapping/unwrapping
+        results[f"data.wrap_data[{size}]"] = measure(lambda: DataWrapper.wrap_data(values), count)
+        results[f"data.unwrap_data[{size}]"] = measure(lambda: DataWrapper.unwrap_data(wrapped), count)
+        results[f"data.wrap_compact_data[{size}]"] = measure(lambda: DataWrapper.wrap_compact_data(values), count)
+        results[f"data.unwrap_compact_data[{size}]"] = measure(lambda: DataWrapper.unwrap_data(compact), count)
+
+        # Measure the typed unwrapping (straight to the float32 features of the tree-based models)
+        results[f"data.unwrap_typed_data[json,{size}]"] = measure(
+            lambda: DataWrapper.unwrap_typed_data(wrapped, numpy.float32), count)
+        results[f"data.unwrap_typed_data[compact,{size}]"] = measure(
+            lambda: DataWrapper.unwrap_typed_data(compact, numpy.float32), count)
+
+    # Return the timing statistics
+    return results
+
+
+def benchmark_schemas(repeat=DEFAULT_REPEAT, batch_sizes=DEFAULT_BATCH_SIZES, n_features=DEFAULT_DATA_FEATURES):
+    """
+    Benchmarks the marshmallow schemas (loading of the features and the model, dumping of the predictions).
+
+    The dumping and serialization of the whole response is measured for each
+    response format (``json``, ``native`` and ``compact``).
+
+    The features are loaded from the JSON-string (the unwrapping included),
+    from the already decoded numpy.ndarray (the binary transport; the schema
+    and validation overhead only) and by the model-aware schema (the typed
+    decoding and the shape/finiteness checks included).
+
+    :param repeat: number of the measured calls, defaults to DEFAULT_REPEAT
+    :type repeat: int, optional
+    :param batch_sizes: numbers of the subjects, defaults to DEFAULT_BATCH_SIZES
+    :type batch_sizes: tuple, optional
+    :param n_features: number of the features, defaults to DEFAULT_DATA_FEATURES
+    :type n_features: int, optional
+    :return: timing statistics in microseconds keyed by the benchmark name
+    :rtype: dict
+    """
+    from api.wrappers.data import DataWrapper
+    from api.interfaces.inputs.interface import Features
+    from api.interfaces.inputs.schema import PredictorModelSchema, FeaturesSchema
+    from api.interfaces.inputs.utilities import FeaturesValuesDecoder
+    from api.interfaces.outputs.interface import Predictions
+    from api.wrappers.response import ResponseWrapper
+
+    # Measure the loading of the model identifier
+    schema = PredictorModelSchema()
+    results = {"schemas.predictor_model.load": measure(lambda: schema.load({"model": "benchmark"}), repeat)}
+
+    # Prepare the model-aware features schema (float32 features of the tree-based models with the checked shape)
+    typed = FeaturesSchema(decoder=FeaturesValuesDecoder(numpy.dtype(numpy.float32), n_features))
+
+    # Measure the loading of the features and dumping of the predictions
+    for batch_size in batch_sizes:
+        values = make_features(batch_size, n_features)
+        predicted = (values[:, 0] > 0).astype(int)
+        wrapped = {"features": {"values": DataWrapper.wrap_data(values)}}
+        decoded = {"features": {"values": values}}
+        count, size = scale_repeat(repeat, batch_size), f"{batch_size}x{n_features}"
+
+        # Measure the schemas (the predictions are dumped from a new instance: dumping replaces the values)
+        results[f"schemas.features.load[json,{size}]"] = measure(lambda: Features.from_request(wrapped), count)
+        results[f"schemas.features.load[ndarray,{size}]"] = measure(lambda: Features.from_request(decoded), count)
+        results[f"schemas.features.load[typed,{size}]"] = measure(lambda: typed.load(wrapped), count)
+        results[f"schemas.predictions.dump[{batch_size}]"] = measure(
+            lambda: Predictions(predicted).to_response(), count)
+
+        # Measure the dumping and serialization of the response (per response format)
+        for response_format in ResponseWrapper.response_formats:
+            results[f"response.wrap[{response_format},{size}]"] = measure(
+                lambda: ResponseWrapper.wrap_response(
+                    Predictions(values).to_response(response_format), response_format), count)
+
+    # Return the timing statistics
+    return results
+
+
+def benchmark_manager(manager, models, repeat=DEFAULT_REPEAT):
+    """
+    Benchmarks the loading of the predictors (cached and cold, i.e. deserialization of the model file).
+
+    :param manager: predictor manager (pointed to the model zoo)
+    :type manager: api.ml.manager.PredictorManager
+    :param models: identifiers of the models
+    :type models: list
+    :param repeat: number of the measured calls, defaults to DEFAULT_REPEAT
+    :type repeat: int, optional
+    :return: timing statistics in microseconds keyed by the benchmark name
+    :rtype: dict
+    """
+    results = {}
+    for identifier in models:
+        record = manager.resolve(identifier)
+        results[f"manager.load[cached,{identifier}]"] = measure(lambda: manager.load(identifier), repeat)
+        results[f"manager.load[cold,{identifier}]"] = measure(
+            lambda: manager.load_predictor(record), max(repeat // 20, 3), warmup=1)
+
+    # Return the timing statistics
+    return results
+
+
+def benchmark_predictor(manager, models, repeat=DEFAULT_REPEAT, batch_sizes=DEFAULT_BATCH_SIZES):
+    """
+    Benchmarks the predictions of the predictors (``Predictor.predict``).
+
+    :param manager: predictor manager (pointed to the model zoo)
+    :type manager: api.ml.manager.PredictorManager
+    :param models: identifiers of the models (number of features keyed by the identifier)
+    :type models: dict
+    :param repeat: number of the measured calls, defaults to DEFAULT_REPEAT
+    :type repeat: int, optional
+    :param batch_sizes: numbers of the subjects, defaults to DEFAULT_BATCH_SIZES
+    :type batch_sizes: tuple, optional
+    :return: timing statistics in microseconds keyed by the benchmark name
+    :rtype: dict
+    """
+    from api.interfaces.inputs.interface import Features
+
+    results = {}
+    for identifier, n_features in models.items():
+        predictor = manager.load(identifier)
+        for batch_size in batch_sizes:
+            features = Features(make_features(batch_size, n_features), [])
+            results[f"predictor.predict[{identifier},{batch_size}]"] = measure(
+                lambda: predictor.predict(features), scale_repeat(repeat, batch_size))
+
+    # Return the timing statistics
+    return results
+
+
+def benchmark_backends(location, models, repeat=DEFAULT_REPEAT, batch_sizes=DEFAULT_BACKEND_BATCH_SIZES):
+    """
+    Benchmarks the inference backends on the same models (joblib vs. ONNX Runtime).
+
+    The models of the zoo are exported to ONNX (``<location>_onnx``; outside
+    of the zoo, so the other suites keep the joblib models) and both versions
+    of each model predict the same feature values via the predictor interface
+    (the backend options are read from ``ml.json``). The predicted
+    probabilities are checked for parity before the measurement. The suite is
+    skipped if ``onnxruntime`` or ``skl2onnx`` is not installed.
+
+    :param location: location of the model zoo
+    :type location: str
+    :param models: identifiers of the models (number of features keyed by the identifier)
+    :type models: dict
+    :param repeat: number of the measured calls, defaults to DEFAULT_REPEAT
+    :type repeat: int, optional
+    :param batch_sizes: numbers of the subjects, defaults to DEFAULT_BACKEND_BATCH_SIZES
+    :type batch_sizes: tuple, optional
+    :return: timing statistics in microseconds keyed by the benchmark name
+    :rtype: dict
+    """
+    from api.ml import conversion
+    from api.ml.backends import get_backend
+    from api.ml.interface import Predictor
+    from api.ml.manager import PredictorManager
+    from api.interfaces.inputs.interface import Features
+
+    # Skip the suite if the ONNX dependencies are not installed
+    if conversion.skl2onnx is None or not get_backend("onnx").is_available():
+        return {}
+
+    # Prepare the location of the exported models
+    exported = f"{location.rstrip(os.sep)}_onnx"
+    os.makedirs(exported, exist_ok=True)
+
+    results = {}
+    for identifier, n_features in models.items():
+
+        # Load the model by both backends (the model is exported if the exported one is missing or older)
+        path, target = os.path.join(location, f"{identifier}.joblib"), os.path.join(exported, f"{identifier}.onnx")
+        if not os.path.isfile(target) or os.path.getmtime(target) < os.path.getmtime(path):
+            conversion.export_model(path, target)
+        predictors = {}
+        for name, model_path in (("joblib", path), ("onnx", target)):
+            backend = get_backend(name)
+            predictors[name] = Predictor(
+                backend.load(model_path, PredictorManager.backend_options(identifier, backend)), identifier=identifier)
+
+        # Check the parity of the predicted probabilities
+        values = make_features(max(batch_sizes), n_features, random_state=0)
+        difference = numpy.abs(
+            predictors["joblib"].model.predict_proba(values) - predictors["onnx"].model.predict_proba(values)).max()
+        if difference > DEFAULT_PARITY_TOLERANCE:
+            raise RuntimeError(f"The backends differ for the model '{identifier}' (max difference: {difference:.3g})")
+
+        # Measure the predictions (the values are decoded to the dtype of each model as by the API)
+        for batch_size in batch_sizes:
+            for name, predictor in predictors.items():
+                features = Features(numpy.ascontiguousarray(values[:batch_size], predictor.features_dtype), [])
+                results[f"backends.predict[{name},{identifier},{batch_size}]"] = measure(
+                    lambda: predictor.predict(features), scale_repeat(repeat, batch_size))
+
+    # Return the timing statistics
+    return results
+
+
+def benchmark_trees(location, models, repeat=DEFAULT_REPEAT, batch_sizes=DEFAULT_BACKEND_BATCH_SIZES):
+    """
+    Benchmarks the compiled tree ensembles (``api.ml.trees``) against the original scikit-learn models.
+
+    The tree ensembles of the zoo are compiled and both versions of each
+    model predict the same feature values via the predictor interface. The
+    predicted probabilities are checked for parity (see also:
+    ``benchmarks.parity``) before the measurement; the other models are
+    skipped.
+
+    :param location: location of the model zoo
+    :type location: str
+    :param models: identifiers of the models (number of features keyed by the identifier)
+    :type models: dict
+    :param repeat: number of the measured calls, defaults to DEFAULT_REPEAT
+    :type repeat: int, optional
+    :param batch_sizes: numbers of the subjects, defaults to DEFAULT_BACKEND_BATCH_SIZES
+    :type batch_sizes: tuple, optional
+    :return: timing statistics in microseconds keyed by the benchmark name
+    :rtype: dict
+    """
+    import joblib
+    from api.ml.trees import compile_trees
+    from api.ml.interface import Predictor
+    from api.interfaces.inputs.interface import Features
+
+    results = {}
+    for identifier, n_features in models.items():
+
+        # Compile the model (the models other than the tree ensembles are skipped)
+        model = joblib.load(os.path.join(location, f"{identifier}.joblib"))
+        compiled = compile_trees(model)
+        if compiled is None:
+            continue
+        predictors = {"sklearn": Predictor(model, identifier=identifier), "compiled": Predictor(compiled)}
+
+        # Check the parity of the predicted probabilities
+        values = make_features(max(batch_sizes), n_features, random_state=0).astype(numpy.float32)
+        difference = numpy.abs(model.predict_proba(values) - compiled.predict_proba(values)).max()
+        if difference > DEFAULT_PARITY_TOLERANCE:
+            raise RuntimeError(f"The compiled model '{identifier}' differs (max difference: {difference:.3g})")
+
+        # Measure the predictions
+        for batch_size in batch_sizes:
+            features = Features(values[:batch_size], [])
+            for name, predictor in predictors.items():
+                results[f"trees.predict[{name},{identifier},{batch_size}]"] = measure(
+                    lambda: predictor.predict(features), scale_repeat(repeat, batch_size))
+
+    # Return the timing statistics
+    return results
+
+
+# -------------------------------- #
+# End-to-end benchmarks definition #
+# -------------------------------- #
+
+def generate_load(app, endpoint, payloads, headers=None, concurrency=DEFAULT_CONCURRENCY):
+    """
+    Generates the in-process load: sends the <payloads> to the <endpoint> via the Flask test client.
+
+    The requests are sent by <concurrency> threads (each thread uses its own
+    test client), so the whole request pipeline (routing, authorization,
+    unwrapping, validation, prediction, wrapping, logging) is measured without
+    the network and the web-server overhead.
+
+    :param app: application
+    :type app: flask.Flask
+    :param endpoint: endpoint
+    :type endpoint: str
+    :param payloads: serialized (JSON) request bodies (one request per payload)
+    :type payloads: list
+    :param headers: request headers, defaults to None
+    :type headers: dict, optional
+    :param concurrency: number of the concurrent clients, defaults to DEFAULT_CONCURRENCY
+    :type concurrency: int, optional
+    :return: latency statistics in microseconds and the throughput in requests per second
+    :rtype: dict
+    """
+
+    # Prepare the thread-local test clients
+    local = threading.local()
+    headers = {**(headers or {}), "Content-Type": "application/json"}
+
+    def send(payload):
+        """Sends the request and returns its duration in microseconds"""
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        start = time.perf_counter()
+        response = local.client.post(endpoint, data=payload, headers=headers)
+        duration = (time.perf_counter() - start) * 1e6
+        if response.status_code != 200:
+            raise RuntimeError(f"{endpoint} failed with {response.status_code}: {response.get_data(as_text=True)}")
+        return duration
+
+    # Send the requests
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(int(concurrency), 1)) as executor:
+        durations = list(executor.map(send, payloads))
+    elapsed = time.perf_counter() - start
+
+    # Return the latency statistics and the throughput
+    return {**summarize(durations), "throughput": len(payloads) / elapsed, "concurrency": concurrency}
+
+
+def benchmark_end_to_end(models,
+                         requests=DEFAULT_REQUESTS,
+                         concurrency=DEFAULT_CONCURRENCY,
+                         batch_sizes=DEFAULT_END_TO_END_BATCH_SIZES):
+    """
+    Benchmarks the ``/predict`` endpoint end-to-end (in-process load via the Flask test client).
+
+    The application is prepared as in the production mode and the requests are
+    authorized by an access token created directly (no database access). Each
+    request carries different feature values, so the predictions are not
+    served from the prediction cache.
+
+    :param models: identifiers of the models (number of features keyed by the identifier)
+    :type models: dict
+    :param requests: number of the requests per model and batch size, defaults to DEFAULT_REQUESTS
+    :type requests: int, optional
+    :param concurrency: number of the concurrent clients, defaults to DEFAULT_CONCURRENCY
+    :type concurrency: int, optional
+    :param batch_sizes: numbers of the subjects per request, defaults to DEFAULT_END_TO_END_BATCH_SIZES
+    :type batch_sizes: tuple, optional
+    :return: latency statistics in microseconds and the throughput keyed by the benchmark name
+    :rtype: dict
+    """
+    from flask_jwt_extended import create_access_token
+    from api import prepare_app
+    from api.wrappers.data import DataWrapper
+
+    # Prepare the application and the authorization header
+    app = prepare_app("benchmarks", production=True)
+    with app.app_context():
+        headers = {"Authorization": f"Bearer {create_access_token(identity='benchmark')}"}
+
+    # Generate the load
+    results = {}
+    for identifier, n_features in models.items():
+        for batch_size in batch_sizes:
+            payloads = [
+                json.dumps({
+                    "model": identifier,
+                    "features": {"values": DataWrapper.wrap_data(make_features(batch_size, n_features, seed))}
+                }) for seed in range(max(int(requests), 1))
+            ]
+            results[f"end_to_end.predict[{identifier},{batch_size}]"] = generate_load(
+                app, "/predict", payloads, headers=headers, concurrency=concurrency)
+
+    # Return the latency statistics and the throughput
+    return results
+
+
+def benchmark_pipeline(suites=SUITES,
+                       models=None,
+                       location=DEFAULT_ZOO_LOCATION,
+                       repeat=DEFAULT_REPEAT,
+                       requests=DEFAULT_REQUESTS,
+                       concurrency=DEFAULT_CONCURRENCY):
+    """
+    Benchmarks the layers of the inference request pipeline.
+
+    :param suites: benchmark suites to run, defaults to SUITES
+    :type suites: tuple, optional
+    :param models: identifiers of the models of the zoo (all models if None), defaults to None
+    :type models: list, optional
+    :param location: location of the model zoo, defaults to DEFAULT_ZOO_LOCATION
+    :type location: str, optional
+    :param repeat: number of the measured calls of the microbenchmarks, defaults to DEFAULT_REPEAT
+    :type repeat: int, optional
+    :param requests: number of the end-to-end requests per model and batch size, defaults to DEFAULT_REQUESTS
+    :type requests: int, optional
+    :param concurrency: number of the concurrent end-to-end clients, defaults to DEFAULT_CONCURRENCY
+    :type concurrency: int, optional
+    :return: timing statistics in microseconds keyed by the benchmark name
+    :rtype: dict
+    """
+
+    # Build the model zoo and point the predictor manager to it
+    zoo = build_zoo(location, models)
+    manager = use_zoo(location)
+
+    # Run the benchmark suites
+    results = {}
+    if "data" in suites:
+        results.update(benchmark_data(repeat))
+    if "schemas" in suites:
+        results.update(benchmark_schemas(repeat))
+    if "manager" in suites:
+        results.update(benchmark_manager(manager, list(zoo), repeat))
+    if "predictor" in suites:
+        results.update(benchmark_predictor(manager, zoo, repeat))
+    if "backends" in suites:
+        results.update(benchmark_backends(location, zoo, repeat))
+    if "trees" in suites:
+        results.update(benchmark_trees(location, zoo, repeat))
+    if "end_to_end" in suites:
+        results.update(benchmark_end_to_end(zoo, requests, concurrency))
+
+    # Return the timing statistics
+    return results
+
+
+if __name__ == "__main__":
+
+    # Prepare the command line arguments
+    parser = argparse.ArgumentParser(description="Predictor API inference pipeline benchmark")
+    parser.add_argument("--suites", help="the benchmark suites to run (defaults to all)", nargs="+", choices=SUITES)
+    parser.add_argument("--models", help="the models of the zoo to benchmark (defaults to all)", nargs="+")
+    parser.add_argument("--zoo", help="the location of the model zoo (defaults to benchmarks/data/zoo)", type=str)
+    parser.add_argument("--repeat", help=f"the number of the measured calls (defaults to {DEFAULT_REPEAT})", type=int)
+    parser.add_argument("--requests", help=f"the number of the requests (defaults to {DEFAULT_REQUESTS})", type=int)
+    parser.add_argument("--concurrency", help=f"the concurrent clients (defaults to {DEFAULT_CONCURRENCY})", type=int)
+    parser.add_argument("--output", help="the path to the JSON file to store the results in", type=str)
+    parser.add_argument("--baseline", help="the path to the JSON file with the baseline results", type=str)
+    parser.add_argument("--tolerance", help=f"the slowdown tolerance (defaults to {DEFAULT_TOLERANCE})", type=float)
+
+    # Parse the command line arguments
+    args = parser.parse_args()
+
+    # Run the benchmark
+    results_ = benchmark_pipeline(
+        suites=tuple(args.suites or SUITES),
+        models=args.models,
+        location=args.zoo or DEFAULT_ZOO_LOCATION,
+        repeat=args.repeat or DEFAULT_REPEAT,
+        requests=args.requests or DEFAULT_REQUESTS,
+        concurrency=args.concurrency or DEFAULT_CONCURRENCY)
+    for name_, timing_ in results_.items():
+        print(f"{name_:<56} " + ", ".join(f"{k} {v:.1f}" for k, v in timing_.items()))
+
+    # Store the results
+    if args.output:
+        save_results(results_, args.output)
+
+    # Compare the results with the baseline (non-zero exit status on regression)
+    if args.baseline:
+        tolerance_ = DEFAULT_TOLERANCE if args.tolerance is None else args.tolerance
+        comparison_ = compare(results_, load_results(args.baseline), tolerance_)
+        regressed_ = [name_ for name_, entry_ in comparison_.items() if entry_["regressed"]]
+        for name_, entry_ in comparison_.items():
+            print(f"{name_:<56} {entry_['ratio']:.2f}x{' REGRESSED' if entry_['regressed'] else ''}")
+        sys.exit(1 if regressed_ else 0)
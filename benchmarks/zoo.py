@@ -0,0 +1,119 @@
+import os
+import argparse
+import joblib
+import numpy
+
+
+# --------------------------------------- #
+# Default model zoo attributes definition #
+# --------------------------------------- #
+DEFAULT_ZOO_LOCATION = os.path.join(os.path.dirname(os.path.realpath(__file__)), "data", "zoo")
+DEFAULT_TRAINING_SAMPLES = 2000
+DEFAULT_RANDOM_STATE = 42
+
+
+# Synthetic model zoo (identifier: estimator name, number of features, estimator parameters)
+ZOO = {
+    "lr_small": ("logistic_regression", 16, {"max_iter": 1000}),
+    "lr_large": ("logistic_regression", 256, {"max_iter": 1000}),
+    "rf_small": ("random_forest", 16, {"n_estimators": 10, "max_depth": 8}),
+    "rf_large": ("random_forest", 64, {"n_estimators": 200, "max_depth": 16}),
+    "gb_small": ("gradient_boosting", 16, {"n_estimators": 50, "max_depth": 3}),
+    "gb_large": ("gradient_boosting", 64, {"n_estimators": 300, "max_depth": 5})
+}
+
+
+# ----------------------------- #
+# Model zoo building definition #
+# ----------------------------- #
+
+def make_estimator(name, parameters, random_state=DEFAULT_RANDOM_STATE):
+    """
+    Makes the (unfitted) scikit-learn estimator.
+
+    :param name: estimator name (logistic_regression, random_forest, gradient_boosting)
+    :type name: str
+    :param parameters: estimator parameters
+    :type parameters: dict
+    :param random_state: random state, defaults to DEFAULT_RANDOM_STATE
+    :type random_state: int, optional
+    :return: estimator
+    :rtype: sklearn.base.BaseEstimator
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+
+    # Prepare the estimator classes
+    estimators = {
+        "logistic_regression": LogisticRegression,
+        "random_forest": RandomForestClassifier,
+        "gradient_boosting": GradientBoostingClassifier
+    }
+
+    # Make the estimator
+    return estimators[name](random_state=random_state, **parameters)
+
+
+def make_features(n_samples, n_features, random_state=DEFAULT_RANDOM_STATE):
+    """Makes the synthetic feature values (float64 matrix of the shape <n_samples> x <n_features>)"""
+    return numpy.random.default_rng(random_state).standard_normal((n_samples, n_features))
+
+
+def build_zoo(location=DEFAULT_ZOO_LOCATION, identifiers=None, samples=DEFAULT_TRAINING_SAMPLES, rebuild=False):
+    """
+    Builds the synthetic model zoo (fits the models and serializes them as joblib files at <location>).
+
+    The models are fitted on the synthetic binary classification data (the
+    label depends on the first features), so the models of the same estimator
+    differ only by their size. The already built models are kept (unless
+    <rebuild> is True), so the zoo can be reused across the benchmark runs.
+
+    :param location: location of the model zoo, defaults to DEFAULT_ZOO_LOCATION
+    :type location: str, optional
+    :param identifiers: identifiers of the models to build (all models if None), defaults to None
+    :type identifiers: list, optional
+    :param samples: number of the training samples, defaults to DEFAULT_TRAINING_SAMPLES
+    :type samples: int, optional
+    :param rebuild: rebuild the already built models, defaults to False
+    :type rebuild: bool, optional
+    :return: identifiers of the models of the zoo (number of features keyed by the identifier)
+    :rtype: dict
+    """
+
+    # Make sure the location of the model zoo exists
+    os.makedirs(location, exist_ok=True)
+
+    # Build the models
+    zoo = {}
+    for identifier in identifiers or ZOO.keys():
+        name, n_features, parameters = ZOO[identifier]
+        path = os.path.join(location, f"{identifier}.joblib")
+
+        # Fit and serialize the model
+        if rebuild or not os.path.isfile(path):
+            features = make_features(samples, n_features)
+            labels = (features[:, 0] + 0.5 * features[:, 1] > 0).astype(int)
+            joblib.dump(make_estimator(name, parameters).fit(features, labels), path)
+
+        # Register the model
+        zoo[identifier] = n_features
+
+    # Return the model zoo
+    return zoo
+
+
+if __name__ == "__main__":
+
+    # Prepare the command line arguments
+    parser = argparse.ArgumentParser(description="Predictor API synthetic model zoo")
+    parser.add_argument("models", help="the models to build (all if no model is given)", nargs="*")
+    parser.add_argument("--location", help="the location of the model zoo (defaults to benchmarks/data/zoo)", type=str)
+    parser.add_argument("--rebuild", help="rebuild the already built models", action="store_true")
+
+    # Parse the command line arguments
+    args = parser.parse_args()
+
+    # Build the model zoo
+    zoo_ = build_zoo(args.location or DEFAULT_ZOO_LOCATION, args.models, rebuild=args.rebuild)
+    for identifier_, n_features_ in zoo_.items():
+        print(f"{identifier_}: {n_features_} features")
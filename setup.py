@@ -15,7 +15,6 @@ requires = [
     "Flask-Bcrypt",
     "Flask-JWT-Extended",
     "Flask-Cors",
-    "flask-api-cache",
     "webargs",
     "marshmallow",
     "python-dotenv",